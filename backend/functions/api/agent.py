@@ -1,16 +1,18 @@
 import json
-import asyncio
 import os
 from firebase_functions import https_fn, params
-from agents import Agent, Runner, trace
+from agents import Agent, Runner, set_default_openai_client, trace
+from openai import AsyncOpenAI
 from datetime import timedelta, timezone
 import re
 import uuid
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 from .utils.header import get_cors_headers
 from .utils.auth_middleware import extract_user_id_from_request
 from .utils.tracing_hooks import DetailedNutritionHooks
 from .utils.datetime_utils import get_system_datetime_info, now_jst, to_jst
+from .utils.event_loop import run_coroutine
+from .utils.fast_path_router import get_fast_path_router
 from services.user_service import UserService
 from services.chat_session_service import ChatSessionService
 from function_tools.chat_tools import save_chat_message_tool, get_chat_messages_tool
@@ -21,17 +23,16 @@ from function_tools.nutrition_tools import (
     get_all_nutrition_entries_tool
 )
 from services.chat_message_service import ChatMessageService
-from function_tools.get_nutrition_info_tool import get_nutrition_info_tool
+from function_tools.get_nutrition_info_tool import get_nutrition_info_tool, get_nutrition_info_batch_tool
 from function_tools.get_nutrition_search_guidance_tool import get_nutrition_search_guidance_tool
 from function_tools.evaluate_nutrition_search_tool import evaluate_nutrition_search_tool
-
-# フックインスタンス作成
-nutrition_hooks = DetailedNutritionHooks()
+from services.nutrition_fallback import format_fallback_instructions
+from config import AGENT_CONCURRENCY, AGENT_CPU, FAST_PATH_ENABLED
 
 main_agent = Agent(
     name="MY BODY COACH Agent",
     model="gpt-4o-mini",
-    instructions="""
+    instructions=f"""
     あなたは「MY BODY COACH」アプリのメインエージェントです。ユーザーの健康管理をサポートする専門的なアシスタントとして動作します。
     
     重要な動作ルール：
@@ -39,6 +40,8 @@ main_agent = Agent(
     - 既存の栄養記録に栄養情報が不足している場合は、必ずget_nutrition_search_guidance_toolを使用してから検索を実行してください
     - 推定値の使用は、ガイダンス→検索の両方が失敗した場合の最後の手段です
     - 栄養情報の問い合わせでは、必ずガイダンス→検索→評価の順序で実行してください
+    - ただし日本語の食材名（例：ご飯、納豆、鶏むね肉）は、翻訳せずにまずそのままget_nutrition_info_tool（複数ならget_nutrition_info_batch_tool）に渡してください
+      sourceが「日本食品標準成分表（八訂）」の結果が得られた食材は、ガイダンス・評価ツールを使わずにその値を使用してください
 
     
     1. 食事内容の報告時の処理：
@@ -46,11 +49,13 @@ main_agent = Agent(
        - まずget_nutrition_search_guidance_toolで検索ガイダンスを取得してください
        - 日本語の食材名の場合は、翻訳提案を含むガイダンスを取得してください
        - ガイダンスに基づいてget_nutrition_info_toolで栄養情報を取得してください
+       - 1回の食事で複数の食材が報告された場合は、get_nutrition_info_batch_toolで全食材の栄養情報をまとめて取得してください
        - 栄養情報取得後、save_nutrition_entry_toolを使用して栄養記録を保存してください
-       - APIが利用できない場合は、以下の推定値を使用してください：
-         * ご飯100g: カロリー130kcal, タンパク質2.2g, 炭水化物29g, 脂質0.3g
-         * 卵1個: カロリー70kcal, タンパク質6g, 炭水化物0.5g, 脂質5g
-         * パン1枚: カロリー160kcal, タンパク質6g, 炭水化物28g, 脂質3g
+       - save_nutrition_entry_toolには、取得したnutrition_infoをnutrients_per_100gに、fdc_idがあればfdc_idに、分量をquantity_desc（例：170g、1個、1枚、大さじ2）にそのまま渡してください
+         分量に応じた栄養価はツールが計算するため、自分で計算する必要はありません（換算できない分量の場合のみnutrientsを計算して渡してください）
+       - APIのクォータ制限中は、ツールが推定値（estimated=True）を返します。再試行せずにその値を使用してください
+       - APIが利用できずツールも推定値を返さない場合は、以下の推定値を使用してください：
+{format_fallback_instructions("         ")}
        - 各食材について1回ずつsave_nutrition_entry_toolを呼び出してください（重複呼び出し禁止）
        - 保存後に「栄養記録を保存しました」と報告してください
     
@@ -59,6 +64,7 @@ main_agent = Agent(
         - 日本語の食材名の場合は、翻訳提案を含むガイダンスを取得してください
         - ガイダンスに基づいて改善されたクエリでget_nutrition_info_toolを実行してください
         - 検索結果が得られた場合は、evaluate_nutrition_search_toolで結果の品質を評価してください
+        - evaluate_nutrition_search_toolは通常 detail_level を省略（要約）し、ユーザーが詳細な分析を求めた場合のみ detail_level='full' を指定してください
         - 検索が失敗した場合のみ、一般的な栄養価を回答してください
     
     3. 栄養記録の確認時の処理：
@@ -70,6 +76,7 @@ main_agent = Agent(
     
     5. 栄養検索ガイダンスの提供：
        - 「検索方法」「どう検索すれば」「検索のコツ」などの問い合わせには、get_nutrition_search_guidance_toolを使用してください
+       - 食事報告や栄養問い合わせの前処理では detail_level を省略（compact: 翻訳候補・検索戦略・推奨データタイプのみ）し、検索方法そのものを聞かれた場合のみ detail_level='full' を指定してください
        - 日本語の食材名が含まれる場合は、user_inputパラメータに含めて翻訳提案を取得してください
        - 食材カテゴリ（meat, fruit, vegetable等）や検索意図（basic_nutrition, high_protein等）が明確な場合は適切に指定してください
        - ガイダンス結果を分かりやすく整理して、具体的な検索例と改善提案を提示してください
@@ -93,6 +100,7 @@ main_agent = Agent(
     
     処理フロー例：
     - 食事報告 → get_nutrition_search_guidance_tool → get_nutrition_info_tool → save_nutrition_entry_tool → 保存完了を報告
+    - 複数食材の食事報告 → get_nutrition_search_guidance_tool → get_nutrition_info_batch_tool → 食材ごとにsave_nutrition_entry_tool → 保存完了を報告
     - 栄養問い合わせ → get_nutrition_search_guidance_tool → get_nutrition_info_tool → evaluate_nutrition_search_tool → 結果を回答
     - 栄養記録確認 → get_nutrition_entries_by_date_toolで今日の記録を取得 → 結果を表示
     - 検索ガイダンス → get_nutrition_search_guidance_toolでガイダンス取得 → 具体的な提案を提示
@@ -112,13 +120,56 @@ main_agent = Agent(
         get_all_nutrition_entries_tool,
         get_chat_messages_tool,
         get_nutrition_info_tool,
+        get_nutrition_info_batch_tool,
         get_nutrition_search_guidance_tool,
         evaluate_nutrition_search_tool
     ]
 )
 
+# エージェント実行のタイムアウト（関数のタイムアウト540秒より前に打ち切ってエラー応答を返す）
+AGENT_RUN_TIMEOUT = 520
+
+# 常駐イベントループ上で全リクエストが共有する OpenAI クライアント（コネクションプールを再利用する）
+_openai_client: Optional[AsyncOpenAI] = None
+
+def _ensure_openai_client() -> None:
+    """共有の AsyncOpenAI クライアントを Agents SDK の既定として登録（OPENAI_API_KEY は初回実行時に読み込む）"""
+    global _openai_client
+    if _openai_client is None:
+        _openai_client = AsyncOpenAI()
+        set_default_openai_client(_openai_client)
+        print("🔌 共有 OpenAI クライアント初期化")
+
+async def _run_main_agent(formatted_messages: List[Dict[str, str]], hooks: DetailedNutritionHooks, trace_metadata: Dict[str, Any]):
+    """常駐イベントループ上でトレーシング付きでエージェントを実行（trace のコンテキストもループ側で保持する）"""
+    _ensure_openai_client()
+    with trace("MY BODY COACH Agent Workflow", metadata=trace_metadata):
+        return await Runner.run(
+            main_agent,
+            formatted_messages,
+            hooks=hooks
+        )
+
+def _session_cookie_headers(headers: Dict[str, str], session_id: str, current_jst) -> Dict[str, str]:
+    """セッションIDのCookie（有効期限7日）を設定したレスポンスヘッダーを作成"""
+    headers_with_cookie = headers.copy()
+    expires_jst = current_jst + timedelta(days=7)
+    expires_utc = expires_jst.astimezone(timezone.utc)
+    expires = expires_utc.strftime("%a, %d %b %Y %H:%M:%S GMT")
+    headers_with_cookie["Set-Cookie"] = (
+        f"session_id={session_id}; Path=/; Expires={expires}; HttpOnly; SameSite=None; Secure"
+    )
+    print(f"🍪 Cookie設定: session_id={session_id}, expires={expires}")
+    return headers_with_cookie
+
 # HTTP関数
-@https_fn.on_request(timeout_sec=540, secrets=[params.SecretParam("OPENAI_API_KEY")])
+# 1インスタンスで複数リクエストを同時に処理する（リクエストごとの状態はフックを含め関数内に閉じる）
+@https_fn.on_request(
+    timeout_sec=540,
+    cpu=AGENT_CPU,
+    concurrency=AGENT_CONCURRENCY,
+    secrets=[params.SecretParam("OPENAI_API_KEY")]
+)
 def agent(request):
     print("🚀 === Agent関数開始 ===")
     print(f"📍 リクエスト受信時刻: {now_jst()}")
@@ -221,6 +272,9 @@ def agent(request):
     print(f"🕐 current_jst: {current_jst}")
     print(f"🔍 === パラメータ確認終了 ===")
 
+    # フックはリクエストごとに作成する（同時実行中の他リクエストとツール呼び出し・エラーの記録を共有しない）
+    nutrition_hooks = DetailedNutritionHooks()
+
     # プロンプト分析の詳細ログ
     try:
         print("🔍 プロンプト分析開始...")
@@ -238,6 +292,20 @@ def agent(request):
             'expected_tools': []
         }
 
+    # 栄養記録・チャット履歴の参照だけの問い合わせは LLM を使わずに回答
+    # （ユーザーメッセージの保存前に取得し、チャット履歴に今回の問い合わせを含めない）
+    fast_path = None
+    if FAST_PATH_ENABLED:
+        try:
+            router = get_fast_path_router()
+            fast_path = router.route(prompt, user_id, session_id)
+            if fast_path is not None:
+                print(f"⚡ 高速応答: {fast_path.intent} ({fast_path.elapsed_ms:.1f}ms)")
+            print(f"⚡ 高速応答の累計: {router.stats()}")
+        except Exception as e:
+            print(f"❌ 高速応答エラー（エージェントで処理します）: {e}")
+            fast_path = None
+
     # メッセージ形式作成の詳細ログ
     try:
         print("📤 メッセージ形式作成開始...")
@@ -272,13 +340,34 @@ def agent(request):
         print(f"❌ ユーザーメッセージ保存エラー: {e}")
         # 保存エラーでも処理を続行
 
-    # フックリセットの詳細ログ
-    try:
-        print("🔄 フックリセット開始...")
-        nutrition_hooks.reset()
-        print("✅ フックリセット完了")
-    except Exception as e:
-        print(f"❌ フックリセットエラー: {e}")
+    if fast_path is not None:
+        try:
+            ChatMessageService().save_message(user_id, session_id, "agent", fast_path.message)
+            print(f"✅ Agentメッセージ保存完了（高速応答）")
+        except Exception as e:
+            print(f"❌ Agentメッセージ保存エラー: {e}")
+
+        response_data = {
+            "message": fast_path.message,
+            "debug_info": {
+                "fast_path": {"intent": fast_path.intent, "elapsed_ms": round(fast_path.elapsed_ms, 2)},
+                "tool_calls": 0,
+                "llm_generations": 0,
+                "errors": 0,
+                "total_events": 0,
+                "datetime_info": datetime_info,
+                "prompt_analysis": {
+                    "type": prompt_analysis['prompt_type'],
+                    "keywords": prompt_analysis['keywords'],
+                    "expected_tools": prompt_analysis['expected_tools']
+                }
+            }
+        }
+        return https_fn.Response(
+            json.dumps(response_data),
+            status=200,
+            headers=_session_cookie_headers(headers, session_id, current_jst)
+        )
 
     try:
         print(f"🚀 === エージェント実行開始 ===")
@@ -292,18 +381,18 @@ def agent(request):
         print(f"  - フック準備: ✅")
         print(f"  - トレーシング準備: ✅")
         
-        # トレーシング付きでエージェントを実行
+        # トレーシング付きでエージェントを常駐イベントループ上で実行
         print("🔍 トレーシング開始...")
-        with trace("MY BODY COACH Agent Workflow", metadata={"user_id": user_id, "session_id": session_id, "prompt": prompt[:100]}):
-            print("🏃 Runner.run実行開始...")
-            result = asyncio.run(
-                Runner.run(
-                    main_agent,
-                    formatted_messages,
-                    hooks=nutrition_hooks
-                )
-            )
-            print("✅ Runner.run実行完了")
+        print("🏃 Runner.run実行開始...")
+        result = run_coroutine(
+            _run_main_agent(
+                formatted_messages,
+                nutrition_hooks,
+                {"user_id": user_id, "session_id": session_id, "prompt": prompt[:100]}
+            ),
+            timeout=AGENT_RUN_TIMEOUT
+        )
+        print("✅ Runner.run実行完了")
 
         print(f"🎯 エージェント実行完了")
         
@@ -367,14 +456,7 @@ def agent(request):
         print("📦 レスポンス作成開始...")
         
         # Cookie設定の詳細ログ
-        headers_with_cookie = headers.copy()
-        expires_jst = current_jst + timedelta(days=7)
-        expires_utc = expires_jst.astimezone(timezone.utc)
-        expires = expires_utc.strftime("%a, %d %b %Y %H:%M:%S GMT")
-        headers_with_cookie["Set-Cookie"] = (
-            f"session_id={session_id}; Path=/; Expires={expires}; HttpOnly; SameSite=None; Secure"
-        )
-        print(f"🍪 Cookie設定: session_id={session_id}, expires={expires}")
+        headers_with_cookie = _session_cookie_headers(headers, session_id, current_jst)
         
         response_data = {
             "message": agent_response,
@@ -0,0 +1,61 @@
+"""
+常駐イベントループモジュール
+インスタンス内で1つのイベントループを専用スレッドで動かし続け、リクエストのコルーチンをそこで実行する
+
+asyncio.run はリクエストごとにループを作成・破棄するため、ループに紐づく非同期クライアント
+（OpenAI の AsyncOpenAI、USDA の httpx.AsyncClient）のコネクションプールが毎回作り直されます。
+常駐ループで実行することで、これらのクライアントをリクエスト間で再利用できます。
+"""
+import asyncio
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Coroutine, Optional, TypeVar
+
+T = TypeVar("T")
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def _run_forever(loop: asyncio.AbstractEventLoop) -> None:
+    asyncio.set_event_loop(loop)
+    loop.run_forever()
+
+
+def get_background_loop() -> asyncio.AbstractEventLoop:
+    """
+    常駐イベントループを取得（初回呼び出し時に専用スレッドで起動）
+
+    Returns:
+        asyncio.AbstractEventLoop: プロセス全体で共有するイベントループ
+    """
+    global _loop
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=_run_forever, args=(loop,), name="agent-event-loop", daemon=True)
+                thread.start()
+                _loop = loop
+                print("🔁 常駐イベントループを起動しました")
+    return _loop
+
+
+def run_coroutine(coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+    """
+    コルーチンを常駐イベントループで実行し、完了するまで呼び出し元のスレッドで待つ
+
+    Args:
+        coro: 実行するコルーチン
+        timeout: 待機する最大秒数（超えた場合はコルーチンをキャンセルして TimeoutError）
+
+    Returns:
+        コルーチンの戻り値（コルーチン内で発生した例外はそのまま送出）
+    """
+    loop = get_background_loop()
+    future = asyncio.run_coroutine_threadsafe(coro, loop)
+    try:
+        return future.result(timeout)
+    except FutureTimeoutError:
+        future.cancel()
+        raise TimeoutError(f"コルーチンが{timeout}秒以内に完了しませんでした")
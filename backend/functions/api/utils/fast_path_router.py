@@ -0,0 +1,266 @@
+"""
+読み取り専用の問い合わせを LLM を使わずに処理する高速応答ルーター
+
+「今日の栄養」「昨日の摂取カロリーは？」「履歴」のような、栄養記録やチャット履歴を参照するだけの
+短い問い合わせを「日付 + 対象 + 参照の言い回し」の定型パターンで判定し、一致した場合のみ
+NutritionService / ChatService を直接呼び出して定型文で回答します。
+削除・修正・要約・評価など参照以外の依頼や、パターンにない言い回しは判定せず（None）、
+従来どおりエージェントで処理します。判定件数（意図ごとの hit・fallthrough）を記録します。
+"""
+import re
+import threading
+import time
+import unicodedata
+from datetime import timedelta
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from config import FAST_PATH_MAX_PROMPT_LENGTH
+from services.chat_service import ChatService
+from services.nutrition_service import NutritionService
+from .datetime_utils import now_jst
+
+NUTRITION_STATUS = "nutrition_status"
+CHAT_HISTORY = "chat_history"
+
+# 日付の表現 → 今日からの日数
+RELATIVE_DAYS = {
+    "一昨日": -2,
+    "おととい": -2,
+    "昨日": -1,
+    "きのう": -1,
+    "今日": 0,
+    "きょう": 0,
+    "本日": 0,
+}
+DAY_LABELS = {0: "今日", -1: "昨日", -2: "一昨日"}
+DATE_PATTERN = re.compile(r"(一昨日|おととい|昨日|きのう|今日|きょう|本日|\d{4}-\d{2}-\d{2})の?")
+
+# 参照の対象 → (意図, 日付が必要か)
+# 「カロリー」「栄養」だけでは栄養情報の問い合わせと区別できないため、日付がある場合のみ記録の参照とする
+LOOKUP_SUBJECTS = {
+    "栄養記録": (NUTRITION_STATUS, False),
+    "栄養摂取状況": (NUTRITION_STATUS, False),
+    "栄養状況": (NUTRITION_STATUS, False),
+    "摂取量": (NUTRITION_STATUS, True),
+    "摂取カロリー": (NUTRITION_STATUS, True),
+    "カロリー": (NUTRITION_STATUS, True),
+    "栄養": (NUTRITION_STATUS, True),
+    "履歴": (CHAT_HISTORY, False),
+    "会話履歴": (CHAT_HISTORY, False),
+    "会話の履歴": (CHAT_HISTORY, False),
+    "チャット履歴": (CHAT_HISTORY, False),
+    "チャットの履歴": (CHAT_HISTORY, False),
+}
+_SUBJECTS_LONGEST_FIRST = sorted(LOOKUP_SUBJECTS, key=len, reverse=True)
+# 対象の後に続いてよい参照の言い回し（これ以外の語が続く場合は削除・修正・要約・評価などの依頼とみなす）
+LOOKUP_ENDINGS = frozenset({
+    "", "は", "を", "を見せて", "見せて", "を見たい", "を教えて", "教えて", "は教えて",
+    "を表示", "を表示して", "表示して", "を確認", "を確認して", "を確認したい", "確認",
+    "を知りたい", "が知りたい", "はどれくらい", "はどのくらい", "はいくつ",
+})
+POLITE_SUFFIXES = ("ください", "下さい")
+_TRAILING_PUNCTUATION = "?？!！。.、 　"
+
+# 合計を表示する栄養素（キー, 表示名, 単位）
+SUMMARY_NUTRIENTS = (
+    ("energy_kcal", "エネルギー", "kcal"),
+    ("protein_g", "タンパク質", "g"),
+    ("fat_g", "脂質", "g"),
+    ("carbohydrates_g", "炭水化物", "g"),
+)
+CHAT_PREVIEW_LENGTH = 50
+CHAT_HISTORY_LIMIT = 10
+
+
+class FastPathResult(NamedTuple):
+    intent: str
+    message: str                # ユーザーへの回答（定型文）
+    data: Dict[str, Any]        # サービスの取得結果（debug_info 用）
+    elapsed_ms: float
+
+
+def _format_amount(value: float, unit: str) -> str:
+    return f"{value:.0f}{unit}" if unit == "kcal" else f"{value:.1f}{unit}"
+
+
+def render_nutrition_status(entry_date: str, day_label: Optional[str], entries: List[Dict[str, Any]]) -> str:
+    """日付の栄養記録を定型文にする"""
+    heading = f"{entry_date}（{day_label}）" if day_label else entry_date
+    if not entries:
+        return f"{heading}の栄養記録はまだありません。食べたものを教えていただければ記録します。"
+
+    lines = [f"📊 {heading}の栄養記録（{len(entries)}件）"]
+    totals = {key: 0.0 for key, _, _ in SUMMARY_NUTRIENTS}
+    missing = {key: 0 for key, _, _ in SUMMARY_NUTRIENTS}
+    for entry in entries:
+        nutrients = entry.get("nutrients") or {}
+        for key, _, _ in SUMMARY_NUTRIENTS:
+            value = nutrients.get(key)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                totals[key] += value
+            else:
+                missing[key] += 1
+        energy = nutrients.get("energy_kcal")
+        energy_text = f" {_format_amount(energy, 'kcal')}" if isinstance(energy, (int, float)) else ""
+        quantity = f" ({entry['quantity_desc']})" if entry.get("quantity_desc") else ""
+        lines.append(f"- {entry.get('meal_type') or '食事'}: {entry.get('food_item', '不明')}{quantity}{energy_text}")
+
+    total_text = " / ".join(
+        f"{label} {_format_amount(totals[key], unit)}" for key, label, unit in SUMMARY_NUTRIENTS
+    )
+    lines.append(f"合計: {total_text}")
+    incomplete = [label for key, label, _ in SUMMARY_NUTRIENTS if missing[key]]
+    if incomplete:
+        lines.append(f"※ {'・'.join(incomplete)}が記録されていない食事は合計に含まれていません")
+    return "\n".join(lines)
+
+
+def render_chat_history(messages: List[Dict[str, Any]]) -> str:
+    """チャット履歴を定型文にする"""
+    if not messages:
+        return "この会話の履歴はまだありません。"
+    lines = [f"💬 この会話の履歴（{len(messages)}件）"]
+    for message in messages:
+        speaker = "あなた" if message.get("role") == "user" else "コーチ"
+        content = " ".join(str(message.get("content", "")).split())
+        if len(content) > CHAT_PREVIEW_LENGTH:
+            content = content[:CHAT_PREVIEW_LENGTH] + "…"
+        lines.append(f"- {speaker}: {content}")
+    return "\n".join(lines)
+
+
+class FastPathRouter:
+    """
+    読み取り専用の問い合わせを判定し、サービスを直接呼び出して回答するルーター
+    サービスは初回の利用時に作成します（テストでは差し替え可能）。
+    """
+
+    def __init__(
+        self,
+        nutrition_service: Optional[NutritionService] = None,
+        chat_service: Optional[ChatService] = None,
+        max_prompt_length: int = FAST_PATH_MAX_PROMPT_LENGTH
+    ):
+        self._nutrition_service = nutrition_service
+        self._chat_service = chat_service
+        self.max_prompt_length = max_prompt_length
+        self._lock = threading.Lock()
+        self._hits: Dict[str, int] = {NUTRITION_STATUS: 0, CHAT_HISTORY: 0}
+        self._fallthrough = 0
+        self._service_errors = 0
+
+    @property
+    def nutrition_service(self) -> NutritionService:
+        if self._nutrition_service is None:
+            self._nutrition_service = NutritionService()
+        return self._nutrition_service
+
+    @property
+    def chat_service(self) -> ChatService:
+        if self._chat_service is None:
+            self._chat_service = ChatService()
+        return self._chat_service
+
+    def classify(self, prompt: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        プロンプトが高速応答できる意図か判定します。
+
+        Returns:
+            (意図, パラメータ) または None（曖昧な場合はエージェントで処理する）
+        """
+        text = unicodedata.normalize("NFKC", prompt or "").strip()
+        if not text or len(text) > self.max_prompt_length:
+            return None
+        text = "".join(text.split()).rstrip(_TRAILING_PUNCTUATION)
+        for suffix in POLITE_SUFFIXES:
+            if text.endswith(suffix):
+                text = text[:-len(suffix)]
+                break
+
+        # 先頭の日付（任意）
+        date_text = None
+        date_match = DATE_PATTERN.match(text)
+        if date_match:
+            date_text = date_match.group(1)
+            text = text[date_match.end():]
+
+        # 対象 + 参照の言い回しで全体が構成される場合のみ一致
+        for subject in _SUBJECTS_LONGEST_FIRST:
+            if not text.startswith(subject) or text[len(subject):] not in LOOKUP_ENDINGS:
+                continue
+            intent, requires_date = LOOKUP_SUBJECTS[subject]
+            if intent == CHAT_HISTORY:
+                return (CHAT_HISTORY, {}) if date_text is None else None
+            if requires_date and date_text is None:
+                return None
+            if date_text is None:
+                return NUTRITION_STATUS, {"day_offset": 0}
+            if date_text in RELATIVE_DAYS:
+                return NUTRITION_STATUS, {"day_offset": RELATIVE_DAYS[date_text]}
+            return NUTRITION_STATUS, {"entry_date": date_text}
+        return None
+
+    def route(self, prompt: str, user_id: str, session_id: str) -> Optional[FastPathResult]:
+        """
+        高速応答できる場合はサービスを呼び出して回答を返します（できない場合は None）。
+        サービスがエラーを返した場合も None を返し、エージェントで処理します。
+        """
+        started = time.perf_counter()
+        classified = self.classify(prompt)
+        if classified is None:
+            self._record(None)
+            return None
+
+        intent, params = classified
+        if intent == NUTRITION_STATUS:
+            if "entry_date" in params:
+                entry_date, day_label = params["entry_date"], None
+            else:
+                target = now_jst() + timedelta(days=params["day_offset"])
+                entry_date, day_label = target.strftime("%Y-%m-%d"), DAY_LABELS[params["day_offset"]]
+            data = self.nutrition_service.get_entries_by_date(user_id, entry_date)
+            if not data.get("success"):
+                self._record(None, service_error=True)
+                return None
+            message = render_nutrition_status(entry_date, day_label, data.get("entries", []))
+        else:
+            data = self.chat_service.get_messages(user_id, session_id, CHAT_HISTORY_LIMIT)
+            if "error" in data:
+                self._record(None, service_error=True)
+                return None
+            message = render_chat_history(data.get("messages", []))
+
+        self._record(intent)
+        return FastPathResult(intent, message, data, (time.perf_counter() - started) * 1000)
+
+    def _record(self, intent: Optional[str], service_error: bool = False) -> None:
+        with self._lock:
+            if intent is None:
+                self._fallthrough += 1
+                if service_error:
+                    self._service_errors += 1
+            else:
+                self._hits[intent] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """判定件数（意図ごとの高速応答数・エージェントに回した件数・うちサービスエラー）を取得"""
+        with self._lock:
+            return {
+                "hits": dict(self._hits),
+                "fallthrough": self._fallthrough,
+                "service_errors": self._service_errors,
+            }
+
+
+_router: Optional[FastPathRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_fast_path_router() -> FastPathRouter:
+    """プロセス全体で共有する FastPathRouter を取得する（判定件数はインスタンス内で集計）"""
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = FastPathRouter()
+    return _router
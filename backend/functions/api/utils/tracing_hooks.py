@@ -5,12 +5,14 @@
 from agents import RunHooks, RunContextWrapper, Usage, Tool, Agent
 from datetime import datetime
 from typing import Any, Dict, List
+from services.keyword_matcher import match_keywords
 
 
 class DetailedNutritionHooks(RunHooks):
     """
     栄養AIアプリ用の詳細トレーシングフック
     エージェントの実行状況、ツール呼び出し、LLM生成、エラーを詳細に記録します
+    記録は実行ごとの状態のため、リクエスト（Runner.run）ごとに新しいインスタンスを作成してください
     """
 
     def __init__(self):
@@ -180,48 +182,40 @@ class DetailedNutritionHooks(RunHooks):
             "keywords": []
         }
         
-        prompt_lower = prompt.lower()
-        
-        # 食事記録関連のキーワード
-        food_keywords = ["食べた", "食事", "朝食", "昼食", "夕食", "おやつ", "飲んだ", "摂取", "食べました", "飲みました"]
-        # 栄養情報取得関連のキーワード
-        nutrition_keywords = ["栄養", "カロリー", "タンパク質", "炭水化物", "脂質", "ビタミン", "ミネラル"]
-        # チャット履歴関連のキーワード
-        chat_keywords = ["履歴", "過去", "前回", "以前", "記録", "ログ"]
-        # 検索関連のキーワード
-        search_keywords = ["検索", "探す", "調べる", "見つける", "情報"]
+        # 意図ごとのキーワードを共有オートマトンで1回の走査でまとめて照合
+        keyword_hits = match_keywords(prompt)
         
         # キーワード分析
         found_keywords = []
-        if any(keyword in prompt_lower for keyword in food_keywords):
+        if "intent:food_logging" in keyword_hits:
             analysis["expected_tools"].append("save_nutrition_entry_tool")
             analysis["prompt_type"] = "food_logging"
-            found_keywords.extend([k for k in food_keywords if k in prompt_lower])
+            found_keywords.extend(keyword_hits["intent:food_logging"])
             
-        if any(keyword in prompt_lower for keyword in nutrition_keywords):
+        if "intent:nutrition" in keyword_hits:
             analysis["expected_tools"].append("get_nutrition_info_tool")
             if analysis["prompt_type"] == "unknown":
                 analysis["prompt_type"] = "nutrition_inquiry"
-            found_keywords.extend([k for k in nutrition_keywords if k in prompt_lower])
+            found_keywords.extend(keyword_hits["intent:nutrition"])
             
-        if any(keyword in prompt_lower for keyword in chat_keywords):
+        if "intent:chat_history" in keyword_hits:
             analysis["expected_tools"].append("get_chat_messages_tool")
             if analysis["prompt_type"] == "unknown":
                 analysis["prompt_type"] = "chat_history"
-            found_keywords.extend([k for k in chat_keywords if k in prompt_lower])
+            found_keywords.extend(keyword_hits["intent:chat_history"])
             
-        if any(keyword in prompt_lower for keyword in search_keywords):
+        if "intent:search" in keyword_hits:
             analysis["expected_tools"].append("get_nutrition_search_tool")
-            found_keywords.extend([k for k in search_keywords if k in prompt_lower])
+            found_keywords.extend(keyword_hits["intent:search"])
         
         # 栄養記録取得のパターン
-        if any(phrase in prompt_lower for phrase in ["今日の栄養", "栄養記録", "摂取量", "栄養状況", "栄養摂取状況"]):
+        if "intent:nutrition_status" in keyword_hits:
             analysis["expected_tools"].append("get_nutrition_entries_by_date_tool")
             if analysis["prompt_type"] == "unknown":
                 analysis["prompt_type"] = "nutrition_status"
         
         # 栄養価問い合わせの詳細パターン
-        if any(phrase in prompt_lower for phrase in ["栄養価", "栄養成分", "栄養素", "成分表"]):
+        if "intent:nutrition_details" in keyword_hits:
             analysis["expected_tools"].append("get_nutrition_info_tool")
             if analysis["prompt_type"] == "unknown":
                 analysis["prompt_type"] = "nutrition_details"
@@ -42,9 +42,41 @@ LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 API_TIMEOUT = int(os.getenv('API_TIMEOUT', '120'))
 MAX_RETRIES = int(os.getenv('MAX_RETRIES', '3'))
 
+# USDA FoodData Central 設定
+USDA_API_BASE_URL = os.getenv('USDA_API_BASE_URL', 'https://api.nal.usda.gov/fdc/v1')
+USDA_HTTP_POOL_SIZE = int(os.getenv('USDA_HTTP_POOL_SIZE', '10'))  # ホストあたりの保持コネクション数
+USDA_RETRY_BACKOFF = float(os.getenv('USDA_RETRY_BACKOFF', '0.5'))  # リトライ間隔の係数（秒）
+USDA_RATE_LIMIT_PER_HOUR = float(os.getenv('USDA_RATE_LIMIT_PER_HOUR', '1000'))  # APIキーあたりの上限: 1000回/時
+USDA_RATE_LIMIT_BURST = int(os.getenv('USDA_RATE_LIMIT_BURST', '50'))  # トークンバケットの容量（瞬間的に許容する回数）
+USDA_QUOTA_RESERVE = int(os.getenv('USDA_QUOTA_RESERVE', '50'))  # 残りクォータがこの値以下になったらAPI呼び出しを控える
+
 # 栄養データ設定
 NUTRITION_API_BASE_URL = os.getenv('NUTRITION_API_BASE_URL', 'https://api.example.com')
 NUTRITION_CACHE_TTL = int(os.getenv('NUTRITION_CACHE_TTL', '3600'))  # 1時間
+NUTRITION_CACHE_ENABLED = os.getenv('NUTRITION_CACHE_ENABLED', 'True').lower() == 'true'
+NUTRITION_CACHE_MEMORY_BYTES = int(os.getenv('NUTRITION_CACHE_MEMORY_BYTES', str(16 * 1024 * 1024)))  # プロセス内LRUの上限: 16MB
+NUTRITION_DETAIL_CACHE_TTL = int(os.getenv('NUTRITION_DETAIL_CACHE_TTL', '0'))  # fdcIdの詳細は不変のため既定は無期限(0)
+NUTRITION_DETAIL_CACHE_MEMORY_BYTES = int(os.getenv('NUTRITION_DETAIL_CACHE_MEMORY_BYTES', str(8 * 1024 * 1024)))  # 8MB
+NUTRITION_CACHE_STALE_TTL = int(os.getenv('NUTRITION_CACHE_STALE_TTL', '86400'))  # クォータ制限中は期限切れ後1日まで古いキャッシュを返す
+# 栄養データの取得元: remote(USDA API) / local(ローカルFDCミラー) / local_then_remote(ローカルになければAPI)
+NUTRITION_DATA_SOURCE = os.getenv('NUTRITION_DATA_SOURCE', 'remote')
+MEXT_FOOD_TABLE_PATH = os.getenv('MEXT_FOOD_TABLE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'mext_food_composition.csv'))
+FDC_LOCAL_DB_PATH = os.getenv('FDC_LOCAL_DB_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'fdc.sqlite3'))
+FOOD_DICTIONARY_PATH = os.getenv('FOOD_DICTIONARY_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'food_dictionary.tsv'))
+
+# 検索評価設定
+# evaluate_nutrition_search_tool の出力の詳細度: score(スコアのみ) / summary(要約) / full(全項目)
+EVALUATION_DETAIL_LEVEL = os.getenv('EVALUATION_DETAIL_LEVEL', 'summary')
+# get_nutrition_search_guidance_tool の出力の詳細度: compact(入力に該当する項目のみ) / full(全ガイダンス)
+GUIDANCE_DETAIL_LEVEL = os.getenv('GUIDANCE_DETAIL_LEVEL', 'compact')
+
+# エージェント関数設定
+# 1インスタンスで同時に処理するリクエスト数（1より大きい値には1 vCPU以上が必要）
+AGENT_CONCURRENCY = int(os.getenv('AGENT_CONCURRENCY', '20'))
+AGENT_CPU = int(os.getenv('AGENT_CPU', '1'))
+# 栄養記録・チャット履歴を参照するだけの短い問い合わせを LLM を使わずに回答する
+FAST_PATH_ENABLED = os.getenv('FAST_PATH_ENABLED', 'True').lower() == 'true'
+FAST_PATH_MAX_PROMPT_LENGTH = int(os.getenv('FAST_PATH_MAX_PROMPT_LENGTH', '30'))  # これより長い問い合わせはエージェントで処理
 
 class Config:
     """設定クラス"""
@@ -74,6 +106,14 @@ class Config:
     API_TIMEOUT = API_TIMEOUT
     MAX_RETRIES = MAX_RETRIES
     
+    # USDA FoodData Central 設定
+    USDA_API_BASE_URL = USDA_API_BASE_URL
+    USDA_HTTP_POOL_SIZE = USDA_HTTP_POOL_SIZE
+    USDA_RETRY_BACKOFF = USDA_RETRY_BACKOFF
+    USDA_RATE_LIMIT_PER_HOUR = USDA_RATE_LIMIT_PER_HOUR
+    USDA_RATE_LIMIT_BURST = USDA_RATE_LIMIT_BURST
+    USDA_QUOTA_RESERVE = USDA_QUOTA_RESERVE
+    
     # ログ設定
     LOG_LEVEL = LOG_LEVEL
     LOG_FORMAT = LOG_FORMAT
@@ -81,6 +121,25 @@ class Config:
     # 栄養データ設定
     NUTRITION_API_BASE_URL = NUTRITION_API_BASE_URL
     NUTRITION_CACHE_TTL = NUTRITION_CACHE_TTL
+    NUTRITION_CACHE_ENABLED = NUTRITION_CACHE_ENABLED
+    NUTRITION_CACHE_MEMORY_BYTES = NUTRITION_CACHE_MEMORY_BYTES
+    NUTRITION_DETAIL_CACHE_TTL = NUTRITION_DETAIL_CACHE_TTL
+    NUTRITION_DETAIL_CACHE_MEMORY_BYTES = NUTRITION_DETAIL_CACHE_MEMORY_BYTES
+    NUTRITION_CACHE_STALE_TTL = NUTRITION_CACHE_STALE_TTL
+    NUTRITION_DATA_SOURCE = NUTRITION_DATA_SOURCE
+    FDC_LOCAL_DB_PATH = FDC_LOCAL_DB_PATH
+    MEXT_FOOD_TABLE_PATH = MEXT_FOOD_TABLE_PATH
+    FOOD_DICTIONARY_PATH = FOOD_DICTIONARY_PATH
+    
+    # 検索評価設定
+    EVALUATION_DETAIL_LEVEL = EVALUATION_DETAIL_LEVEL
+    GUIDANCE_DETAIL_LEVEL = GUIDANCE_DETAIL_LEVEL
+    
+    # エージェント関数設定
+    AGENT_CONCURRENCY = AGENT_CONCURRENCY
+    AGENT_CPU = AGENT_CPU
+    FAST_PATH_ENABLED = FAST_PATH_ENABLED
+    FAST_PATH_MAX_PROMPT_LENGTH = FAST_PATH_MAX_PROMPT_LENGTH
     
     @classmethod
     def get_timezone(cls) -> timezone:
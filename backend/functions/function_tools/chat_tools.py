@@ -1,9 +1,10 @@
+import asyncio
 from agents import function_tool
 from services.chat_service import ChatService
 
 
 @function_tool(strict_mode=False)
-def save_chat_message_tool(session_id: str, user_id: str, role: str, message_text: str) -> dict:
+async def save_chat_message_tool(session_id: str, user_id: str, role: str, message_text: str) -> dict:
     """
     Chats メッセージを保存するツール（サービス呼び出し版）
 
@@ -17,11 +18,11 @@ def save_chat_message_tool(session_id: str, user_id: str, role: str, message_tex
       dict: サービスの create_message の戻り値
     """
     service = ChatService()
-    return service.create_message(user_id, session_id, role, message_text)
+    return await asyncio.to_thread(service.create_message, user_id, session_id, role, message_text)
 
 
 @function_tool(strict_mode=False)
-def get_chat_messages_tool(user_id: str, session_id: str, limit: int = 10, offset: int = 0) -> dict:
+async def get_chat_messages_tool(user_id: str, session_id: str, limit: int = 10, offset: int = 0) -> dict:
     """
     チャットメッセージを取得するツール（サービス呼び出し版）
 
@@ -35,4 +36,4 @@ def get_chat_messages_tool(user_id: str, session_id: str, limit: int = 10, offse
       dict: サービスの get_messages の戻り値
     """
     service = ChatService()
-    return service.get_messages(user_id, session_id, limit, offset)
\ No newline at end of file
+    return await asyncio.to_thread(service.get_messages, user_id, session_id, limit, offset)
\ No newline at end of file
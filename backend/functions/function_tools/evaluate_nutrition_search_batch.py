@@ -0,0 +1,142 @@
+"""
+検索結果評価のバッチ実行
+
+ログに記録された大量の (クエリ, 検索結果) を evaluate_nutrition_search_tool_core で評価します。
+評価は CPU 処理（純粋な Python）のため、プロセスプールに件数単位のチャンクで分配して並列実行し、
+終わったチャンクから順に結果を返します。入力は必要な分だけ読み進めるため、
+大きなログでもメモリに全件を載せる必要はありません。
+"""
+
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from function_tools.evaluate_nutrition_search_tool import evaluate_nutrition_search_tool_core
+
+# 1回のプロセス間通信で渡す件数（小さすぎると通信のオーバーヘッドが勝つ）
+DEFAULT_CHUNK_SIZE = 32
+# ワーカーあたりの投入済みチャンク数の上限（入力の先読みを抑える）
+MAX_PENDING_CHUNKS_PER_WORKER = 2
+# 進捗を表示する間隔（秒）
+DEFAULT_REPORT_INTERVAL = 5.0
+
+# 評価対象: (query, search_results) のタプル、または
+# {"query", "search_results", "target_food", "evaluation_focus"} の辞書
+EvaluationPair = Union[Tuple[str, Dict[str, Any]], Dict[str, Any]]
+
+
+class EvaluationOutcome(NamedTuple):
+    index: int              # 入力での順番（0始まり）。結果は完了順に返るため並べ替えに使う
+    query: str
+    result: Dict[str, Any]  # evaluate_nutrition_search_tool_core の結果（失敗時は status=error）
+
+
+def _evaluate_pair(pair: EvaluationPair, detail_level: str) -> Tuple[str, Dict[str, Any]]:
+    if isinstance(pair, dict):
+        query = pair.get("query", "")
+        search_results = pair.get("search_results") or {}
+        target_food = pair.get("target_food")
+        evaluation_focus = pair.get("evaluation_focus")
+    else:
+        query, search_results = pair
+        target_food = evaluation_focus = None
+
+    try:
+        result = evaluate_nutrition_search_tool_core(
+            query, search_results, target_food, evaluation_focus, detail_level
+        )
+    except Exception as e:
+        result = {"status": "error", "message": "評価中にエラーが発生しました", "error": str(e)}
+    return query, result
+
+
+def _evaluate_chunk(chunk: List[Tuple[int, EvaluationPair]], detail_level: str) -> List[EvaluationOutcome]:
+    """ワーカープロセスで実行: チャンク内の各ペアを評価する"""
+    return [EvaluationOutcome(index, *_evaluate_pair(pair, detail_level)) for index, pair in chunk]
+
+
+def _chunks(pairs: Iterable[EvaluationPair], chunk_size: int) -> Iterator[List[Tuple[int, EvaluationPair]]]:
+    iterator = enumerate(pairs)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class _ThroughputReporter:
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.started = time.perf_counter()
+        self.last_report = self.started
+        self.completed = 0
+
+    def add(self, count: int) -> None:
+        self.completed += count
+        now = time.perf_counter()
+        if self.interval and now - self.last_report >= self.interval:
+            self.last_report = now
+            self._print("⏳ 評価中")
+
+    def finish(self) -> None:
+        self._print("✅ 評価完了")
+
+    def _print(self, label: str) -> None:
+        elapsed = time.perf_counter() - self.started
+        rate = self.completed / elapsed if elapsed > 0 else 0.0
+        print(f"{label}: {self.completed}件 / {elapsed:.1f}秒 ({rate:.1f}件/秒)")
+
+
+def evaluate_nutrition_search_batch(
+    pairs: Iterable[EvaluationPair],
+    workers: Optional[int] = None,
+    detail_level: str = "score",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    report_interval: float = DEFAULT_REPORT_INTERVAL,
+) -> Iterator[EvaluationOutcome]:
+    """
+    (クエリ, 検索結果) を並列に評価し、完了したものから順に返します。
+
+    Args:
+        pairs: 評価対象（タプルまたは辞書）の iterable。必要な分だけ読み進める
+        workers: ワーカープロセス数（既定: CPU数）。1 の場合はプロセスを使わずに逐次評価
+        detail_level: evaluate_nutrition_search_tool_core の出力の詳細度（既定: score）
+        chunk_size: 1回にワーカーへ渡す件数
+        report_interval: 進捗（件数・件/秒）を表示する間隔（秒）。0 で途中経過を表示しない
+
+    Yields:
+        EvaluationOutcome（完了順。入力順が必要な場合は index で並べ替える）
+    """
+    workers = workers or os.cpu_count() or 1
+    reporter = _ThroughputReporter(report_interval)
+
+    if workers == 1:
+        for chunk in _chunks(pairs, chunk_size):
+            outcomes = _evaluate_chunk(chunk, detail_level)
+            reporter.add(len(outcomes))
+            yield from outcomes
+        reporter.finish()
+        return
+
+    max_pending = workers * MAX_PENDING_CHUNKS_PER_WORKER
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for chunk in _chunks(pairs, chunk_size):
+            pending.add(executor.submit(_evaluate_chunk, chunk, detail_level))
+            if len(pending) < max_pending:
+                continue
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                outcomes = future.result()
+                reporter.add(len(outcomes))
+                yield from outcomes
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                outcomes = future.result()
+                reporter.add(len(outcomes))
+                yield from outcomes
+    reporter.finish()
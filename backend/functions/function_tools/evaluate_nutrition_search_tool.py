@@ -1,13 +1,65 @@
 from agents import function_tool
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, FrozenSet, List, NamedTuple, Optional, Tuple
 import re
-from difflib import SequenceMatcher
+import numpy as np
+from services.text_similarity import mean_pairwise_from_matrix, ngram_matrix
+from services.nutrient_completeness import CORE_ESSENTIAL_MATCHER, ESSENTIAL_MATCHER
+from services.keyword_matcher import FOOD_CATEGORY_KEYWORDS, MODIFIER_KEYWORDS, match_keywords
+from services.search_ranker import DATA_TYPE_QUALITY, DEFAULT_DATA_TYPE_QUALITY
+from config import EVALUATION_DETAIL_LEVEL
+
+# 出力の詳細度（score: スコアのみ / summary: 要約 / full: 詳細分析を含む全項目）
+DETAIL_LEVELS = ("score", "summary", "full")
+# summary に含める推奨事項の上限（ツール出力をおよそ300トークン以内に収めるため）
+SUMMARY_MAX_RECOMMENDATIONS = 3
+
+
+class FoodFeatures(NamedTuple):
+    """評価に使う食品ごとの特徴量（1回の走査で作成し、各スコア計算で共有する）"""
+    description: str                # 元の食品名
+    description_lower: str          # 小文字化した食品名
+    words: FrozenSet[str]           # 小文字化した食品名の単語
+    data_type: str
+    nutrient_names: Tuple[str, ...]
+    query_similarity: float         # クエリとの文字 bigram コサイン類似度
+    vector: np.ndarray              # 食品名の文字 bigram ベクトル（多様性の計算に使用）
+
+
+def _extract_food_features(foods: List[Dict], query: str) -> List[FoodFeatures]:
+    """検索結果の各食品から特徴量を抽出する（食品名の類似度は全件まとめて計算）"""
+    descriptions = [food.get("description") or "" for food in foods]
+    matrix = ngram_matrix([query, *descriptions])
+    similarities = np.clip(matrix[1:] @ matrix[0], 0.0, 1.0)
+
+    features = []
+    for i, food in enumerate(foods):
+        description_lower = descriptions[i].lower()
+        features.append(FoodFeatures(
+            description=descriptions[i],
+            description_lower=description_lower,
+            words=frozenset(description_lower.split()),
+            data_type=food.get("dataType", "Unknown"),
+            nutrient_names=tuple(n.get("nutrientName", "") for n in food.get("foodNutrients", [])),
+            query_similarity=float(similarities[i]),
+            vector=matrix[i + 1],
+        ))
+    return features
+
+
+def _count_data_types(features: List[FoodFeatures]) -> Dict[str, int]:
+    """データタイプごとの件数"""
+    distribution: Dict[str, int] = {}
+    for feature in features:
+        distribution[feature.data_type] = distribution.get(feature.data_type, 0) + 1
+    return distribution
+
 
 def evaluate_nutrition_search_tool_core(
     query: str,
     search_results: Dict[str, Any],
     target_food: Optional[str] = None,
-    evaluation_focus: Optional[str] = None
+    evaluation_focus: Optional[str] = None,
+    detail_level: str = "full"
 ) -> Dict[str, Any]:
     """
     栄養データ検索結果の品質を評価し、改善提案を提供します。
@@ -18,6 +70,7 @@ def evaluate_nutrition_search_tool_core(
         search_results: get_nutrition_search_tool の結果
         target_food: 探している食材名（オプション）
         evaluation_focus: 評価の重点 ('accuracy', 'completeness', 'relevance')
+        detail_level: 出力の詳細度 ('score', 'summary', 'full')。指定外の値は 'full'
     
     Returns:
         評価結果と改善提案を含む辞書
@@ -30,23 +83,42 @@ def evaluate_nutrition_search_tool_core(
             "error": search_results["error"]
         }
     
+    if detail_level not in DETAIL_LEVELS:
+        detail_level = "full"
+    
     # 検索結果の基本情報を取得
     foods = search_results.get("foods", [])
     total_hits = search_results.get("totalHits", 0)
     
-    # 評価指標を計算
+    # 食品ごとの特徴量を1回だけ抽出し、各評価指標で共有
+    features = _extract_food_features(foods, query)
+    
+    # 総合スコアに必要な評価指標を計算
     evaluation = {
-        "query_analysis": _analyze_query_enhanced(query),
-        "result_quality": _evaluate_result_quality_enhanced(foods, query, target_food),
-        "data_type_distribution": _analyze_data_types_enhanced(foods),
-        "relevance_score": _calculate_relevance_score_enhanced(foods, query, target_food),
-        "completeness_score": _calculate_completeness_score_enhanced(foods),
-        "diversity_score": _calculate_diversity_score(foods),
-        "improvement_suggestions": []
+        "result_quality": _evaluate_result_quality_enhanced(
+            features, query, target_food, include_top_results=detail_level == "full"
+        ),
+        "relevance_score": _calculate_relevance_score_enhanced(features, query, target_food),
+        "completeness_score": _calculate_completeness_score_enhanced(features),
+        "diversity_score": _calculate_diversity_score(features),
     }
     
     # 評価フォーカスに応じた重み調整
     weights = _get_evaluation_weights(evaluation_focus)
+    overall_score = _calculate_overall_score_enhanced(evaluation, weights)
+    
+    if detail_level == "score":
+        return {
+            "status": "success",
+            "detail_level": detail_level,
+            "score": round(overall_score, 3),
+            "grade": _get_grade(overall_score),
+            "result_count": len(foods),
+            "total_hits": total_hits
+        }
+    
+    # クエリ分析（改善提案・次のステップで使用）
+    evaluation["query_analysis"] = _analyze_query_enhanced(query)
     
     # 改善提案を生成
     suggestions = _generate_improvement_suggestions_enhanced(
@@ -55,7 +127,6 @@ def evaluate_nutrition_search_tool_core(
     evaluation["improvement_suggestions"] = suggestions
     
     # 総合評価
-    overall_score = _calculate_overall_score_enhanced(evaluation, weights)
     evaluation["overall_assessment"] = {
         "score": overall_score,
         "grade": _get_grade(overall_score),
@@ -63,22 +134,50 @@ def evaluate_nutrition_search_tool_core(
         "focus": evaluation_focus or "balanced"
     }
     
-    # 詳細分析
+    if detail_level == "summary":
+        return _summarize_evaluation(evaluation)
+    
+    # データタイプ分布と詳細分析（full のみ）
+    evaluation["data_type_distribution"] = _analyze_data_types_enhanced(features)
     evaluation["detailed_analysis"] = _generate_detailed_analysis(evaluation, foods)
     
     return {
         "status": "success",
+        "detail_level": detail_level,
         "evaluation": evaluation,
         "recommendations": _get_recommendations_enhanced(evaluation),
         "next_steps": _suggest_next_steps(evaluation, query)
     }
 
+def _summarize_evaluation(evaluation: Dict) -> Dict[str, Any]:
+    """エージェント向けの要約（スコア・グレード・主要な改善提案のみ）"""
+    
+    overall = evaluation["overall_assessment"]
+    result_quality = evaluation["result_quality"]
+    
+    return {
+        "status": "success",
+        "detail_level": "summary",
+        "score": round(overall["score"], 3),
+        "grade": overall["grade"],
+        "summary": overall["summary"],
+        "scores": {
+            "relevance": round(evaluation["relevance_score"], 3),
+            "completeness": round(evaluation["completeness_score"], 3),
+            "diversity": round(evaluation["diversity_score"], 3),
+            "data_quality": round(result_quality["quality_score"], 3)
+        },
+        "has_foundation": result_quality.get("data_type_quality", {}).get("has_foundation", False),
+        "recommendations": _get_recommendations_enhanced(evaluation)[:SUMMARY_MAX_RECOMMENDATIONS]
+    }
+
 @function_tool(strict_mode=False)
 def evaluate_nutrition_search_tool(
     query: str,
     search_results: Dict[str, Any],
     target_food: Optional[str] = None,
-    evaluation_focus: Optional[str] = None
+    evaluation_focus: Optional[str] = None,
+    detail_level: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     栄養データ検索結果の品質を評価し、改善提案を提供します。
@@ -89,22 +188,29 @@ def evaluate_nutrition_search_tool(
         search_results: get_nutrition_search_tool の結果
         target_food: 探している食材名（オプション）
         evaluation_focus: 評価の重点 ('accuracy', 'completeness', 'relevance')
+        detail_level: 出力の詳細度 ('score': スコアのみ, 'summary': 要約, 'full': 詳細分析を含む全項目)。
+            省略時は要約。詳細な分析をユーザーに求められた場合のみ 'full' を指定してください
     
     Returns:
         評価結果と改善提案を含む辞書
     """
-    return evaluate_nutrition_search_tool_core(query, search_results, target_food, evaluation_focus)
+    return evaluate_nutrition_search_tool_core(
+        query, search_results, target_food, evaluation_focus, detail_level or EVALUATION_DETAIL_LEVEL
+    )
 
 def _analyze_query_enhanced(query: str) -> Dict[str, Any]:
     """拡張されたクエリ分析"""
     
     words = query.lower().split()
     
+    # カテゴリ・修飾語・曖昧表現を共有オートマトンで1回の走査でまとめて照合
+    keyword_hits = match_keywords(query)
+    
     # 動的な食材検出（より包括的）
-    detected_categories = _detect_food_categories(query)
+    detected_categories = _detect_food_categories(keyword_hits)
     
     # 修飾語の詳細分析
-    modifiers = _analyze_modifiers(words)
+    modifiers = _analyze_modifiers(keyword_hits)
     
     # 言語検出
     language = _detect_language(query)
@@ -114,101 +220,25 @@ def _analyze_query_enhanced(query: str) -> Dict[str, Any]:
         "detected_categories": detected_categories,
         "language": language,
         "modifiers": modifiers,
-        "specificity_score": _calculate_specificity_score_enhanced(words, detected_categories),
+        "specificity_score": _calculate_specificity_score_enhanced(words, detected_categories, keyword_hits),
         "complexity_level": _assess_query_complexity(query),
-        "potential_issues": _identify_query_issues(query, words, detected_categories)
+        "potential_issues": _identify_query_issues(query, words, detected_categories, keyword_hits)
     }
     
     return analysis
 
-def _detect_food_categories(query: str) -> List[str]:
-    """動的な食材カテゴリ検出"""
+def _detect_food_categories(keyword_hits: Dict[str, List[str]]) -> List[str]:
+    """動的な食材カテゴリ検出（肉類・魚介類・果物・野菜・乳製品・穀物）"""
     
-    categories = []
-    query_lower = query.lower()
+    return [category for category in FOOD_CATEGORY_KEYWORDS if f"category:{category}" in keyword_hits]
+
+def _analyze_modifiers(keyword_hits: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """修飾語の詳細分析（調理方法・準備状態・部位・品質・サイズ）"""
     
-    # 肉類
-    meat_keywords = [
-        "chicken", "beef", "pork", "lamb", "turkey", "duck", "veal",
-        "鶏肉", "牛肉", "豚肉", "羊肉", "七面鳥", "鴨肉"
-    ]
-    if any(keyword in query_lower for keyword in meat_keywords):
-        categories.append("meat")
-    
-    # 魚介類
-    seafood_keywords = [
-        "fish", "salmon", "tuna", "cod", "shrimp", "crab", "lobster",
-        "魚", "サーモン", "マグロ", "タラ", "エビ", "カニ", "ロブスター"
-    ]
-    if any(keyword in query_lower for keyword in seafood_keywords):
-        categories.append("seafood")
-    
-    # 果物
-    fruit_keywords = [
-        "apple", "banana", "orange", "grape", "strawberry", "peach",
-        "りんご", "バナナ", "オレンジ", "ぶどう", "いちご", "桃"
-    ]
-    if any(keyword in query_lower for keyword in fruit_keywords):
-        categories.append("fruit")
-    
-    # 野菜
-    vegetable_keywords = [
-        "carrot", "broccoli", "spinach", "tomato", "potato", "onion",
-        "にんじん", "ブロッコリー", "ほうれん草", "トマト", "じゃがいも", "玉ねぎ"
-    ]
-    if any(keyword in query_lower for keyword in vegetable_keywords):
-        categories.append("vegetable")
-    
-    # 乳製品
-    dairy_keywords = [
-        "milk", "cheese", "yogurt", "butter", "cream",
-        "牛乳", "チーズ", "ヨーグルト", "バター", "クリーム"
-    ]
-    if any(keyword in query_lower for keyword in dairy_keywords):
-        categories.append("dairy")
-    
-    # 穀物
-    grain_keywords = [
-        "rice", "bread", "pasta", "wheat", "oats", "quinoa",
-        "米", "パン", "パスタ", "小麦", "オーツ", "キヌア"
-    ]
-    if any(keyword in query_lower for keyword in grain_keywords):
-        categories.append("grain")
-    
-    return categories
-
-def _analyze_modifiers(words: List[str]) -> Dict[str, List[str]]:
-    """修飾語の詳細分析"""
-    
-    modifiers = {
-        "cooking_method": [],
-        "preparation": [],
-        "part": [],
-        "quality": [],
-        "size": []
+    return {
+        modifier: keyword_hits.get(f"modifier:{modifier}", [])
+        for modifier in MODIFIER_KEYWORDS
     }
-    
-    # 調理方法
-    cooking_methods = ["raw", "cooked", "baked", "grilled", "fried", "boiled", "steamed", "roasted"]
-    modifiers["cooking_method"] = [word for word in words if word in cooking_methods]
-    
-    # 準備状態
-    preparations = ["skinless", "boneless", "peeled", "trimmed", "whole", "ground", "chopped"]
-    modifiers["preparation"] = [word for word in words if word in preparations]
-    
-    # 部位
-    parts = ["breast", "thigh", "leg", "wing", "fillet", "loin", "shoulder"]
-    modifiers["part"] = [word for word in words if word in parts]
-    
-    # 品質
-    qualities = ["fresh", "frozen", "organic", "lean", "fat-free", "low-fat"]
-    modifiers["quality"] = [word for word in words if word in qualities]
-    
-    # サイズ
-    sizes = ["large", "medium", "small", "jumbo", "mini"]
-    modifiers["size"] = [word for word in words if word in sizes]
-    
-    return modifiers
 
 def _detect_language(query: str) -> str:
     """言語検出"""
@@ -219,7 +249,7 @@ def _detect_language(query: str) -> str:
     else:
         return "english"
 
-def _calculate_specificity_score_enhanced(words: List[str], categories: List[str]) -> float:
+def _calculate_specificity_score_enhanced(words: List[str], categories: List[str], keyword_hits: Dict[str, List[str]]) -> float:
     """拡張された具体性スコア計算"""
     
     # 基本スコア（単語数ベース）
@@ -229,16 +259,10 @@ def _calculate_specificity_score_enhanced(words: List[str], categories: List[str
     category_bonus = len(categories) * 0.1
     
     # 修飾語ボーナス
-    all_modifiers = [
-        "raw", "cooked", "fresh", "skinless", "boneless", "whole", "lean",
-        "baked", "grilled", "fried", "boiled", "steamed", "roasted",
-        "organic", "frozen", "large", "medium", "small"
-    ]
-    modifier_bonus = sum(0.05 for word in words if word in all_modifiers)
+    modifier_bonus = 0.05 * len(keyword_hits.get("specificity:modifier", ()))
     
     # 部位ボーナス
-    parts = ["breast", "thigh", "leg", "fillet", "loin", "shoulder", "wing"]
-    part_bonus = sum(0.1 for word in words if word in parts)
+    part_bonus = 0.1 * len(keyword_hits.get("specificity:part", ()))
     
     return min(base_score + category_bonus + modifier_bonus + part_bonus, 1.0)
 
@@ -254,7 +278,7 @@ def _assess_query_complexity(query: str) -> str:
     else:
         return "complex"
 
-def _identify_query_issues(query: str, words: List[str], categories: List[str]) -> List[str]:
+def _identify_query_issues(query: str, words: List[str], categories: List[str], keyword_hits: Dict[str, List[str]]) -> List[str]:
     """クエリの潜在的問題を特定"""
     
     issues = []
@@ -274,16 +298,17 @@ def _identify_query_issues(query: str, words: List[str], categories: List[str])
         issues.append("日本語と英語が混在しています")
     
     # 曖昧な表現
-    vague_terms = ["meat", "fish", "vegetable", "fruit", "肉", "魚", "野菜", "果物"]
-    if any(term in query.lower() for term in vague_terms) and len(words) <= 2:
+    if "query:vague" in keyword_hits and len(words) <= 2:
         issues.append("表現が曖昧すぎる可能性があります")
     
     return issues
 
-def _evaluate_result_quality_enhanced(foods: List[Dict], query: str, target_food: Optional[str]) -> Dict[str, Any]:
-    """拡張された結果品質評価"""
+def _evaluate_result_quality_enhanced(
+    features: List[FoodFeatures], query: str, target_food: Optional[str], include_top_results: bool = True
+) -> Dict[str, Any]:
+    """拡張された結果品質評価（include_top_results=False の場合は上位結果の詳細分析を省略）"""
     
-    if not foods:
+    if not features:
         return {
             "result_count": 0,
             "quality_score": 0.0,
@@ -293,13 +318,13 @@ def _evaluate_result_quality_enhanced(foods: List[Dict], query: str, target_food
         }
     
     # データタイプ品質分析
-    data_type_quality = _analyze_data_type_quality(foods)
+    data_type_quality = _analyze_data_type_quality(features)
     
     # 説明文分析
-    description_analysis = _analyze_descriptions(foods, query, target_food)
+    description_analysis = _analyze_descriptions(features, query, target_food)
     
     # 栄養データ完全性
-    nutrition_completeness = _analyze_nutrition_completeness(foods)
+    nutrition_completeness = _analyze_nutrition_completeness(features)
     
     # 品質スコア計算
     quality_score = (
@@ -308,36 +333,29 @@ def _evaluate_result_quality_enhanced(foods: List[Dict], query: str, target_food
         nutrition_completeness["score"] * 0.3
     )
     
-    return {
-        "result_count": len(foods),
+    result_quality = {
+        "result_count": len(features),
         "quality_score": quality_score,
         "data_type_quality": data_type_quality,
         "description_analysis": description_analysis,
-        "nutrition_completeness": nutrition_completeness,
-        "top_results_analysis": _analyze_top_results(foods[:3], query)
+        "nutrition_completeness": nutrition_completeness
     }
+    if include_top_results:
+        result_quality["top_results_analysis"] = _analyze_top_results(features[:3], query)
+    
+    return result_quality
 
-def _analyze_data_type_quality(foods: List[Dict]) -> Dict[str, Any]:
+def _analyze_data_type_quality(features: List[FoodFeatures]) -> Dict[str, Any]:
     """データタイプ品質分析"""
     
-    data_types = {}
-    for food in foods:
-        data_type = food.get("dataType", "Unknown")
-        data_types[data_type] = data_types.get(data_type, 0) + 1
+    data_types = _count_data_types(features)
     
     # 品質スコア（Foundation > SR Legacy > Survey > Branded）
-    quality_weights = {
-        "Foundation": 1.0,
-        "SR Legacy": 0.8,
-        "Survey (FNDDS)": 0.6,
-        "Branded": 0.4
-    }
-    
-    total_foods = len(foods)
+    total_foods = len(features)
     weighted_score = 0.0
     
     for data_type, count in data_types.items():
-        weight = quality_weights.get(data_type, 0.2)
+        weight = DATA_TYPE_QUALITY.get(data_type, DEFAULT_DATA_TYPE_QUALITY)
         weighted_score += (count / total_foods) * weight
     
     return {
@@ -347,10 +365,10 @@ def _analyze_data_type_quality(foods: List[Dict]) -> Dict[str, Any]:
         "has_sr_legacy": "SR Legacy" in data_types
     }
 
-def _analyze_descriptions(foods: List[Dict], query: str, target_food: Optional[str]) -> Dict[str, Any]:
+def _analyze_descriptions(features: List[FoodFeatures], query: str, target_food: Optional[str]) -> Dict[str, Any]:
     """説明文分析"""
     
-    if not foods:
+    if not features:
         return {"relevance_score": 0.0, "analysis": []}
     
     query_words = set(query.lower().split())
@@ -359,12 +377,11 @@ def _analyze_descriptions(foods: List[Dict], query: str, target_food: Optional[s
     analysis = []
     relevance_scores = []
     
-    for i, food in enumerate(foods[:5]):
-        description = food.get("description", "").lower()
-        desc_words = set(description.split())
+    for i, feature in enumerate(features[:5]):
+        desc_words = feature.words
         
-        # 類似度計算
-        query_similarity = SequenceMatcher(None, query.lower(), description).ratio()
+        # 類似度（特徴量抽出時に文字 bigram のコサイン類似度で一括計算済み）
+        query_similarity = feature.query_similarity
         
         # キーワード一致度
         query_match = len(query_words.intersection(desc_words)) / len(query_words) if query_words else 0
@@ -375,7 +392,7 @@ def _analyze_descriptions(foods: List[Dict], query: str, target_food: Optional[s
         
         analysis.append({
             "rank": i + 1,
-            "description": food.get("description", ""),
+            "description": feature.description,
             "relevance_score": relevance,
             "query_similarity": query_similarity,
             "keyword_match": query_match
@@ -386,34 +403,27 @@ def _analyze_descriptions(foods: List[Dict], query: str, target_food: Optional[s
         "analysis": analysis
     }
 
-def _analyze_nutrition_completeness(foods: List[Dict]) -> Dict[str, Any]:
+def _analyze_nutrition_completeness(features: List[FoodFeatures]) -> Dict[str, Any]:
     """栄養データ完全性分析"""
     
-    if not foods:
+    if not features:
         return {"score": 0.0, "analysis": []}
     
-    essential_nutrients = [
-        "Energy", "Protein", "Total lipid (fat)", "Carbohydrate, by difference",
-        "Fiber, total dietary", "Sugars, total including NLEA", "Calcium, Ca",
-        "Iron, Fe", "Sodium, Na", "Vitamin C, total ascorbic acid"
-    ]
-    
     completeness_scores = []
     analysis = []
     
-    for food in foods[:5]:
-        nutrients = food.get("foodNutrients", [])
-        nutrient_names = [n.get("nutrientName", "") for n in nutrients]
+    for feature in features[:5]:
+        nutrient_names = feature.nutrient_names
         
-        found_essential = sum(1 for essential in essential_nutrients
-                            if any(essential in name for name in nutrient_names))
+        # 必須栄養素は事前コンパイル済みのマッチャーで判定
+        found_essential = CORE_ESSENTIAL_MATCHER.count(nutrient_names)
         
-        completeness = found_essential / len(essential_nutrients)
+        completeness = found_essential / len(CORE_ESSENTIAL_MATCHER)
         completeness_scores.append(completeness)
         
         analysis.append({
-            "description": food.get("description", ""),
-            "total_nutrients": len(nutrients),
+            "description": feature.description,
+            "total_nutrients": len(nutrient_names),
             "essential_found": found_essential,
             "completeness_score": completeness
         })
@@ -423,27 +433,27 @@ def _analyze_nutrition_completeness(foods: List[Dict]) -> Dict[str, Any]:
         "analysis": analysis
     }
 
-def _analyze_top_results(foods: List[Dict], query: str) -> List[Dict]:
+def _analyze_top_results(features: List[FoodFeatures], query: str) -> List[Dict]:
     """上位結果の詳細分析"""
     
     analysis = []
     
-    for i, food in enumerate(foods):
+    for i, feature in enumerate(features):
         analysis.append({
             "rank": i + 1,
-            "description": food.get("description", ""),
-            "data_type": food.get("dataType", "Unknown"),
-            "nutrient_count": len(food.get("foodNutrients", [])),
-            "relevance_indicators": _get_relevance_indicators(food, query)
+            "description": feature.description,
+            "data_type": feature.data_type,
+            "nutrient_count": len(feature.nutrient_names),
+            "relevance_indicators": _get_relevance_indicators(feature, query)
         })
     
     return analysis
 
-def _get_relevance_indicators(food: Dict, query: str) -> List[str]:
+def _get_relevance_indicators(feature: FoodFeatures, query: str) -> List[str]:
     """関連性指標を取得"""
     
     indicators = []
-    description = food.get("description", "").lower()
+    description = feature.description_lower
     query_lower = query.lower()
     
     # 直接一致
@@ -456,23 +466,16 @@ def _get_relevance_indicators(food: Dict, query: str) -> List[str]:
         indicators.append("partial_match")
     
     # データタイプ
-    data_type = food.get("dataType", "")
-    if data_type in ["Foundation", "SR Legacy"]:
+    if feature.data_type in ["Foundation", "SR Legacy"]:
         indicators.append("high_quality_data")
     
     return indicators
 
-def _analyze_data_types_enhanced(foods: List[Dict]) -> Dict[str, Any]:
+def _analyze_data_types_enhanced(features: List[FoodFeatures]) -> Dict[str, Any]:
     """拡張されたデータタイプ分析"""
     
-    distribution = {}
-    quality_analysis = {}
-    
-    for food in foods:
-        data_type = food.get("dataType", "Unknown")
-        distribution[data_type] = distribution.get(data_type, 0) + 1
-    
-    total = len(foods)
+    distribution = _count_data_types(features)
+    total = len(features)
     
     # 品質分析
     quality_analysis = {
@@ -494,16 +497,9 @@ def _calculate_data_type_quality_score(distribution: Dict[str, int], total: int)
     if total == 0:
         return 0.0
     
-    weights = {
-        "Foundation": 1.0,
-        "SR Legacy": 0.8,
-        "Survey (FNDDS)": 0.6,
-        "Branded": 0.4
-    }
-    
     score = 0.0
     for data_type, count in distribution.items():
-        weight = weights.get(data_type, 0.2)
+        weight = DATA_TYPE_QUALITY.get(data_type, DEFAULT_DATA_TYPE_QUALITY)
         score += (count / total) * weight
     
     return score
@@ -524,33 +520,31 @@ def _get_data_type_recommendations(quality_analysis: Dict) -> List[str]:
     
     return recommendations
 
-def _calculate_relevance_score_enhanced(foods: List[Dict], query: str, target_food: Optional[str]) -> float:
+def _calculate_relevance_score_enhanced(features: List[FoodFeatures], query: str, target_food: Optional[str]) -> float:
     """拡張された関連性スコア計算"""
     
-    if not foods:
+    if not features:
         return 0.0
     
     scores = []
     query_lower = query.lower()
-    target_lower = target_food.lower() if target_food else ""
+    query_words = set(query_lower.split())
+    target_words = set(target_food.lower().split()) if target_food else set()
     
-    for food in foods[:10]:  # 上位10件を評価
-        description = food.get("description", "").lower()
+    for feature in features[:10]:  # 上位10件を評価
+        desc_words = feature.words
         
         # 複数の類似度指標を組み合わせ
-        exact_match = 1.0 if query_lower in description else 0.0
-        sequence_similarity = SequenceMatcher(None, query_lower, description).ratio()
+        exact_match = 1.0 if query_lower in feature.description_lower else 0.0
+        sequence_similarity = feature.query_similarity
         
         # キーワード一致度
-        query_words = set(query_lower.split())
-        desc_words = set(description.split())
         keyword_match = len(query_words.intersection(desc_words)) / len(query_words) if query_words else 0
         
         # ターゲット食材との一致度
         target_match = 0.0
-        if target_lower:
-            target_words = set(target_lower.split())
-        target_match = len(target_words.intersection(desc_words)) / len(target_words) if target_words else 0
+        if target_words:
+            target_match = len(target_words.intersection(desc_words)) / len(target_words) if target_words else 0
         
         # 総合スコア
         relevance = max(exact_match, sequence_similarity * 0.7, keyword_match * 0.8, target_match * 0.9)
@@ -558,67 +552,43 @@ def _calculate_relevance_score_enhanced(foods: List[Dict], query: str, target_fo
     
     return sum(scores) / len(scores) if scores else 0.0
 
-def _calculate_completeness_score_enhanced(foods: List[Dict]) -> float:
+def _calculate_completeness_score_enhanced(features: List[FoodFeatures]) -> float:
     """拡張された完全性スコア計算"""
     
-    if not foods:
+    if not features:
         return 0.0
     
-    # より包括的な栄養素リスト
-    essential_nutrients = [
-        "Energy", "Protein", "Total lipid (fat)", "Carbohydrate, by difference",
-        "Fiber, total dietary", "Sugars, total including NLEA",
-        "Calcium, Ca", "Iron, Fe", "Magnesium, Mg", "Phosphorus, P",
-        "Potassium, K", "Sodium, Na", "Zinc, Zn",
-        "Vitamin C, total ascorbic acid", "Thiamin", "Riboflavin",
-        "Niacin", "Vitamin B-6", "Folate, total", "Vitamin B-12",
-        "Vitamin A, RAE", "Vitamin E (alpha-tocopherol)", "Vitamin D (D2 + D3)",
-        "Vitamin K (phylloquinone)"
-    ]
-    
     completeness_scores = []
     
-    for food in foods[:5]:  # 上位5件を評価
-        nutrients = food.get("foodNutrients", [])
-        nutrient_names = [n.get("nutrientName", "") for n in nutrients]
-        
-        found_essential = sum(1 for essential in essential_nutrients
-                            if any(essential in name for name in nutrient_names))
-        
-        completeness = found_essential / len(essential_nutrients)
-        completeness_scores.append(completeness)
+    for feature in features[:5]:  # 上位5件を評価
+        # より包括的な必須栄養素リスト（ESSENTIAL_NUTRIENTS）の充足率
+        completeness_scores.append(ESSENTIAL_MATCHER.completeness(feature.nutrient_names))
     
     return sum(completeness_scores) / len(completeness_scores) if completeness_scores else 0.0
 
-def _calculate_diversity_score(foods: List[Dict]) -> float:
+def _calculate_diversity_score(features: List[FoodFeatures]) -> float:
     """多様性スコア計算"""
     
-    if not foods:
+    if not features:
         return 0.0
     
     # データタイプの多様性
-    data_types = set(food.get("dataType", "Unknown") for food in foods)
+    data_types = set(feature.data_type for feature in features)
     data_type_diversity = len(data_types) / 4  # 最大4種類のデータタイプ
     
     # 説明文の多様性（類似度ベース）
-    descriptions = [food.get("description", "") for food in foods[:10]]
-    description_diversity = _calculate_description_diversity(descriptions)
+    description_diversity = _calculate_description_diversity(features[:10])
     
     return (data_type_diversity + description_diversity) / 2
 
-def _calculate_description_diversity(descriptions: List[str]) -> float:
+def _calculate_description_diversity(features: List[FoodFeatures]) -> float:
     """説明文の多様性計算"""
     
-    if len(descriptions) < 2:
+    if len(features) < 2:
         return 1.0
     
-    similarities = []
-    for i in range(len(descriptions)):
-        for j in range(i + 1, len(descriptions)):
-            similarity = SequenceMatcher(None, descriptions[i].lower(), descriptions[j].lower()).ratio()
-            similarities.append(similarity)
-    
-    avg_similarity = sum(similarities) / len(similarities) if similarities else 0
+    # 全ペアの平均類似度（特徴量の bigram ベクトルから、ペアを列挙せず行列演算で計算）
+    avg_similarity = mean_pairwise_from_matrix(np.stack([feature.vector for feature in features]))
     return 1.0 - avg_similarity  # 類似度が低いほど多様性が高い
 
 def _get_evaluation_weights(evaluation_focus: Optional[str]) -> Dict[str, float]:
@@ -833,7 +803,7 @@ def _get_recommendations_enhanced(evaluation: Dict) -> List[str]:
     
     recommendations.extend(evaluation["improvement_suggestions"])
     
-    return list(set(recommendations))  # 重複を除去
+    return list(dict.fromkeys(recommendations))  # 重複を除去（優先度の高い順を維持）
 
 def _suggest_next_steps(evaluation: Dict, query: str) -> List[str]:
     """次のステップ提案"""
@@ -1,11 +1,55 @@
+import asyncio
 from agents import function_tool
 from typing import Any, Dict, Optional, List
-from services.nutrition_search_service import NutritionSearchService
-from services.nutrition_details_service import NutritionDetailsService
+from services.nutrition_search_service import AsyncNutritionSearchService
+from services.nutrition_details_service import AsyncNutritionDetailsService
 from services.nutrition_summary_service import NutritionSummaryService
+from services.nutrition_fallback import FALLBACK_SOURCE, estimate_nutrition
+from services.mext_food_index import MEXT_SOURCE, contains_japanese, get_mext_food_index
+from services.search_ranker import best_search_hit
+
+# 再ランキングの候補として取得する検索結果の件数
+SEARCH_PAGE_SIZE = 25
+USDA_SOURCE = "USDA FoodData Central"
+
+
+def _mext_result(query: str) -> Optional[Dict[str, Any]]:
+    """日本語の食材名を日本食品標準成分表から引く（該当なし・英語のクエリは None）"""
+    if not contains_japanese(query):
+        return None
+    index = get_mext_food_index()
+    summary = index.lookup(query) if index else None
+    if summary is None:
+        return None
+    print(f"🍙 日本食品標準成分表から取得: {query} → {summary['description']}")
+    return {
+        "success": True,
+        "nutrition_info": summary,
+        "fdc_id": None,
+        "source": MEXT_SOURCE,
+        "query": query
+    }
+
+
+def _fallback_result(query: str, error: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """クォータ制限で USDA から取得できない場合に推定値の結果を組み立てる（推定値がなければ None）"""
+    if not error.get("quota_limited"):
+        return None
+    estimate = estimate_nutrition(query)
+    if estimate is None:
+        return None
+    print(f"🧮 USDA API クォータ制限中のため推定値を使用: {estimate['description']}")
+    return {
+        "success": True,
+        "nutrition_info": estimate,
+        "fdc_id": None,
+        "source": FALLBACK_SOURCE,
+        "estimated": True,
+        "query": query
+    }
 
 @function_tool(strict_mode=False)
-def get_nutrition_info_tool(
+async def get_nutrition_info_tool(
     query: str,
     fdc_id: Optional[int] = None,
     data_types: Optional[List[str]] = None
@@ -13,6 +57,9 @@ def get_nutrition_info_tool(
     """
     食材の栄養情報を一括取得します。
     検索→詳細取得→整理まで自動実行し、整理された栄養情報を返します。
+    検索結果は全件を再ランキングし、データタイプ・キーワード一致・調理状態から最も適した食品を選びます。
+    検索結果に主要栄養素（エネルギー・たんぱく質・脂質・炭水化物）が含まれる場合は詳細取得を省略します。
+    日本語の食材名は日本食品標準成分表（八訂）を優先して検索します。
     
     Args:
         query: 検索クエリ（食材名）
@@ -22,11 +69,17 @@ def get_nutrition_info_tool(
     Returns:
         整理された栄養情報 または {"error": "..."}
     """
-    search_service = NutritionSearchService()
-    details_service = NutritionDetailsService()
+    search_service = AsyncNutritionSearchService()
+    details_service = AsyncNutritionDetailsService()
     summary_service = NutritionSummaryService()
     
     try:
+        # Step 0: 日本語の食材名は日本食品標準成分表を優先（翻訳・USDA検索が不要）
+        if not fdc_id:
+            mext_result = _mext_result(query)
+            if mext_result:
+                return mext_result
+
         # Step 1: fdcIdの取得（検索 or 直接指定）
         if fdc_id:
             print(f"🎯 fdcId指定: {fdc_id}")
@@ -34,24 +87,43 @@ def get_nutrition_info_tool(
             description = f"fdcId: {fdc_id}"
         else:
             print(f"🔍 検索実行: {query}")
-            search_result = search_service.search(query, data_types, 5, 1)
+            search_result = await search_service.search(query, data_types, SEARCH_PAGE_SIZE, 1)
             
             if "error" in search_result:
+                fallback = _fallback_result(query, search_result)
+                if fallback:
+                    return fallback
                 error_msg = search_result.get("error", "Unknown"); return {"error": f"検索失敗: {error_msg}"}
             
             foods = search_result.get("foods", [])
             if not foods:
                 return {"error": f"'{query}'の検索結果が見つかりませんでした"}
             
-            target_fdc_id = foods[0]["fdcId"]
-            description = foods[0].get("description", "N/A")
+            # 検索結果全体を再ランキングして最適な食品を選ぶ
+            best = best_search_hit(query, foods)
+            target_fdc_id = best["fdcId"]
+            description = best.get("description", "N/A")
             print(f"✅ 検索成功: fdcId={target_fdc_id}, description={description}")
+
+            # 検索結果に主要栄養素が揃っていれば詳細取得を省略
+            summary = summary_service.summarize_search_hit(best)
+            if summary:
+                return {
+                    "success": True,
+                    "nutrition_info": summary,
+                    "fdc_id": target_fdc_id,
+                    "source": USDA_SOURCE,
+                    "query": query
+                }
         
         # Step 2: 詳細情報取得
         print(f"📊 詳細情報取得: fdcId={target_fdc_id}")
-        details = details_service.get_details(target_fdc_id)
+        details = await details_service.get_details(target_fdc_id)
         
         if "error" in details:
+            fallback = _fallback_result(query, details)
+            if fallback:
+                return fallback
             error_msg = details.get("error", "Unknown"); return {"error": f"詳細取得失敗: {error_msg}"}
         
         # Step 3: データ整理
@@ -63,10 +135,138 @@ def get_nutrition_info_tool(
             "success": True,
             "nutrition_info": summary,
             "fdc_id": target_fdc_id,
-            "source": "USDA FoodData Central",
+            "source": USDA_SOURCE,
             "query": query
         }
         
     except Exception as e:
         print(f"❌ get_nutrition_info_tool エラー: {str(e)}")
         return {"error": f"処理中にエラーが発生しました: {str(e)}"}
+
+
+async def get_nutrition_info_batch_core(
+    queries: List[str],
+    data_types: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    複数の食材の栄養情報をまとめて取得します（コア関数）。
+    食材ごとの検索は並行して実行し、詳細取得は20件ごとに1回のリクエストにまとめます。
+
+    Args:
+        queries: 検索クエリ（食材名）のリスト
+        data_types: データタイプフィルタ（例: ["Foundation", "SR Legacy"]）
+
+    Returns:
+        {"success": True, "results": [食材ごとの結果（source に出典）], "sources": [出典の一覧], ...}
+        または {"error": "..."}
+    """
+    search_service = AsyncNutritionSearchService()
+    details_service = AsyncNutritionDetailsService()
+    summary_service = NutritionSummaryService()
+
+    try:
+        # Step 0: 日本語の食材名は日本食品標準成分表を優先
+        mext_results = {query: _mext_result(query) for query in queries}
+        remote_queries = [query for query in queries if not mext_results[query]]
+
+        # Step 1: 残りの食材ごとに fdcId を特定（検索は並行実行、結果はキャッシュされる）
+        print(f"🔍 検索実行: {remote_queries}")
+        search_results = await asyncio.gather(
+            *(search_service.search(query, data_types, SEARCH_PAGE_SIZE, 1) for query in remote_queries)
+        )
+        search_by_query = dict(zip(remote_queries, search_results))
+        results: List[Dict[str, Any]] = []
+        fdc_ids: List[int] = []
+        for query in queries:
+            if mext_results[query]:
+                results.append(mext_results[query])
+                continue
+            search_result = search_by_query[query]
+            if "error" in search_result:
+                fallback = _fallback_result(query, search_result)
+                if fallback:
+                    results.append(fallback)
+                    continue
+                results.append({"query": query, "error": f"検索失敗: {search_result['error']}"})
+                continue
+            foods = search_result.get("foods", [])
+            if not foods:
+                results.append({"query": query, "error": f"'{query}'の検索結果が見つかりませんでした"})
+                continue
+            best = best_search_hit(query, foods)
+            target_fdc_id = best["fdcId"]
+            # 検索結果に主要栄養素が揃っていれば詳細取得の対象から外す
+            summary = summary_service.summarize_search_hit(best)
+            if summary:
+                results.append({
+                    "query": query, "fdc_id": target_fdc_id, "success": True,
+                    "nutrition_info": summary, "source": USDA_SOURCE
+                })
+                continue
+            fdc_ids.append(target_fdc_id)
+            results.append({"query": query, "fdc_id": target_fdc_id, "source": USDA_SOURCE})
+
+        # Step 2: 主要栄養素が不足していた食材の詳細情報を一括取得
+        print(f"📊 詳細情報一括取得: fdcIds={fdc_ids}")
+        details_result = await details_service.get_details_many(fdc_ids) if fdc_ids else {"foods": {}}
+        if "error" in details_result:
+            return {"error": f"詳細取得失敗: {details_result['error']}"}
+        details_by_id = details_result.get("foods", {})
+
+        # Step 3: データ整理
+        pending: List[Dict[str, Any]] = []
+        pending_details: List[Dict[str, Any]] = []
+        for index, result in enumerate(results):
+            if "error" in result or "nutrition_info" in result:
+                continue
+            details = details_by_id.get(result["fdc_id"])
+            if details is None:
+                fallback = _fallback_result(result["query"], details_result)
+                if fallback:
+                    results[index] = fallback
+                    continue
+                result["error"] = f"詳細取得失敗: fdcId={result['fdc_id']}"
+                continue
+            pending.append(result)
+            pending_details.append(details)
+
+        # 取得できた食品はまとめて1つの栄養素行列で100gあたりに正規化
+        if pending_details:
+            matrix, _ = summary_service.summarize_many(pending_details)
+            for result, row in zip(pending, summary_service.summary_rows(pending_details, matrix)):
+                result["success"] = True
+                result["nutrition_info"] = row.to_dict()
+
+        success_count = sum(1 for result in results if result.get("success"))
+        # 出典は食材ごとの source に記録し、全体には取得できた食材の出典の一覧を返す
+        sources = list(dict.fromkeys(result["source"] for result in results if result.get("success")))
+        print(f"✅ 栄養情報一括取得完了: {success_count}/{len(queries)}件")
+        return {
+            "success": success_count > 0,
+            "results": results,
+            "sources": sources,
+            "count": success_count
+        }
+
+    except Exception as e:
+        print(f"❌ get_nutrition_info_batch_tool エラー: {str(e)}")
+        return {"error": f"処理中にエラーが発生しました: {str(e)}"}
+
+
+@function_tool(strict_mode=False)
+async def get_nutrition_info_batch_tool(
+    queries: List[str],
+    data_types: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    複数の食材の栄養情報を一括取得します。
+    1回の食事で複数の食材が報告された場合に使用し、詳細取得を20件ごとに1回のリクエストにまとめます。
+
+    Args:
+        queries: 検索クエリ（食材名）のリスト（例: ["ご飯", "納豆", "miso soup"]。日本語は日本食品標準成分表を優先）
+        data_types: データタイプフィルタ（例: ["Foundation", "SR Legacy"]）
+
+    Returns:
+        食材ごとの整理された栄養情報のリスト または {"error": "..."}
+    """
+    return await get_nutrition_info_batch_core(queries, data_types)
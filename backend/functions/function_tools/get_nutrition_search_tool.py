@@ -1,9 +1,9 @@
 from agents import function_tool
 from typing import Any, Dict, List, Optional
-from services.nutrition_search_service import NutritionSearchService
+from services.nutrition_search_service import AsyncNutritionSearchService
 
 @function_tool(strict_mode=False)
-def get_nutrition_search_tool(
+async def get_nutrition_search_tool(
     query: str,
     data_types: Optional[List[str]] = None,
     page_size: int = 25,
@@ -22,5 +22,5 @@ def get_nutrition_search_tool(
     Returns:
         API レスポンスJSON または {"error": "..."}
     """
-    service = NutritionSearchService()
-    return service.search(query, data_types, page_size, page_number)
\ No newline at end of file
+    service = AsyncNutritionSearchService()
+    return await service.search(query, data_types, page_size, page_number)
\ No newline at end of file
@@ -1,30 +1,45 @@
+import asyncio
 from agents import function_tool
 from services.nutrition_service import NutritionService
 
 @function_tool(strict_mode=False)
-def save_nutrition_entry_tool(
+async def save_nutrition_entry_tool(
     user_id: str,
     entry_date: str | None,
     meal_type: str | None,
     food_item: str | None,
     quantity_desc: str | None,
-    nutrients: dict | None
+    nutrients: dict | None = None,
+    nutrients_per_100g: dict | None = None,
+    fdc_id: int | None = None
 ) -> dict:
     """
     栄養エントリを保存します。型不一致・バリデーションエラーは success=False で返却します。
+
+    Args:
+        quantity_desc: 分量（例: "170g", "1個", "1枚", "大さじ2"）
+        nutrients: 記録量あたりの栄養価（nutrients_per_100g を渡す場合は省略可）
+        nutrients_per_100g: 栄養情報ツールの nutrition_info（100gあたり）。渡すと分量から栄養価を自動計算します
+        fdc_id: 栄養情報ツールの fdc_id（USDA の目安量を分量換算に使用）
+
+    Returns:
+        {"success": True, "entry_id": ..., "quantity_g": ..., "nutrients": {...}} など
     """
     service = NutritionService()
-    return service.save_entry(
+    return await asyncio.to_thread(
+        service.save_entry,
         user_id,
         entry_date,
         meal_type,
         food_item,
         quantity_desc,
-        nutrients
+        nutrients,
+        nutrients_per_100g,
+        fdc_id
     )
 
 @function_tool(strict_mode=False)
-def get_nutrition_entry_tool(
+async def get_nutrition_entry_tool(
     user_id: str,
     entry_id: str | None = None
 ) -> dict:
@@ -32,10 +47,10 @@ def get_nutrition_entry_tool(
     栄養エントリを取得するツール（サービス呼び出し版）
     """
     service = NutritionService()
-    return service.get_entry(user_id, entry_id)
+    return await asyncio.to_thread(service.get_entry, user_id, entry_id)
 
 @function_tool(strict_mode=False)
-def get_nutrition_entries_by_date_tool(
+async def get_nutrition_entries_by_date_tool(
     user_id: str,
     entry_date: str | None = None
 ) -> dict:
@@ -50,10 +65,10 @@ def get_nutrition_entries_by_date_tool(
         該当する栄養エントリのリスト
     """
     service = NutritionService()
-    return service.get_entries_by_date(user_id, entry_date)
+    return await asyncio.to_thread(service.get_entries_by_date, user_id, entry_date)
 
 @function_tool(strict_mode=False)
-def get_all_nutrition_entries_tool(
+async def get_all_nutrition_entries_tool(
     user_id: str,
     limit: int = 50
 ) -> dict:
@@ -68,4 +83,4 @@ def get_all_nutrition_entries_tool(
         栄養エントリのリスト
     """
     service = NutritionService()
-    return service.get_all_entries(user_id, limit)
+    return await asyncio.to_thread(service.get_all_entries, user_id, limit)
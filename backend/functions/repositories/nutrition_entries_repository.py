@@ -14,10 +14,12 @@ class NutritionEntriesRepository:
         meal_type: str,
         food_item: str,
         quantity_desc: str,
-        nutrients: dict
+        nutrients: dict,
+        quantity_g: float | None = None
     ) -> str:
         """
         新しい栄養エントリを作成し、entry_id を返します。
+        quantity_g は分量をグラムに換算できた場合のみ保存します。
         """
         entry_id = str(uuid.uuid4())
         now = datetime.utcnow().isoformat()
@@ -31,6 +33,8 @@ class NutritionEntriesRepository:
             "nutrients": nutrients,
             "created_at": now
         }
+        if quantity_g is not None:
+            data["quantity_g"] = quantity_g
         # users/{user_id}/nutrition_entries/{entry_id} にドキュメントを作成
         self.root.document(user_id).collection("nutrition_entries").document(entry_id).set(data)
         return entry_id
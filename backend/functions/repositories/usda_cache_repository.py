@@ -0,0 +1,44 @@
+from firebase_admin import firestore
+from datetime import datetime, timezone
+import hashlib
+
+
+class UsdaCacheRepository:
+    """
+    USDA APIレスポンスのキャッシュを Firestore に保存するリポジトリ
+    ドキュメントIDはキャッシュキーのSHA-1、本文は圧縮済みバイト列です。
+    """
+
+    def __init__(self, collection_name: str) -> None:
+        self.db = firestore.client()
+        self.col = self.db.collection(collection_name)
+
+    @staticmethod
+    def _doc_id(key: str) -> str:
+        return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> tuple[bytes, float | None] | None:
+        """
+        キャッシュエントリを取得し、(payload, expires_at[epoch秒]) を返します。
+        """
+        doc = self.col.document(self._doc_id(key)).get()
+        if not doc.exists:
+            return None
+        data = doc.to_dict()
+        # ハッシュ衝突時は別キーのデータとみなしてミス扱い
+        if data.get("key") != key:
+            return None
+        expires_at = data.get("expires_at")
+        return bytes(data["payload"]), expires_at.timestamp() if expires_at else None
+
+    def set(self, key: str, payload: bytes, expires_at: float | None) -> None:
+        """
+        キャッシュエントリを保存します。expires_at は Firestore TTL ポリシーの対象フィールドです。
+        """
+        data = {
+            "key": key,
+            "payload": payload,
+            "expires_at": datetime.fromtimestamp(expires_at, tz=timezone.utc) if expires_at else None,
+            "created_at": datetime.utcnow().isoformat(),
+        }
+        self.col.document(self._doc_id(key)).set(data)
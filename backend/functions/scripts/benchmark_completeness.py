@@ -0,0 +1,85 @@
+"""
+必須栄養素の完全性判定のベンチマーク
+
+使い方:
+    python scripts/benchmark_completeness.py [--nutrients 120] [--foods 1000]
+
+Foundation 食品相当の栄養素数（既定 120 件）を持つ食品について、従来の
+「必須栄養素ごとに全栄養素名を部分文字列検索する」方法と NutrientMatcher の
+1食品あたりの処理時間を比較します。
+"""
+import argparse
+import os
+import sys
+import time
+
+# スクリプト自身のディレクトリ
+script_dir = os.path.dirname(os.path.abspath(__file__))
+# プロジェクトルート
+project_root = os.path.abspath(os.path.join(script_dir, os.pardir))
+# backend/functions をモジュールとして読み込めるようパス追加
+sys.path.append(project_root)
+
+from services.nutrient_completeness import ESSENTIAL_MATCHER, ESSENTIAL_NUTRIENTS
+
+# Foundation 食品に実際に現れる栄養素名（必須栄養素以外の微量成分を含む）
+FOUNDATION_NAMES = [
+    "Water", "Energy", "Energy (Atwater General Factors)", "Energy (Atwater Specific Factors)",
+    "Nitrogen", "Protein", "Total lipid (fat)", "Ash", "Carbohydrate, by difference",
+    "Fiber, total dietary", "Sugars, Total", "Sucrose", "Glucose", "Fructose", "Lactose",
+    "Maltose", "Starch", "Calcium, Ca", "Iron, Fe", "Magnesium, Mg", "Phosphorus, P",
+    "Potassium, K", "Sodium, Na", "Zinc, Zn", "Copper, Cu", "Manganese, Mn", "Selenium, Se",
+    "Vitamin C, total ascorbic acid", "Thiamin", "Riboflavin", "Niacin", "Pantothenic acid",
+    "Vitamin B-6", "Folate, total", "Vitamin B-12", "Vitamin A, RAE", "Retinol",
+    "Vitamin E (alpha-tocopherol)", "Vitamin D (D2 + D3)", "Vitamin K (phylloquinone)",
+    "Cholesterol", "Fatty acids, total saturated", "Fatty acids, total monounsaturated",
+    "Fatty acids, total polyunsaturated", "Tryptophan", "Threonine", "Isoleucine", "Leucine",
+    "Lysine", "Methionine", "Cystine", "Phenylalanine", "Tyrosine", "Valine", "Arginine",
+    "Histidine", "Alanine", "Aspartic acid", "Glutamic acid", "Glycine", "Proline", "Serine",
+]
+
+
+def foundation_nutrient_names(count: int):
+    """Foundation 食品相当の栄養素名リスト（足りない分は脂肪酸の名称で補う）"""
+    names = list(FOUNDATION_NAMES)
+    index = 0
+    while len(names) < count:
+        names.append(f"PUFA {14 + index % 10}:{index // 10}")
+        index += 1
+    return names[:count]
+
+
+def naive_count(nutrient_names):
+    """従来の判定（必須栄養素 × 栄養素名の部分文字列検索）"""
+    return sum(1 for essential in ESSENTIAL_NUTRIENTS
+               if any(essential in name for name in nutrient_names))
+
+
+def measure(label, func, foods):
+    start = time.perf_counter()
+    for names in foods:
+        func(names)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<16} {elapsed * 1e6 / len(foods):8.1f} µs/食品")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="必須栄養素の完全性判定のベンチマーク")
+    parser.add_argument("--nutrients", type=int, default=120, help="1食品あたりの栄養素数（既定: 120）")
+    parser.add_argument("--foods", type=int, default=1000, help="判定する食品数（既定: 1000）")
+    args = parser.parse_args()
+
+    names = foundation_nutrient_names(args.nutrients)
+    # 食品ごとに栄養素の並びが異なる状況を再現する
+    foods = [names[i % len(names):] + names[:i % len(names)] for i in range(args.foods)]
+    assert naive_count(names) == ESSENTIAL_MATCHER.count(names)
+
+    print(f"📊 栄養素 {args.nutrients} 件 × 食品 {args.foods} 件（必須栄養素 {len(ESSENTIAL_NUTRIENTS)} 件）")
+    naive = measure("部分文字列検索", naive_count, foods)
+    matcher = measure("NutrientMatcher", ESSENTIAL_MATCHER.count, foods)
+    print(f"✅ {naive / matcher:.1f} 倍高速")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""
+食事テキストの分かち書き用の食品辞書 data/food_dictionary.tsv を作成するスクリプト
+
+使い方:
+    python scripts/build_food_dictionary.py
+    python scripts/build_food_dictionary.py --mext data/mext_food_composition.csv --output data/food_dictionary.tsv
+
+日本食品標準成分表の CSV（食品名・よみがな・別名）、基本食材の翻訳パターン、目安量テーブルの別名を
+「表記<TAB>食品名<TAB>英語名」の形式でまとめます。食品以外の語は食品名を "-" として登録します。成分表を scripts/ingest_mext.py で本表から
+取り込み直した場合は、このスクリプトも再実行してください。
+"""
+import argparse
+import csv
+import os
+import sys
+
+# スクリプト自身のディレクトリ
+script_dir = os.path.dirname(os.path.abspath(__file__))
+# プロジェクトルート
+project_root = os.path.abspath(os.path.join(script_dir, os.pardir))
+# backend/functions をモジュールとして読み込めるようパス追加
+sys.path.append(project_root)
+
+from config import FOOD_DICTIONARY_PATH, MEXT_FOOD_TABLE_PATH
+from services.food_segmenter import NON_FOOD
+from services.keyword_matcher import BASIC_FOOD_TRANSLATIONS
+from services.mext_food_index import contains_japanese
+from services.portion_service import PORTION_TABLE
+
+# 成分表の食品のうち、基本食材の翻訳パターンに英語名がないもの（食品名 → 英語名）
+MEXT_TRANSLATIONS = {
+    "ご飯": "rice",
+    "玄米ご飯": "brown rice",
+    "おにぎり": "rice ball",
+    "もち": "rice cake",
+    "うどん": "udon",
+    "そば": "soba",
+    "中華めん": "chinese noodles",
+    "スパゲッティ": "spaghetti",
+    "さつまいも": "sweet potato",
+    "みかん": "mandarin orange",
+    "ミニトマト": "cherry tomato",
+    "焼きのり": "nori",
+    "絹ごし豆腐": "silken tofu",
+    "ゆで卵": "boiled egg",
+    "鶏むね肉": "chicken breast",
+    "牛ひき肉": "ground beef",
+    "豚ひき肉": "ground pork",
+    "ロースハム": "ham",
+    "ウインナー": "sausage",
+    "さば": "mackerel",
+    "バター": "butter",
+    "ヨーグルト": "yogurt",
+}
+
+# 短い食品名が長い語の一部として誤検出されないよう、辞書に含めておく複合語
+EXTRA_ENTRIES = (
+    ("米粉", "米粉", "rice flour"),
+    ("米酢", "米酢", "rice vinegar"),
+    ("パン粉", "パン粉", "bread crumbs"),
+    ("卵焼き", "卵焼き", "rolled omelet"),
+    ("目玉焼き", "目玉焼き", "fried egg"),
+    ("鶏ガラ", "鶏ガラ", "chicken stock"),
+    ("味噌汁", "味噌汁", "miso soup"),
+    ("みそ汁", "味噌汁", "miso soup"),
+    ("パンプキン", "かぼちゃ", "pumpkin"),
+    ("パンプキンスープ", "パンプキンスープ", "pumpkin soup"),
+    ("バターロール", "バターロール", "butter roll"),
+    ("ピーナッツバター", "ピーナッツバター", "peanut butter"),
+    ("チーズケーキ", "チーズケーキ", "cheesecake"),
+    ("ミルクティー", "ミルクティー", "milk tea"),
+    ("トマトジュース", "トマトジュース", "tomato juice"),
+    ("ライスペーパー", "ライスペーパー", "rice paper"),
+    ("オムライス", "オムライス", "omurice"),
+    ("蒸しパン", "蒸しパン", "steamed bun"),
+    ("パンケーキ", "パンケーキ", "pancake"),
+    ("メロンパン", "メロンパン", "melon bread"),
+    ("カレーパン", "カレーパン", "curry bread"),
+    ("ケチャップ", "ケチャップ", "ketchup"),
+    ("ジュース", "ジュース", "juice"),
+)
+
+# 食品名を含むが食品ではない語（一致した範囲は読み飛ばす）
+NON_FOOD_WORDS = (
+    "フライパン",
+    "パンフレット",
+    "パンツ",
+    "ジャパン",
+    "米国",
+)
+
+
+def mext_entries(path):
+    """成分表の各食品の表記（食品名・よみがな・別名）を (表記, 食品名, 英語名) で返す"""
+    if not os.path.exists(path):
+        return
+    with open(path, encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            name = row.get("name") or row.get("official_name", "")
+            aliases = [alias for alias in (row.get("aliases") or "").split("|") if alias]
+            surfaces = [name, row.get("reading", ""), *aliases]
+            # 別名のいずれかに翻訳があれば食品全体の英語名として使う（鶏もも肉 → 鶏肉 → chicken）
+            translation = next(
+                (BASIC_FOOD_TRANSLATIONS[s] for s in surfaces if s in BASIC_FOOD_TRANSLATIONS),
+                MEXT_TRANSLATIONS.get(name, "")
+            )
+            for surface in surfaces:
+                if surface:
+                    yield surface, name, BASIC_FOOD_TRANSLATIONS.get(surface, translation)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="食事テキストの分かち書き用の食品辞書を作成します")
+    parser.add_argument("--mext", default=MEXT_FOOD_TABLE_PATH, help=f"成分表の CSV（既定: {MEXT_FOOD_TABLE_PATH}）")
+    parser.add_argument("--output", default=FOOD_DICTIONARY_PATH, help=f"出力先（既定: {FOOD_DICTIONARY_PATH}）")
+    args = parser.parse_args()
+
+    entries = {}
+    for surface, food, translation in mext_entries(args.mext):
+        entries.setdefault(surface, (food, translation))
+    for japanese, english in BASIC_FOOD_TRANSLATIONS.items():
+        entries.setdefault(japanese, (japanese, english))
+    for entry in PORTION_TABLE:
+        # 目安量テーブルの英語の別名（ご飯 → rice）を、英語名のない表記の翻訳として使う
+        english = next(
+            (alias for alias in entry["aliases"] if not contains_japanese(alias)),
+            MEXT_TRANSLATIONS.get(entry["name"], "")
+        )
+        for alias in entry["aliases"]:
+            if not contains_japanese(alias):
+                continue
+            food, translation = entries.setdefault(alias, (entry["name"], BASIC_FOOD_TRANSLATIONS.get(alias, english)))
+            if not translation and english:
+                entries[alias] = (food, english)
+    for surface, food, translation in EXTRA_ENTRIES:
+        entries.setdefault(surface, (food, translation))
+    for word in NON_FOOD_WORDS:
+        entries[word] = (NON_FOOD, "")
+
+    with open(args.output, "w", encoding="utf-8", newline="") as f:
+        f.write("# 表記\t食品名\t英語名（scripts/build_food_dictionary.py で生成）\n")
+        for surface in sorted(entries):
+            food, translation = entries[surface]
+            f.write(f"{surface}\t{food}\t{translation}\n")
+    print(f"✅ 食品辞書を作成しました: {args.output} ({len(entries)}件)")
+
+
+if __name__ == '__main__':
+    main()
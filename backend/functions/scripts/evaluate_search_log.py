@@ -0,0 +1,88 @@
+"""
+記録された検索ログ（JSON Lines）をまとめて評価するスクリプト
+
+使い方:
+    python scripts/evaluate_search_log.py searches.jsonl --output evaluations.jsonl
+    python scripts/evaluate_search_log.py searches.jsonl --workers 8 --detail-level summary
+
+入力の各行は {"query": ..., "search_results": {...}} の形式です（"target_food" と
+"evaluation_focus" は任意）。評価はプロセスプールで並列に行い、完了した順に
+{"index": 入力の行番号(0始まり), "query": ..., 評価結果...} を出力ファイルへ書き出します。
+"""
+import argparse
+import json
+import os
+import sys
+from collections import Counter
+
+# スクリプト自身のディレクトリ
+script_dir = os.path.dirname(os.path.abspath(__file__))
+# プロジェクトルート
+project_root = os.path.abspath(os.path.join(script_dir, os.pardir))
+# backend/functions をモジュールとして読み込めるようパス追加
+sys.path.append(project_root)
+
+from function_tools.evaluate_nutrition_search_batch import (
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_REPORT_INTERVAL,
+    evaluate_nutrition_search_batch,
+)
+from function_tools.evaluate_nutrition_search_tool import DETAIL_LEVELS
+
+
+def read_pairs(path):
+    """JSON Lines を1行ずつ読み込む（空行は読み飛ばす）"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="検索ログの (クエリ, 検索結果) をまとめて評価します")
+    parser.add_argument("source", help="評価対象の JSON Lines ファイル")
+    parser.add_argument("--output", default="search_evaluations.jsonl", help="出力先（既定: search_evaluations.jsonl）")
+    parser.add_argument("--workers", type=int, default=None, help="ワーカープロセス数（既定: CPU数）")
+    parser.add_argument("--detail-level", choices=DETAIL_LEVELS, default="score", help="評価結果の詳細度（既定: score）")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help=f"ワーカーへ一度に渡す件数（既定: {DEFAULT_CHUNK_SIZE}）")
+    parser.add_argument(
+        "--report-interval",
+        type=float,
+        default=DEFAULT_REPORT_INTERVAL,
+        help=f"進捗を表示する間隔（秒、既定: {DEFAULT_REPORT_INTERVAL}）",
+    )
+    args = parser.parse_args()
+
+    grades = Counter()
+    scores = []
+    errors = 0
+    with open(args.output, "w", encoding="utf-8") as out:
+        for outcome in evaluate_nutrition_search_batch(
+            read_pairs(args.source),
+            workers=args.workers,
+            detail_level=args.detail_level,
+            chunk_size=args.chunk_size,
+            report_interval=args.report_interval,
+        ):
+            result = outcome.result
+            out.write(json.dumps({"index": outcome.index, "query": outcome.query, **result}, ensure_ascii=False) + "\n")
+            if result.get("status") != "success":
+                errors += 1
+                continue
+            score = result.get("score", result.get("evaluation", {}).get("overall_assessment", {}).get("score"))
+            grade = result.get("grade", result.get("evaluation", {}).get("overall_assessment", {}).get("grade"))
+            if score is not None:
+                scores.append(score)
+            grades[grade] += 1
+
+    if scores:
+        print(f"📊 平均スコア: {sum(scores) / len(scores):.3f}（{len(scores)}件）")
+    if grades:
+        print("📊 グレード分布: " + ", ".join(f"{grade}: {count}" for grade, count in sorted(grades.items())))
+    if errors:
+        print(f"⚠️ 評価できなかった件数: {errors}")
+    print(f"✅ 評価結果を書き出しました: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
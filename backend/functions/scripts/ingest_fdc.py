@@ -0,0 +1,55 @@
+"""
+USDA FoodData Central の一括ダウンロードをローカルミラー（SQLite + FTS5）に取り込むスクリプト
+
+使い方:
+    python scripts/ingest_fdc.py FoodData_Central_foundation_food_json_2024-10-31.json \
+        FoodData_Central_sr_legacy_food_json_2018-04.json
+    python scripts/ingest_fdc.py FoodData_Central_csv_2024-10-31/ --db data/fdc.sqlite3
+
+JSON ファイルと CSV ディレクトリ（food.csv / nutrient.csv / food_nutrient.csv）のどちらにも対応します。
+取り込み後は NUTRITION_DATA_SOURCE=local または local_then_remote で利用できます。
+"""
+import argparse
+import os
+import sys
+import time
+
+# スクリプト自身のディレクトリ
+script_dir = os.path.dirname(os.path.abspath(__file__))
+# プロジェクトルート
+project_root = os.path.abspath(os.path.join(script_dir, os.pardir))
+# backend/functions をモジュールとして読み込めるようパス追加
+sys.path.append(project_root)
+
+from config import FDC_LOCAL_DB_PATH
+from services.fdc_local_store import FdcLocalStore, iter_fdc_csv_foods, iter_fdc_json_foods
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FoodData Central の一括ダウンロードをローカルDBに取り込みます")
+    parser.add_argument("sources", nargs="+", help="JSON ファイルまたは CSV ディレクトリ")
+    parser.add_argument("--db", default=FDC_LOCAL_DB_PATH, help=f"出力先のSQLiteファイル（既定: {FDC_LOCAL_DB_PATH}）")
+    parser.add_argument(
+        "--data-types",
+        nargs="+",
+        default=["Foundation", "SR Legacy"],
+        help="CSV から取り込む dataType（既定: Foundation SR Legacy）",
+    )
+    args = parser.parse_args()
+
+    store = FdcLocalStore(args.db, readonly=False)
+    for source in args.sources:
+        started = time.perf_counter()
+        if os.path.isdir(source):
+            foods = iter_fdc_csv_foods(source, args.data_types)
+        else:
+            foods = iter_fdc_json_foods(source)
+        count = store.ingest(foods)
+        print(f"✅ 取り込み完了: {source} ({count}件, {time.perf_counter() - started:.1f}秒)")
+
+    print(f"🗄️ ローカルFDCデータベース: {args.db} (合計{store.count()}件)")
+    store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+文部科学省「日本食品標準成分表（八訂）」の本表を data/mext_food_composition.csv に取り込むスクリプト
+
+使い方:
+    python scripts/ingest_mext.py 20230428-mxt_kagsei-mext_00001_012.csv
+
+本表の Excel を CSV（UTF-8）で保存したものを入力とします。見出し行から
+「食品番号」「食品名」「エネルギー(kcal)」「たんぱく質」「脂質」「炭水化物」
+「食物繊維総量」「ナトリウム」「カルシウム」「鉄」の列を探して取り込みます。
+既存のCSVにある食品番号は、表示名・よみがな・別名を引き継いだまま栄養価だけを更新します。
+"""
+import argparse
+import csv
+import os
+import re
+import sys
+
+# スクリプト自身のディレクトリ
+script_dir = os.path.dirname(os.path.abspath(__file__))
+# プロジェクトルート
+project_root = os.path.abspath(os.path.join(script_dir, os.pardir))
+# backend/functions をモジュールとして読み込めるようパス追加
+sys.path.append(project_root)
+
+from config import MEXT_FOOD_TABLE_PATH
+from services.mext_food_index import NUTRIENT_COLUMNS
+
+OUTPUT_COLUMNS = ("food_number", "name", "official_name", "reading", "aliases", *NUTRIENT_COLUMNS)
+
+# 本表の見出し → 出力列（見出しは空白を除いて比較する）
+HEADER_COLUMNS = {
+    "食品番号": "food_number",
+    "食品名": "official_name",
+    "たんぱく質": "protein_g",
+    "脂質": "fat_g",
+    "炭水化物": "carbohydrates_g",
+    "食物繊維総量": "fiber_g",
+    "ナトリウム": "sodium_mg",
+    "カルシウム": "calcium_mg",
+    "鉄": "iron_mg",
+}
+
+
+def parse_value(value: str) -> str:
+    """成分値の表記（Tr, (0), -, (1.2) など）を数値文字列に変換する。未測定は空文字"""
+    value = (value or "").strip().strip("()（）")
+    if value in ("", "-", "−", "*"):
+        return ""
+    if value == "Tr":
+        return "0"
+    return value if re.fullmatch(r"\d+(\.\d+)?", value) else ""
+
+
+def find_columns(rows):
+    """見出し行を探し、出力列 → 列番号の対応と、データ開始行を返す"""
+    for row_number, row in enumerate(rows):
+        cells = [re.sub(r"\s", "", cell) for cell in row]
+        if "食品番号" not in cells:
+            continue
+        columns = {}
+        for position, cell in enumerate(cells):
+            if cell in HEADER_COLUMNS and HEADER_COLUMNS[cell] not in columns:
+                columns[HEADER_COLUMNS[cell]] = position
+        # エネルギーは kJ と kcal の2列があるため、見出しの次の行まで見て kcal の列を探す
+        for look_ahead in rows[row_number:row_number + 3]:
+            for position, cell in enumerate(look_ahead):
+                if "kcal" in cell and "energy_kcal" not in columns:
+                    columns["energy_kcal"] = position
+        return columns, row_number + 1
+    raise ValueError("見出し行（食品番号）が見つかりません")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="日本食品標準成分表の本表CSVを取り込みます")
+    parser.add_argument("source", help="本表を CSV（UTF-8）で保存したファイル")
+    parser.add_argument("--output", default=MEXT_FOOD_TABLE_PATH, help=f"出力先（既定: {MEXT_FOOD_TABLE_PATH}）")
+    args = parser.parse_args()
+
+    existing = {}
+    if os.path.exists(args.output):
+        with open(args.output, encoding="utf-8", newline="") as f:
+            existing = {row["food_number"]: row for row in csv.DictReader(f)}
+
+    with open(args.source, encoding="utf-8-sig", newline="") as f:
+        rows = list(csv.reader(f))
+    columns, start = find_columns(rows)
+
+    foods = {}
+    for row in rows[start:]:
+        food_number = row[columns["food_number"]].strip() if len(row) > columns["food_number"] else ""
+        if not re.fullmatch(r"\d{5}", food_number):
+            continue
+        food = {"food_number": food_number, "official_name": row[columns["official_name"]].strip()}
+        for column in NUTRIENT_COLUMNS:
+            position = columns.get(column)
+            food[column] = parse_value(row[position]) if position is not None and position < len(row) else ""
+        previous = existing.get(food_number, {})
+        food["name"] = previous.get("name") or food["official_name"]
+        food["reading"] = previous.get("reading", "")
+        food["aliases"] = previous.get("aliases", "")
+        foods[food_number] = food
+
+    # 本表にない既存の行（手動で追加したもの）は残す
+    for food_number, row in existing.items():
+        foods.setdefault(food_number, row)
+
+    with open(args.output, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=OUTPUT_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        for food_number in sorted(foods):
+            writer.writerow(foods[food_number])
+    print(f"✅ 日本食品標準成分表を取り込みました: {args.output} ({len(foods)}件)")
+
+
+if __name__ == '__main__':
+    main()
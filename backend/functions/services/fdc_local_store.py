@@ -0,0 +1,343 @@
+"""
+USDA FoodData Central のローカルミラー（SQLite + FTS5）を提供するモジュール
+
+FoodData Central の一括ダウンロード（Foundation / SR Legacy の JSON または CSV）を
+scripts/ingest_fdc.py で取り込み、ネットワークなしで検索・詳細取得に応答します。
+レスポンスは USDA API と同じ形式（検索は /foods/search、詳細は compact_food_details）で返却します。
+"""
+
+import csv
+import json
+import os
+import re
+import sqlite3
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from config import FDC_LOCAL_DB_PATH, NUTRITION_DATA_SOURCE
+from services.usda_cache import decode_payload, encode_payload, normalize_query
+
+DATA_SOURCE_REMOTE = "remote"
+DATA_SOURCE_LOCAL = "local"
+DATA_SOURCE_LOCAL_THEN_REMOTE = "local_then_remote"
+DATA_SOURCES = (DATA_SOURCE_REMOTE, DATA_SOURCE_LOCAL, DATA_SOURCE_LOCAL_THEN_REMOTE)
+
+# 一括ダウンロードCSVの data_type を API の dataType 表記に変換
+CSV_DATA_TYPES = {
+    "foundation_food": "Foundation",
+    "sr_legacy_food": "SR Legacy",
+    "survey_fndds_food": "Survey (FNDDS)",
+    "branded_food": "Branded",
+}
+
+# bm25 スコアに加算する dataType ごとのペナルティ（小さいほど上位。Foundation を優先）
+DATA_TYPE_PENALTY = {
+    "Foundation": 0.0,
+    "SR Legacy": 0.5,
+    "Survey (FNDDS)": 1.0,
+    "Branded": 2.0,
+}
+DEFAULT_DATA_TYPE_PENALTY = 2.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS foods (
+    fdc_id INTEGER PRIMARY KEY,
+    data_type TEXT NOT NULL,
+    description TEXT NOT NULL,
+    details BLOB NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS foods_fts USING fts5(
+    description,
+    content='foods',
+    content_rowid='fdc_id',
+    tokenize='porter unicode61 remove_diacritics 2'
+);
+"""
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def _match_expression(query: str, operator: str) -> Optional[str]:
+    """検索クエリを FTS5 の MATCH 式に変換する（各語をフレーズとして引用）"""
+    tokens = _TOKEN_PATTERN.findall(normalize_query(query))
+    if not tokens:
+        return None
+    return f" {operator} ".join(f'"{token}"' for token in tokens)
+
+
+def _search_hit(details: Dict[str, Any], score: float) -> Dict[str, Any]:
+    """詳細レコードを /foods/search の結果要素と同じ形式に変換する"""
+    food_nutrients = []
+    for item in details.get("foodNutrients", []):
+        nutrient = item.get("nutrient", {})
+        food_nutrients.append({
+            "nutrientId": nutrient.get("id"),
+            "nutrientName": nutrient.get("name"),
+            "nutrientNumber": nutrient.get("number"),
+            "unitName": nutrient.get("unitName"),
+            "value": item.get("amount", 0),
+        })
+    return {
+        "fdcId": details.get("fdcId"),
+        "description": details.get("description"),
+        "dataType": details.get("dataType"),
+        "foodNutrients": food_nutrients,
+        "score": round(score, 4),
+    }
+
+
+class FdcLocalStore:
+    """
+    SQLite に取り込んだ FoodData Central の検索・詳細取得を行うストア
+    接続はスレッドごとに保持します（読み取り専用で開いた場合は複数スレッドから並行参照可能）。
+    """
+
+    def __init__(self, path: str = FDC_LOCAL_DB_PATH, readonly: bool = True):
+        self.path = path
+        self.readonly = readonly
+        self._local = threading.local()
+        if not readonly:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            self.connection.executescript(SCHEMA)
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            if self.readonly:
+                connection = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+            else:
+                connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._local.connection = connection
+        return connection
+
+    def close(self) -> None:
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    # ---- 取り込み ----
+
+    def ingest(self, foods: Iterable[Dict[str, Any]], batch_size: int = 1000) -> int:
+        """
+        USDA 詳細API形式の食品レコードを取り込み、全文検索インデックスを再構築します。
+
+        Returns:
+            取り込んだ件数
+        """
+        from services.nutrition_details_service import compact_food_details
+
+        if self.readonly:
+            raise RuntimeError("読み取り専用で開いたストアには取り込めません")
+
+        count = 0
+        rows: List[tuple] = []
+        with self.connection:
+            for food in foods:
+                compact = compact_food_details(food)
+                if compact.get("fdcId") is None or not compact.get("description"):
+                    continue
+                rows.append((int(compact["fdcId"]), compact.get("dataType", ""), compact["description"], encode_payload(compact)))
+                if len(rows) >= batch_size:
+                    self._insert(rows)
+                    count += len(rows)
+                    rows = []
+            if rows:
+                self._insert(rows)
+                count += len(rows)
+            self.connection.execute("INSERT INTO foods_fts(foods_fts) VALUES('rebuild')")
+        return count
+
+    def _insert(self, rows: List[tuple]) -> None:
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO foods (fdc_id, data_type, description, details) VALUES (?, ?, ?, ?)",
+            rows,
+        )
+
+    # ---- 参照 ----
+
+    def count(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM foods").fetchone()[0]
+
+    def search(
+        self,
+        query: str,
+        data_types: Optional[List[str]] = None,
+        page_size: int = 25,
+        page_number: int = 1,
+    ) -> Dict[str, Any]:
+        """
+        全文検索し、/foods/search と同じ形式で返却します。
+        全ての語を含む食品を優先し、該当がなければいずれかの語を含む食品を返します。
+        ランキングは bm25 に dataType のペナルティを加え、同点は説明文の短い順です。
+        """
+        page_size = max(1, page_size)
+        page_number = max(1, page_number)
+        penalty = " ".join(f"WHEN '{data_type}' THEN {value}" for data_type, value in DATA_TYPE_PENALTY.items())
+        type_filter = ""
+        params: List[Any] = []
+        if data_types:
+            type_filter = f" AND f.data_type IN ({', '.join('?' for _ in data_types)})"
+            params.extend(data_types)
+
+        for operator in ("AND", "OR"):
+            expression = _match_expression(query, operator)
+            if expression is None:
+                break
+            where = f"foods_fts MATCH ?{type_filter}"
+            total = self.connection.execute(
+                f"SELECT COUNT(*) FROM foods_fts JOIN foods f ON f.fdc_id = foods_fts.rowid WHERE {where}",
+                [expression, *params],
+            ).fetchone()[0]
+            if not total:
+                continue
+            rows = self.connection.execute(
+                f"""
+                SELECT f.details,
+                       bm25(foods_fts) + CASE f.data_type {penalty} ELSE {DEFAULT_DATA_TYPE_PENALTY} END AS rank
+                FROM foods_fts JOIN foods f ON f.fdc_id = foods_fts.rowid
+                WHERE {where}
+                ORDER BY rank, length(f.description)
+                LIMIT ? OFFSET ?
+                """,
+                [expression, *params, page_size, (page_number - 1) * page_size],
+            ).fetchall()
+            return {
+                "totalHits": total,
+                "currentPage": page_number,
+                "totalPages": (total + page_size - 1) // page_size,
+                "foods": [_search_hit(decode_payload(details), -rank) for details, rank in rows],
+            }
+
+        return {"totalHits": 0, "currentPage": page_number, "totalPages": 0, "foods": []}
+
+    def get_details(self, fdc_id: int) -> Optional[Dict[str, Any]]:
+        """fdcId の詳細（compact_food_details 形式）を返す。未登録は None"""
+        row = self.connection.execute("SELECT details FROM foods WHERE fdc_id = ?", (int(fdc_id),)).fetchone()
+        return decode_payload(row[0]) if row else None
+
+    def get_details_many(self, fdc_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """複数の fdcId の詳細を返す（未登録の fdcId は含まない）"""
+        ids = list(dict.fromkeys(int(fdc_id) for fdc_id in fdc_ids))
+        if not ids:
+            return {}
+        rows = self.connection.execute(
+            f"SELECT fdc_id, details FROM foods WHERE fdc_id IN ({', '.join('?' for _ in ids)})",
+            ids,
+        ).fetchall()
+        return {fdc_id: decode_payload(details) for fdc_id, details in rows}
+
+
+# ---- 一括ダウンロードの読み込み ----
+
+def iter_fdc_json_foods(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    一括ダウンロードのJSON（{"FoundationFoods": [...]} / {"SRLegacyFoods": [...]}）から食品を列挙する
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        yield from data
+        return
+    for value in data.values():
+        if isinstance(value, list):
+            yield from value
+
+
+def iter_fdc_csv_foods(directory: str, data_types: Iterable[str] = ("Foundation", "SR Legacy")) -> Iterator[Dict[str, Any]]:
+    """
+    一括ダウンロードのCSV（food.csv / nutrient.csv / food_nutrient.csv）から
+    詳細API形式の食品を組み立てて列挙する。food_portion.csv があれば目安量も取り込む
+    """
+    wanted = set(data_types)
+
+    foods: Dict[int, Dict[str, Any]] = {}
+    with open(os.path.join(directory, "food.csv"), encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            data_type = CSV_DATA_TYPES.get(row.get("data_type", ""), row.get("data_type", ""))
+            if data_type not in wanted:
+                continue
+            fdc_id = int(row["fdc_id"])
+            foods[fdc_id] = {"fdcId": fdc_id, "dataType": data_type, "description": row.get("description", "")}
+
+    nutrients: Dict[str, Dict[str, Any]] = {}
+    with open(os.path.join(directory, "nutrient.csv"), encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            nutrients[row["id"]] = {
+                "id": int(row["id"]),
+                "number": row.get("nutrient_nbr", ""),
+                "name": row.get("name", ""),
+                "unitName": row.get("unit_name", ""),
+            }
+
+    food_nutrients: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+    with open(os.path.join(directory, "food_nutrient.csv"), encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            fdc_id = int(row["fdc_id"])
+            nutrient = nutrients.get(row.get("nutrient_id", ""))
+            if fdc_id not in foods or nutrient is None or not row.get("amount"):
+                continue
+            food_nutrients[fdc_id].append({"nutrient": nutrient, "amount": float(row["amount"])})
+
+    food_portions: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+    portion_path = os.path.join(directory, "food_portion.csv")
+    if os.path.exists(portion_path):
+        measure_units: Dict[str, str] = {}
+        measure_unit_path = os.path.join(directory, "measure_unit.csv")
+        if os.path.exists(measure_unit_path):
+            with open(measure_unit_path, encoding="utf-8", newline="") as f:
+                measure_units = {row["id"]: row.get("name", "") for row in csv.DictReader(f)}
+        with open(portion_path, encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                fdc_id = int(row["fdc_id"])
+                if fdc_id not in foods or not row.get("gram_weight"):
+                    continue
+                food_portions[fdc_id].append({
+                    "amount": float(row["amount"]) if row.get("amount") else 1.0,
+                    "gramWeight": float(row["gram_weight"]),
+                    "modifier": row.get("modifier", ""),
+                    "portionDescription": row.get("portion_description", ""),
+                    "measureUnit": {"name": measure_units.get(row.get("measure_unit_id", ""), "")},
+                })
+
+    for fdc_id, food in foods.items():
+        food["foodNutrients"] = food_nutrients.get(fdc_id, [])
+        if fdc_id in food_portions:
+            food["foodPortions"] = food_portions[fdc_id]
+        yield food
+
+
+_store: Optional[FdcLocalStore] = None
+_store_lock = threading.Lock()
+_store_missing_logged = False
+
+
+def get_fdc_local_store() -> Optional[FdcLocalStore]:
+    """
+    プロセス全体で共有するローカルミラーを取得する
+    データベースファイルが存在しない場合は None（取り込み前でもAPIで動作を継続できるように）
+    """
+    global _store, _store_missing_logged
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if not os.path.exists(FDC_LOCAL_DB_PATH):
+                    if not _store_missing_logged:
+                        print(f"⚠️ ローカルFDCデータベースが見つかりません: {FDC_LOCAL_DB_PATH}（scripts/ingest_fdc.py で作成してください）")
+                        _store_missing_logged = True
+                    return None
+                _store = FdcLocalStore(FDC_LOCAL_DB_PATH)
+                print(f"🗄️ ローカルFDCデータベース読み込み: {FDC_LOCAL_DB_PATH}")
+    return _store
+
+
+def resolve_data_source(data_source: Optional[str] = None) -> str:
+    """データ取得元の設定値を検証して返す（不正な値は remote として扱う）"""
+    value = (data_source or NUTRITION_DATA_SOURCE or DATA_SOURCE_REMOTE).lower()
+    if value not in DATA_SOURCES:
+        print(f"⚠️ 不明な NUTRITION_DATA_SOURCE={value} のため remote を使用します")
+        return DATA_SOURCE_REMOTE
+    return value
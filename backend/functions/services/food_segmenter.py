@@ -0,0 +1,198 @@
+"""
+食事テキストを食品名と分量に分かち書きするモジュール
+
+data/food_dictionary.tsv（表記・食品名・英語名）を文字単位のトライ木に読み込み、
+「朝：ご飯170g、納豆1個」のような食事テキストを先頭から1回走査して、各位置で辞書の
+最長一致（食品名）と分量表記（portion_service.match_quantity）を読み取ります。
+最長一致のため「玄米」「米粉」の中の「米」を別の食品として拾うことはなく、
+1文字あたりの処理は辞書の件数ではなく最長の表記の長さにだけ比例します。
+「フライパン」のように食品名を含む食品以外の語は、食品名を NON_FOOD とした行で辞書に登録し、
+一致した範囲を読み飛ばします（「パン」を拾わない）。
+かなだけの表記の直後にカタカナが続く場合（「パンケーキ」「トマトケチャップ」「りんごジュース」）は、
+辞書にない長い語の一部とみなして一致としません。
+"""
+
+import threading
+import unicodedata
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from config import FOOD_DICTIONARY_PATH
+from services.portion_service import ParsedQuantity, match_quantity
+
+# トライ木のノードで表記の終端（FoodEntry）を保持するキー（1文字のキーと衝突しない）
+_TERMINAL = ""
+# 食品以外の語（フライパン など）を表す食品名。一致しても MealItem にしない
+NON_FOOD = "-"
+
+
+class FoodEntry(NamedTuple):
+    food: str         # 食品名（成分表の表示名など）
+    translation: str  # 英語名（不明な場合は空文字）
+
+
+class MealItem(NamedTuple):
+    surface: str                        # テキスト中の表記
+    food: str
+    translation: str
+    start: int                          # テキスト中の位置（元の文字列のインデックス）
+    end: int
+    quantity: Optional[ParsedQuantity]  # 食品に続く（または先行する）分量
+    quantity_text: Optional[str]
+
+
+def _is_katakana(char: str) -> bool:
+    return "ァ" <= char <= "ヺ" or char == "ー"
+
+
+def _is_kana(char: str) -> bool:
+    return "ぁ" <= char <= "ゖ" or _is_katakana(char)
+
+
+def _fold(char: str) -> str:
+    """1文字を照合用に正規化する（NFKC・小文字化・カタカナ→ひらがな）"""
+    folded = unicodedata.normalize("NFKC", char).lower()
+    return "".join(chr(ord(c) - 0x60) if "ァ" <= c <= "ヶ" else c for c in folded)
+
+
+def _normalize_with_offsets(text: str) -> Tuple[str, str, List[int]]:
+    """
+    (分量照合用の NFKC・小文字化テキスト, 辞書照合用のかな正規化テキスト, 元の位置の対応表) を返す。
+    NFKC で文字数が変わる文字（㎏ など）があっても元の文字列の位置に戻せるようにする。
+    """
+    plain: List[str] = []
+    folded: List[str] = []
+    offsets: List[int] = []
+    for index, char in enumerate(text):
+        normalized = unicodedata.normalize("NFKC", char).lower()
+        for c in normalized:
+            plain.append(c)
+            folded.append(chr(ord(c) - 0x60) if "ァ" <= c <= "ヶ" else c)
+            offsets.append(index)
+    offsets.append(len(text))
+    return "".join(plain), "".join(folded), offsets
+
+
+class FoodDictionary:
+    """食品名のトライ木（最長一致で検索する）"""
+
+    def __init__(self, entries: Iterable[Tuple[str, str, str]] = ()):
+        self._root: Dict[str, dict] = {}
+        self._size = 0
+        for surface, food, translation in entries:
+            self.add(surface, food, translation)
+
+    @classmethod
+    def from_tsv(cls, path: str) -> "FoodDictionary":
+        """「表記<TAB>食品名<TAB>英語名」の TSV を1行ずつ読み込む（# で始まる行は読み飛ばす）"""
+        dictionary = cls()
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip() or line.startswith("#"):
+                    continue
+                columns = line.rstrip("\n").split("\t")
+                surface = columns[0]
+                food = columns[1] if len(columns) > 1 and columns[1] else surface
+                translation = columns[2] if len(columns) > 2 else ""
+                dictionary.add(surface, food, translation)
+        return dictionary
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, surface: str, food: str, translation: str = "") -> None:
+        key = "".join(_fold(char) for char in surface)
+        if not key:
+            return
+        node = self._root
+        for char in key:
+            node = node.setdefault(char, {})
+        if _TERMINAL not in node:
+            self._size += 1
+        node[_TERMINAL] = FoodEntry(food, translation)
+
+    def longest_match(self, text: str, pos: int = 0) -> Optional[Tuple[int, FoodEntry]]:
+        """かな正規化済みテキストの pos から始まる最長の表記を (終了位置, エントリ) で返す"""
+        node = self._root
+        best: Optional[Tuple[int, FoodEntry]] = None
+        for index in range(pos, len(text)):
+            node = node.get(text[index])
+            if node is None:
+                break
+            entry = node.get(_TERMINAL)
+            if entry is not None:
+                best = (index + 1, entry)
+        return best
+
+    @staticmethod
+    def _inside_longer_word(plain: str, start: int, end: int) -> bool:
+        """かなだけの表記の直後にカタカナが続くか（辞書にない長い語の一部）"""
+        return (
+            end < len(plain)
+            and _is_katakana(plain[end])
+            and all(_is_kana(char) for char in plain[start:end])
+        )
+
+    def segment(self, text: str) -> List[MealItem]:
+        """
+        食事テキストを1回走査し、食品ごとに分量を対応付けた MealItem のリストを返します。
+        分量は直後に続くもの（「ご飯170g」）を優先し、食品より前の分量（「2個の卵」）は次の食品に付けます。
+        """
+        plain, folded, offsets = _normalize_with_offsets(text or "")
+        items: List[MealItem] = []
+        pending: Optional[Tuple[ParsedQuantity, str]] = None
+        pos = 0
+        while pos < len(folded):
+            match = self.longest_match(folded, pos)
+            if match is not None and self._inside_longer_word(plain, pos, match[0]):
+                match = None
+            if match is not None:
+                end, entry = match
+                if entry.food == NON_FOOD:
+                    pos = end
+                    continue
+                start_index, end_index = offsets[pos], offsets[end]
+                quantity, quantity_text = pending if pending else (None, None)
+                pending = None
+                items.append(MealItem(
+                    text[start_index:end_index], entry.food, entry.translation,
+                    start_index, end_index, quantity, quantity_text,
+                ))
+                pos = end
+                continue
+
+            quantity_match = match_quantity(plain, pos)
+            if quantity_match is not None:
+                quantity, end = quantity_match
+                quantity_text = text[offsets[pos]:offsets[end]]
+                if items and items[-1].quantity is None and pending is None:
+                    items[-1] = items[-1]._replace(quantity=quantity, quantity_text=quantity_text)
+                else:
+                    pending = (quantity, quantity_text)
+                pos = end
+                continue
+            pos += 1
+        return items
+
+
+_dictionary: Optional[FoodDictionary] = None
+_dictionary_lock = threading.Lock()
+
+
+def get_food_dictionary() -> FoodDictionary:
+    """プロセス全体で共有する食品辞書を取得する（ファイルがない場合は空の辞書）"""
+    global _dictionary
+    if _dictionary is None:
+        with _dictionary_lock:
+            if _dictionary is None:
+                try:
+                    _dictionary = FoodDictionary.from_tsv(FOOD_DICTIONARY_PATH)
+                    print(f"📖 食品辞書を読み込みました: {len(_dictionary)}件")
+                except OSError as e:
+                    print(f"⚠️ 食品辞書を読み込めませんでした: {e}")
+                    _dictionary = FoodDictionary()
+    return _dictionary
+
+
+def segment_meal_text(text: str) -> List[MealItem]:
+    """共有の食品辞書で食事テキストを食品名と分量に分かち書きする"""
+    return get_food_dictionary().segment(text)
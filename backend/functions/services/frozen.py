@@ -0,0 +1,47 @@
+"""
+読み取り専用のデータ構造
+
+インポート時に1回だけ組み立てる静的なデータ（ガイダンスの定型文など）を、呼び出し側で
+書き換えられないように凍結します。FrozenDict は dict、FrozenList は tuple のサブクラスで、
+json.dumps やツール出力の文字列化（str）では通常の dict / list と同じ形で出力されます。
+"""
+
+from typing import Any
+
+
+def _readonly(self, *args, **kwargs):
+    raise TypeError(f"{type(self).__name__} は変更できません")
+
+
+class FrozenDict(dict):
+    """変更操作を禁止した dict（値も freeze で再帰的に凍結する）"""
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+    __ior__ = _readonly
+
+    def __copy__(self) -> "FrozenDict":
+        return self
+
+    def __deepcopy__(self, memo) -> "FrozenDict":
+        return self
+
+
+class FrozenList(tuple):
+    """変更できない list（tuple だが文字列表現は list と同じ）"""
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+def freeze(value: Any) -> Any:
+    """dict / list / set を再帰的に FrozenDict / FrozenList / frozenset に変換する"""
+    if isinstance(value, (FrozenDict, FrozenList)):
+        return value
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return FrozenList(freeze(item) for item in value)
+    if isinstance(value, set):
+        return frozenset(value)
+    return value
@@ -0,0 +1,231 @@
+"""
+キーワード辞書の一括照合を提供するモジュール
+
+クエリ分析・入力分析・プロンプト分析で使うキーワード（食材カテゴリ、修飾語、問題表現、意図など）を
+すべて1つの Aho–Corasick オートマトンにまとめ、インポート時に1回だけ構築します。
+テキストを1回走査するだけで全グループのヒットが得られるため、呼び出しごとにリストを作り直して
+`any(keyword in text for keyword in keywords)` を繰り返す必要がありません。
+
+グループ名は "category:meat" のように「用途:分類」の形式です。照合は小文字化したテキストに対する
+部分文字列一致で、WHOLE_WORD_GROUPS のグループだけは空白区切りの単語全体と一致した場合に限ります
+（`word in words` と同じ判定）。
+"""
+
+from collections import deque
+from typing import Dict, Iterable, List, Mapping, Tuple
+
+from services.search_ranker import COOKING_METHODS
+
+# 食材カテゴリ（evaluate_nutrition_search_tool のクエリ分析。この順序で返す）
+FOOD_CATEGORY_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "meat": (
+        "chicken", "beef", "pork", "lamb", "turkey", "duck", "veal",
+        "鶏肉", "牛肉", "豚肉", "羊肉", "七面鳥", "鴨肉",
+    ),
+    "seafood": (
+        "fish", "salmon", "tuna", "cod", "shrimp", "crab", "lobster",
+        "魚", "サーモン", "マグロ", "タラ", "エビ", "カニ", "ロブスター",
+    ),
+    "fruit": (
+        "apple", "banana", "orange", "grape", "strawberry", "peach",
+        "りんご", "バナナ", "オレンジ", "ぶどう", "いちご", "桃",
+    ),
+    "vegetable": (
+        "carrot", "broccoli", "spinach", "tomato", "potato", "onion",
+        "にんじん", "ブロッコリー", "ほうれん草", "トマト", "じゃがいも", "玉ねぎ",
+    ),
+    "dairy": (
+        "milk", "cheese", "yogurt", "butter", "cream",
+        "牛乳", "チーズ", "ヨーグルト", "バター", "クリーム",
+    ),
+    "grain": (
+        "rice", "bread", "pasta", "wheat", "oats", "quinoa",
+        "米", "パン", "パスタ", "小麦", "オーツ", "キヌア",
+    ),
+}
+
+# クエリの修飾語（単語単位で判定）
+MODIFIER_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "cooking_method": COOKING_METHODS,
+    "preparation": ("skinless", "boneless", "peeled", "trimmed", "whole", "ground", "chopped"),
+    "part": ("breast", "thigh", "leg", "wing", "fillet", "loin", "shoulder"),
+    "quality": ("fresh", "frozen", "organic", "lean", "fat-free", "low-fat"),
+    "size": ("large", "medium", "small", "jumbo", "mini"),
+}
+
+# 具体性スコアのボーナス対象の修飾語（単語単位で判定）
+SPECIFICITY_MODIFIERS: Tuple[str, ...] = (
+    "raw", "cooked", "fresh", "skinless", "boneless", "whole", "lean",
+    "baked", "grilled", "fried", "boiled", "steamed", "roasted",
+    "organic", "frozen", "large", "medium", "small",
+)
+
+# 曖昧なクエリ表現
+VAGUE_QUERY_TERMS: Tuple[str, ...] = ("meat", "fish", "vegetable", "fruit", "肉", "魚", "野菜", "果物")
+
+# 基本食材の日本語 → 英語（get_nutrition_search_guidance_tool の翻訳パターン・食材検出で共有）
+BASIC_FOOD_TRANSLATIONS: Dict[str, str] = {
+    # 基本食材
+    "りんご": "apple", "バナナ": "banana", "オレンジ": "orange",
+    "鶏肉": "chicken", "牛肉": "beef", "豚肉": "pork",
+    "米": "rice", "パン": "bread", "卵": "egg",
+    "牛乳": "milk", "チーズ": "cheese",
+
+    # 野菜類
+    "キャベツ": "cabbage", "レタス": "lettuce", "トマト": "tomato",
+    "玉ねぎ": "onion", "人参": "carrot", "じゃがいも": "potato",
+    "ブロッコリー": "broccoli", "ほうれん草": "spinach",
+
+    # 魚介類
+    "鮭": "salmon", "まぐろ": "tuna", "鯛": "sea bream",
+    "えび": "shrimp", "いか": "squid", "たこ": "octopus",
+
+    # 豆・ナッツ類
+    "大豆": "soybean", "小豆": "adzuki bean", "アーモンド": "almond",
+    "くるみ": "walnut", "ピーナッツ": "peanut",
+
+    # アジア系食材
+    "納豆": "natto fermented soybeans",
+    "味噌": "miso soybean paste",
+    "昆布": "kelp seaweed",
+    "わかめ": "wakame seaweed",
+    "こんにゃく": "konjac",
+    "豆腐": "tofu",
+}
+
+# 調理方法・部位の日本語 → 英語（get_nutrition_search_guidance_tool の翻訳パターンと共有）
+COOKING_METHOD_TRANSLATIONS: Dict[str, str] = {
+    "生": "raw", "茹でた": "boiled", "焼いた": "grilled",
+    "蒸した": "steamed", "揚げた": "fried", "炒めた": "stir-fried",
+    "煮た": "simmered", "炙った": "broiled",
+}
+PART_TRANSLATIONS: Dict[str, str] = {
+    "胸肉": "breast", "もも肉": "thigh", "手羽": "wing",
+    "ひき肉": "ground", "骨なし": "boneless", "皮なし": "skinless",
+}
+
+# ユーザー入力の分析（get_nutrition_search_guidance_tool）
+INPUT_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "composite_dish": ("サラダ", "salad", "カレー", "curry"),
+    "processed_food": ("ジュース", "juice", "スープ", "soup"),
+    "brand": ("コカコーラ", "coca-cola", "マクドナルド", "mcdonald"),
+    "vague": ("野菜", "vegetable", "肉", "meat", "魚", "fish"),
+    "salad": ("サラダ", "salad"),
+    "modifier": ("raw", "cooked", "fresh", "skinless", "boneless", "生", "茹でた", "焼いた"),
+}
+
+# プロンプトの意図（DetailedNutritionHooks.analyze_prompt_for_tools）
+INTENT_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    # 食事記録関連のキーワード
+    "food_logging": ("食べた", "食事", "朝食", "昼食", "夕食", "おやつ", "飲んだ", "摂取", "食べました", "飲みました"),
+    # 栄養情報取得関連のキーワード
+    "nutrition": ("栄養", "カロリー", "タンパク質", "炭水化物", "脂質", "ビタミン", "ミネラル"),
+    # チャット履歴関連のキーワード
+    "chat_history": ("履歴", "過去", "前回", "以前", "記録", "ログ"),
+    # 検索関連のキーワード
+    "search": ("検索", "探す", "調べる", "見つける", "情報"),
+    # 栄養記録取得のパターン
+    "nutrition_status": ("今日の栄養", "栄養記録", "摂取量", "栄養状況", "栄養摂取状況"),
+    # 栄養価問い合わせの詳細パターン
+    "nutrition_details": ("栄養価", "栄養成分", "栄養素", "成分表"),
+}
+
+
+def _build_vocabularies() -> Dict[str, Tuple[str, ...]]:
+    vocabularies: Dict[str, Tuple[str, ...]] = {}
+    for category, keywords in FOOD_CATEGORY_KEYWORDS.items():
+        vocabularies[f"category:{category}"] = keywords
+    for modifier, keywords in MODIFIER_KEYWORDS.items():
+        vocabularies[f"modifier:{modifier}"] = keywords
+    vocabularies["specificity:modifier"] = SPECIFICITY_MODIFIERS
+    vocabularies["specificity:part"] = MODIFIER_KEYWORDS["part"]
+    vocabularies["query:vague"] = VAGUE_QUERY_TERMS
+    # 英語の食材名（日本語の食材名は food_segmenter の辞書で最長一致させる）
+    for english in BASIC_FOOD_TRANSLATIONS.values():
+        vocabularies[f"food:{english}"] = (english,)
+    # 翻訳対象の日本語（ヒットした日本語 → 英語をガイダンスの翻訳候補にする）
+    vocabularies["translation:cooking_methods"] = tuple(COOKING_METHOD_TRANSLATIONS)
+    vocabularies["translation:parts_cuts"] = tuple(PART_TRANSLATIONS)
+    for kind, keywords in INPUT_KEYWORDS.items():
+        vocabularies[f"input:{kind}"] = keywords
+    for intent, keywords in INTENT_KEYWORDS.items():
+        vocabularies[f"intent:{intent}"] = keywords
+    return vocabularies
+
+
+VOCABULARIES = _build_vocabularies()
+WHOLE_WORD_GROUPS = frozenset(
+    [f"modifier:{modifier}" for modifier in MODIFIER_KEYWORDS] + ["specificity:modifier", "specificity:part"]
+)
+
+
+class KeywordAutomaton:
+    """複数グループのキーワードを1回の走査で照合する Aho–Corasick オートマトン"""
+
+    def __init__(self, vocabularies: Mapping[str, Iterable[str]], whole_word_groups: Iterable[str] = ()):
+        whole_word_groups = frozenset(whole_word_groups)
+        # ノードごとの遷移・失敗リンク・出力（グループ, キーワード, 単語単位か）
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[Tuple[str, str, bool], ...]] = [()]
+
+        for group, keywords in vocabularies.items():
+            whole_word = group in whole_word_groups
+            for keyword in keywords:
+                keyword = keyword.lower()
+                if not keyword:
+                    continue
+                node = 0
+                for char in keyword:
+                    next_node = self._goto[node].get(char)
+                    if next_node is None:
+                        next_node = len(self._goto)
+                        self._goto[node][char] = next_node
+                        self._goto.append({})
+                        self._fail.append(0)
+                        self._output.append(())
+                    node = next_node
+                self._output[node] += ((group, keyword, whole_word),)
+
+        # 幅優先で失敗リンクを張り、失敗先の出力を引き継ぐ
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._output[child] += self._output[self._fail[child]]
+                queue.append(child)
+
+    def scan(self, text: str) -> Dict[str, List[str]]:
+        """
+        テキスト（小文字化して照合）に含まれるキーワードをグループごとに返します。
+        キーワードは出現順で、同じキーワードが複数回現れた場合はその回数だけ含みます。
+        """
+        text = (text or "").lower()
+        goto, fail, output = self._goto, self._fail, self._output
+        hits: Dict[str, List[Tuple[int, str]]] = {}
+        node = 0
+        for end, char in enumerate(text, 1):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for group, keyword, whole_word in output[node]:
+                start = end - len(keyword)
+                if whole_word and not (
+                    (start == 0 or text[start - 1].isspace()) and (end == len(text) or text[end].isspace())
+                ):
+                    continue
+                hits.setdefault(group, []).append((start, keyword))
+        # 終了位置順に検出されるため、開始位置順（出現順）に並べ直す
+        return {group: [keyword for _, keyword in sorted(found)] for group, found in hits.items()}
+
+
+KEYWORD_AUTOMATON = KeywordAutomaton(VOCABULARIES, WHOLE_WORD_GROUPS)
+
+
+def match_keywords(text: str) -> Dict[str, List[str]]:
+    """共有オートマトンでテキストを1回走査し、グループ → ヒットしたキーワードの辞書を返す"""
+    return KEYWORD_AUTOMATON.scan(text)
@@ -0,0 +1,237 @@
+"""
+日本食品標準成分表（八訂）のローカル索引を提供するモジュール
+
+data/mext_food_composition.csv を読み込み、食品名・正式名称・よみがな・別名を
+かな正規化した上で索引化します。日本語の食品名から翻訳やUSDA検索を経ずに、
+NutritionSummaryService.summarize と同じ形式（100gあたり）の栄養サマリーを返します。
+"""
+
+import csv
+import re
+import threading
+import unicodedata
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from config import MEXT_FOOD_TABLE_PATH
+from services.nutrition_summary_service import _serving_info
+
+MEXT_SOURCE = "日本食品標準成分表（八訂）"
+
+# CSV の栄養素列（NutritionSummaryService.summarize の出力キーと同じ名前）
+NUTRIENT_COLUMNS = (
+    "energy_kcal",
+    "protein_g",
+    "fat_g",
+    "carbohydrates_g",
+    "fiber_g",
+    "sodium_mg",
+    "calcium_mg",
+    "iron_mg",
+)
+
+# lookup で採用する最低スコア（食品名そのもの、または食品名 + 修飾語のクエリ）
+MIN_MATCH_SCORE = 0.6
+
+# 食品名の前に付いても同じ食品とみなす修飾語（産地・状態・切り方）
+# 「生」は「生ハム」「生クリーム」のように別の食品になるため後ろに付く場合のみ修飾語とする
+PREFIX_MODIFIERS = (
+    "国産", "輸入", "冷凍", "皮なし", "皮無し", "皮つき", "皮付き",
+    "薄切り", "厚切り", "こま切れ", "細切れ",
+)
+# 食品名の後に付いても同じ食品とみなす修飾語（状態・切り方・素材の味が変わらない調理法）
+# 「パンプキン」「バターロール」「チーズケーキ」のように別の食品になる語は含めない
+SUFFIX_MODIFIERS = (
+    "の", "を", "生", "皮なし", "皮無し", "皮つき", "皮付き", "冷凍",
+    "切り身", "薄切り", "厚切り", "スライス", "ソテー", "グリル", "ゆで", "茹で", "蒸し",
+)
+
+_JAPANESE_PATTERN = re.compile(r"[\u3040-\u30ff\u3400-\u9fff]")
+_IGNORED_CHARACTERS = re.compile(r"[\s・、。,.()（）［］\[\]＜＞<>「」]")
+
+
+def contains_japanese(text: str) -> bool:
+    """ひらがな・カタカナ・漢字を含むかどうか"""
+    return bool(_JAPANESE_PATTERN.search(text or ""))
+
+
+def normalize_japanese(text: str) -> str:
+    """NFKC正規化・小文字化し、カタカナをひらがなに揃えて記号と空白を除く"""
+    normalized = unicodedata.normalize("NFKC", text or "").lower()
+    normalized = "".join(
+        chr(ord(char) - 0x60) if "ァ" <= char <= "ヶ" else char
+        for char in normalized
+    )
+    return _IGNORED_CHARACTERS.sub("", normalized)
+
+
+_PREFIX_MODIFIERS = tuple(sorted({normalize_japanese(word) for word in PREFIX_MODIFIERS}, key=len, reverse=True))
+_SUFFIX_MODIFIERS = tuple(sorted({normalize_japanese(word) for word in SUFFIX_MODIFIERS}, key=len, reverse=True))
+
+
+def _is_modifiers(text: str, modifiers: Tuple[str, ...]) -> bool:
+    """text が修飾語だけで構成されているか（空文字も含む）"""
+    if not text:
+        return True
+    return any(text.startswith(word) and _is_modifiers(text[len(word):], modifiers) for word in modifiers)
+
+
+class MextFood(NamedTuple):
+    food_number: str
+    name: str
+    official_name: str
+    reading: str
+    keys: Tuple[str, ...]
+    nutrients: Dict[str, float]
+
+
+def _parse_float(value: Optional[str]) -> Optional[float]:
+    if value is None or value.strip() == "":
+        return None
+    return float(value)
+
+
+def _food_from_row(row: Dict[str, str]) -> MextFood:
+    aliases = [alias for alias in (row.get("aliases") or "").split("|") if alias]
+    names = [row.get("name", ""), row.get("official_name", ""), row.get("reading", ""), *aliases]
+    keys = tuple(dict.fromkeys(key for key in (normalize_japanese(name) for name in names) if key))
+    nutrients = {}
+    for column in NUTRIENT_COLUMNS:
+        value = _parse_float(row.get(column))
+        if value is not None:
+            nutrients[column] = value
+    return MextFood(
+        food_number=row.get("food_number", ""),
+        name=row.get("name") or row.get("official_name", ""),
+        official_name=row.get("official_name", ""),
+        reading=row.get("reading", ""),
+        keys=keys,
+        nutrients=nutrients,
+    )
+
+
+def matches_with_modifiers(
+    query: str,
+    key: str,
+    prefix_modifiers: Iterable[str] = (),
+) -> bool:
+    """
+    正規化済みのクエリが食品名 key そのもの、または「修飾語 + key + 修飾語」の形（例: 鶏むね肉のソテー）か。
+    「豚もも肉」と「もも肉」のように、修飾語以外の語が付いた別の食品は一致としません。
+    prefix_modifiers には PREFIX_MODIFIERS に加えて前に付いてよい語を指定できます。
+    """
+    prefixes = _PREFIX_MODIFIERS
+    if prefix_modifiers:
+        extra = {normalize_japanese(word) for word in prefix_modifiers}
+        prefixes = tuple(sorted(extra.union(prefixes), key=len, reverse=True))
+    start = query.find(key)
+    while start >= 0:
+        prefix, suffix = query[:start], query[start + len(key):]
+        if _is_modifiers(prefix, prefixes) and _is_modifiers(suffix, _SUFFIX_MODIFIERS):
+            return True
+        start = query.find(key, start + 1)
+    return False
+
+
+def _key_score(query: str, key: str) -> float:
+    """正規化済みのクエリと索引キーの一致度（完全一致は 1、修飾語付きは長い食品名ほど高い、不一致は 0）"""
+    if query == key:
+        return 1.0
+    if key and matches_with_modifiers(query, key):
+        return 0.6 + 0.4 * len(key) / len(query)
+    return 0.0
+
+
+class MextFoodIndex:
+    """
+    日本食品標準成分表のメモリ内索引
+    完全一致は辞書で引き、修飾語付きのクエリはクエリの部分文字列を辞書で引いて候補を絞り込みます。
+    """
+
+    def __init__(self, foods: Iterable[MextFood]):
+        self.foods: List[MextFood] = list(foods)
+        self._exact: Dict[str, int] = {}
+        for position, food in enumerate(self.foods):
+            for key in food.keys:
+                self._exact.setdefault(key, position)
+
+    @classmethod
+    def from_csv(cls, path: str) -> "MextFoodIndex":
+        with open(path, encoding="utf-8", newline="") as f:
+            return cls(_food_from_row(row) for row in csv.DictReader(f))
+
+    def __len__(self) -> int:
+        return len(self.foods)
+
+    def search(self, query: str, limit: int = 5) -> List[Tuple[float, MextFood]]:
+        """クエリに一致する食品を (スコア, 食品) のリストでスコア順に返す"""
+        normalized = normalize_japanese(query)
+        if not normalized:
+            return []
+        exact = self._exact.get(normalized)
+        if exact is not None:
+            return [(1.0, self.foods[exact])]
+
+        # クエリに含まれる食品名（部分文字列のうち索引キーに一致するもの）
+        candidates: Set[int] = set()
+        for start in range(len(normalized)):
+            for end in range(start + 1, len(normalized) + 1):
+                position = self._exact.get(normalized[start:end])
+                if position is not None:
+                    candidates.add(position)
+
+        scored = []
+        for position in candidates:
+            food = self.foods[position]
+            score = max(_key_score(normalized, key) for key in food.keys)
+            if score > 0:
+                scored.append((round(score, 4), position))
+        # 同点は成分表の掲載順（食品番号順）
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [(score, self.foods[position]) for score, position in scored[:limit]]
+
+    def lookup(self, query: str, min_score: float = MIN_MATCH_SCORE) -> Optional[Dict[str, Any]]:
+        """最も一致する食品の栄養サマリーを返す（min_score 未満なら None）"""
+        results = self.search(query, limit=2)
+        if not results or results[0][0] < min_score:
+            return None
+        if len(results) > 1 and results[1][0] == results[0][0]:
+            # 「納豆ご飯」のように複数の食品が同程度に一致する場合は単品として扱わない
+            return None
+        score, food = results[0]
+        summary = summarize_mext_food(food)
+        summary["match_score"] = score
+        return summary
+
+
+def summarize_mext_food(food: MextFood) -> Dict[str, Any]:
+    """成分表の食品を NutritionSummaryService.summarize と同じ形式に変換する"""
+    summary: Dict[str, Any] = {
+        "description": food.name,
+        "note": f"100gあたりの栄養価（{MEXT_SOURCE}）",
+        "official_name": food.official_name,
+        "food_number": food.food_number,
+    }
+    summary.update(food.nutrients)
+    summary["serving_info"] = _serving_info(100, "g", 1.0)
+    return summary
+
+
+_index: Optional[MextFoodIndex] = None
+_index_lock = threading.Lock()
+_index_load_failed = False
+
+
+def get_mext_food_index() -> Optional[MextFoodIndex]:
+    """プロセス全体で共有する成分表索引を取得する（ファイルがない場合は None）"""
+    global _index, _index_load_failed
+    if _index is None and not _index_load_failed:
+        with _index_lock:
+            if _index is None and not _index_load_failed:
+                try:
+                    _index = MextFoodIndex.from_csv(MEXT_FOOD_TABLE_PATH)
+                except OSError as e:
+                    print(f"⚠️ 日本食品標準成分表を読み込めません: {str(e)}")
+                    _index_load_failed = True
+                    return None
+                print(f"🍙 日本食品標準成分表を読み込みました: {len(_index)}件")
+    return _index
@@ -0,0 +1,77 @@
+"""
+必須栄養素の充足度（完全性）を求めるモジュール
+
+食品ごとに「必須栄養素 × 全栄養素名」の部分文字列検索を行うと、Foundation 食品のように
+栄養素が100件を超える場合に1食品あたり数千回の比較になります。ここでは必須栄養素の名称を
+1つの正規表現にまとめて事前コンパイルし、栄養素名 → 含まれる必須栄養素のビット集合を
+キャッシュします。栄養素名の種類は USDA 全体でも数百程度のため、2回目以降は
+1食品あたり「栄養素数回の辞書参照 + ビット OR」で完了します。
+"""
+
+import re
+from typing import Dict, Iterable, Sequence, Tuple
+
+# 基本の必須栄養素（検索結果の品質評価で使用）
+CORE_ESSENTIAL_NUTRIENTS: Tuple[str, ...] = (
+    "Energy", "Protein", "Total lipid (fat)", "Carbohydrate, by difference",
+    "Fiber, total dietary", "Sugars, total including NLEA", "Calcium, Ca",
+    "Iron, Fe", "Sodium, Na", "Vitamin C, total ascorbic acid",
+)
+
+# より包括的な必須栄養素（完全性スコアで使用）
+ESSENTIAL_NUTRIENTS: Tuple[str, ...] = (
+    "Energy", "Protein", "Total lipid (fat)", "Carbohydrate, by difference",
+    "Fiber, total dietary", "Sugars, total including NLEA",
+    "Calcium, Ca", "Iron, Fe", "Magnesium, Mg", "Phosphorus, P",
+    "Potassium, K", "Sodium, Na", "Zinc, Zn",
+    "Vitamin C, total ascorbic acid", "Thiamin", "Riboflavin",
+    "Niacin", "Vitamin B-6", "Folate, total", "Vitamin B-12",
+    "Vitamin A, RAE", "Vitamin E (alpha-tocopherol)", "Vitamin D (D2 + D3)",
+    "Vitamin K (phylloquinone)",
+)
+
+# 栄養素名 → ビット集合のキャッシュ上限（想定外の名称が大量に来てもメモリを使い切らないため）
+NAME_CACHE_SIZE = 4096
+
+
+class NutrientMatcher:
+    """必須栄養素の名称リストを事前コンパイルし、食品に含まれる必須栄養素の数を求める"""
+
+    def __init__(self, essentials: Sequence[str]):
+        self.essentials: Tuple[str, ...] = tuple(essentials)
+        # どの必須栄養素も含まない名称（大半の微量成分）を1回の検索で除外するためのパターン
+        self._pattern = re.compile("|".join(map(re.escape, self.essentials)))
+        self._masks: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.essentials)
+
+    def name_mask(self, name: str) -> int:
+        """栄養素名に部分文字列として含まれる必須栄養素のビット集合"""
+        mask = self._masks.get(name)
+        if mask is None:
+            mask = 0
+            if self._pattern.search(name):
+                for bit, essential in enumerate(self.essentials):
+                    if essential in name:
+                        mask |= 1 << bit
+            if len(self._masks) < NAME_CACHE_SIZE:
+                self._masks[name] = mask
+        return mask
+
+    def count(self, nutrient_names: Iterable[str]) -> int:
+        """栄養素名の一覧に含まれる必須栄養素の数"""
+        masks = self._masks
+        found = 0
+        for name in nutrient_names:
+            mask = masks.get(name)
+            found |= self.name_mask(name) if mask is None else mask
+        return found.bit_count()
+
+    def completeness(self, nutrient_names: Iterable[str]) -> float:
+        """必須栄養素の充足率（0〜1）"""
+        return self.count(nutrient_names) / len(self.essentials) if self.essentials else 0.0
+
+
+CORE_ESSENTIAL_MATCHER = NutrientMatcher(CORE_ESSENTIAL_NUTRIENTS)
+ESSENTIAL_MATCHER = NutrientMatcher(ESSENTIAL_NUTRIENTS)
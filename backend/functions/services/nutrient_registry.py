@@ -0,0 +1,105 @@
+"""
+USDA 栄養素番号をキーにした栄養素レジストリ
+
+出力フィールドごとに USDA の栄養素番号（優先順）と labelNutrients のキーを定義し、
+番号 → (フィールド位置, 優先度) の対応表を事前計算しておきます。
+foodNutrients は1回の走査で固定長の配列に展開され、表示名の変更にも影響されません。
+"""
+
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+
+class NutrientField(NamedTuple):
+    key: str                  # サマリーの出力キー
+    numbers: Tuple[str, ...]  # USDA 栄養素番号（先頭ほど優先）
+    names: Tuple[str, ...]    # 番号を持たないデータ向けの名称フォールバック
+    label: Optional[str]      # labelNutrients のキー（Branded 食品）
+
+
+# 出力フィールドの定義（この順序が配列のレイアウト）
+NUTRIENT_FIELDS: Tuple[NutrientField, ...] = (
+    NutrientField("protein_g", ("203",), ("Protein",), "protein"),
+    NutrientField("fat_g", ("204",), ("Total lipid (fat)",), "fat"),
+    NutrientField("carbohydrates_g", ("205",), ("Carbohydrate, by difference",), "carbohydrates"),
+    # 208 が無い Foundation 食品は Atwater 係数によるエネルギー（958: 個別係数, 957: 一般係数）を使う
+    NutrientField(
+        "energy_kcal",
+        ("208", "958", "957"),
+        ("Energy", "Energy (Atwater Specific Factors)", "Energy (Atwater General Factors)"),
+        "calories",
+    ),
+    NutrientField("fiber_g", ("291",), ("Fiber, total dietary",), "fiber"),
+    NutrientField("sugars_g", ("269", "269.3"), ("Sugars, total including NLEA", "Sugars, Total"), "sugars"),
+    NutrientField("vitamin_c_mg", ("401",), ("Vitamin C, total ascorbic acid",), None),
+    NutrientField("iron_mg", ("303",), ("Iron, Fe",), "iron"),
+    NutrientField("calcium_mg", ("301",), ("Calcium, Ca",), "calcium"),
+    NutrientField("sodium_mg", ("307",), ("Sodium, Na",), "sodium"),
+    NutrientField("potassium_mg", ("306",), ("Potassium, K",), None),
+    NutrientField("magnesium_mg", ("304",), ("Magnesium, Mg",), None),
+)
+
+FIELD_KEYS: Tuple[str, ...] = tuple(field.key for field in NUTRIENT_FIELDS)
+FIELD_COUNT = len(NUTRIENT_FIELDS)
+
+# 栄養素番号・名称 → (フィールド位置, 優先度)。優先度は小さいほど優先し、名称は番号より後順位
+NUMBER_SLOTS: Dict[str, Tuple[int, int]] = {
+    number: (position, priority)
+    for position, field in enumerate(NUTRIENT_FIELDS)
+    for priority, number in enumerate(field.numbers)
+}
+NAME_SLOTS: Dict[str, Tuple[int, int]] = {
+    name: (position, len(field.numbers) + priority)
+    for position, field in enumerate(NUTRIENT_FIELDS)
+    for priority, name in enumerate(field.names)
+}
+LABEL_SLOTS: Tuple[Tuple[int, str], ...] = tuple(
+    (position, field.label) for position, field in enumerate(NUTRIENT_FIELDS) if field.label
+)
+
+# エネルギーは kcal と kJ が同じ名称で並ぶため、名称で引く場合は kJ を除外する
+_EXCLUDED_UNITS = frozenset({"kj"})
+
+
+def extract_nutrient_values(food_nutrients: Optional[Iterable[Dict[str, Any]]]) -> List[Optional[float]]:
+    """
+    foodNutrients を1回走査し、NUTRIENT_FIELDS の順に並んだ値の配列を返します。
+    詳細APIの形式（{"nutrient": {...}, "amount": x}）と検索APIの形式
+    （{"nutrientNumber": ..., "value": x}）の両方に対応します。未収録は None。
+    """
+    values: List[Optional[float]] = [None] * FIELD_COUNT
+    ranks = [len(NUMBER_SLOTS) + len(NAME_SLOTS)] * FIELD_COUNT
+    for item in food_nutrients or ():
+        nutrient = item.get("nutrient")
+        if nutrient is not None:
+            number = nutrient.get("number")
+            name = nutrient.get("name")
+            unit = nutrient.get("unitName")
+            amount = item.get("amount", 0)
+        else:
+            number = item.get("nutrientNumber")
+            name = item.get("nutrientName")
+            unit = item.get("unitName")
+            amount = item.get("value", 0)
+
+        slot = NUMBER_SLOTS.get(number) if number else None
+        if slot is None:
+            if number or name not in NAME_SLOTS or (unit and unit.lower() in _EXCLUDED_UNITS):
+                continue
+            slot = NAME_SLOTS[name]
+        position, priority = slot
+        if priority < ranks[position]:
+            ranks[position] = priority
+            values[position] = amount
+    return values
+
+
+def extract_label_values(label_nutrients: Optional[Dict[str, Any]]) -> List[Optional[float]]:
+    """labelNutrients（Branded 食品の表示値）を NUTRIENT_FIELDS の順の配列に展開します"""
+    values: List[Optional[float]] = [None] * FIELD_COUNT
+    if not label_nutrients:
+        return values
+    for position, label in LABEL_SLOTS:
+        entry = label_nutrients.get(label)
+        if entry and "value" in entry:
+            values[position] = entry["value"]
+    return values
@@ -2,27 +2,159 @@
 栄養詳細取得用ビジネスロジックを提供するサービスモジュール
 """
 
+import asyncio
 import os
+import sqlite3
+import httpx
 import requests
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from services.usda_client import AsyncUsdaClient, UsdaClient, get_async_usda_client, get_usda_client
+from services.usda_cache import TwoTierCache, detail_cache_key, get_detail_cache
+from services.usda_rate_limiter import UsdaQuotaExceeded, quota_limited_error
+from services.fdc_local_store import (
+    DATA_SOURCE_LOCAL,
+    DATA_SOURCE_REMOTE,
+    FdcLocalStore,
+    get_fdc_local_store,
+    resolve_data_source,
+)
+
+# キャッシュに保持する詳細レスポンスのフィールド（NutritionSummaryService.summarize が参照するもの）
+DETAIL_FIELDS = (
+    "fdcId", "dataType", "description", "servingSize", "servingSizeUnit", "householdServingFullText", "labelNutrients"
+)
+# foodNutrients の各要素の nutrient から保持するフィールド
+NUTRIENT_FIELDS = ("id", "number", "name", "unitName")
+# foodPortions の各要素から保持するフィールド（PortionService が分量のグラム換算に使う）
+PORTION_FIELDS = ("amount", "gramWeight", "modifier", "portionDescription")
+# 複数食品エンドポイント (POST /foods) が1リクエストで受け付ける fdcId の上限
+MAX_FDC_IDS_PER_REQUEST = 20
+
+
+def compact_food_details(details: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    USDA 詳細APIのレスポンスから栄養サマリーに必要なフィールドだけを抜き出します。
+    数百KBになる Foundation 食品のレスポンスも数KBに収まります。
+    """
+    compact = {field: details[field] for field in DETAIL_FIELDS if field in details}
+
+    food_nutrients = []
+    for item in details.get("foodNutrients", []) or []:
+        nutrient = item.get("nutrient")
+        if not nutrient:
+            continue
+        food_nutrients.append({
+            "nutrient": {field: nutrient[field] for field in NUTRIENT_FIELDS if field in nutrient},
+            "amount": item.get("amount", 0),
+        })
+    if food_nutrients or "foodNutrients" in details:
+        compact["foodNutrients"] = food_nutrients
+
+    food_portions = []
+    for item in details.get("foodPortions", []) or []:
+        if not item.get("gramWeight"):
+            continue
+        portion = {field: item[field] for field in PORTION_FIELDS if item.get(field) not in (None, "")}
+        measure_unit = (item.get("measureUnit") or {}).get("name")
+        if measure_unit:
+            portion["measureUnit"] = {"name": measure_unit}
+        food_portions.append(portion)
+    if food_portions:
+        compact["foodPortions"] = food_portions
+    return compact
+
+
+def _details_local(local_store: Optional[FdcLocalStore], data_source: str, fdc_id: int) -> Optional[Dict[str, Any]]:
+    """ローカルミラーから詳細を取得する。API に問い合わせるべき場合は None を返す"""
+    if data_source == DATA_SOURCE_REMOTE:
+        return None
+    if local_store is None:
+        return {"error": "ローカルFDCデータベースが利用できません"} if data_source == DATA_SOURCE_LOCAL else None
+    try:
+        details = local_store.get_details(fdc_id)
+    except sqlite3.Error as e:
+        print(f"❌ ローカルFDC詳細取得エラー: {str(e)}")
+        return {"error": f"ローカルFDC詳細取得エラー: {str(e)}"} if data_source == DATA_SOURCE_LOCAL else None
+    if details is not None:
+        print(f"🗄️ ローカルFDC詳細取得: fdcId={fdc_id}")
+        return details
+    if data_source == DATA_SOURCE_LOCAL:
+        return {"error": f"fdcId={fdc_id} はローカルFDCデータベースに登録されていません"}
+    return None
+
+
+def _details_many_local(
+    local_store: Optional[FdcLocalStore],
+    data_source: str,
+    fdc_ids: List[int],
+) -> Tuple[Dict[int, Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """
+    ローカルミラーから複数の詳細を取得する。
+    戻り値は (取得できた詳細, ローカルのみで完結する場合の最終結果 or None)
+    """
+    if data_source == DATA_SOURCE_REMOTE:
+        return {}, None
+    foods: Dict[int, Dict[str, Any]] = {}
+    if local_store is not None:
+        try:
+            foods = local_store.get_details_many(fdc_ids)
+        except sqlite3.Error as e:
+            print(f"❌ ローカルFDC詳細一括取得エラー: {str(e)}")
+    if data_source != DATA_SOURCE_LOCAL:
+        return foods, None
+    if local_store is None:
+        return foods, {"error": "ローカルFDCデータベースが利用できません"}
+    print(f"🗄️ ローカルFDC詳細一括取得: {len(foods)}/{len(fdc_ids)}件")
+    return foods, {"foods": foods, "missing": [fdc_id for fdc_id in fdc_ids if fdc_id not in foods]}
+
+
+def _stale_or_quota_error(stale: Optional[Dict[str, Any]], fdc_id: int, error: UsdaQuotaExceeded) -> Dict[str, Any]:
+    """クォータ制限中は期限切れのキャッシュを返し、なければ quota_limited のエラーを返す"""
+    if stale is not None:
+        print(f"♻️ USDA API クォータ制限中のため期限切れキャッシュを返却: fdcId={fdc_id}")
+        return {**stale, "stale": True}
+    print(f"⏳ USDA API クォータ制限中: {str(error)}")
+    return quota_limited_error(error)
 
 
 class NutritionDetailsService:
     """
     USDA FoodData Central の詳細エンドポイントへの呼び出しを行うサービス
     """
-    def __init__(self):
-        self.base_url = "https://api.nal.usda.gov/fdc/v1/food"
+    def __init__(
+        self,
+        client: Optional[UsdaClient] = None,
+        cache: Optional[TwoTierCache] = None,
+        local_store: Optional[FdcLocalStore] = None,
+        data_source: Optional[str] = None,
+    ):
+        self.client = client or get_usda_client()
+        self.cache = cache or get_detail_cache()
+        self.base_url = self.client.url("food")
+        self.foods_url = self.client.url("foods")
+        self.data_source = resolve_data_source(data_source)
+        self.local_store = None if self.data_source == DATA_SOURCE_REMOTE else (local_store or get_fdc_local_store())
 
     def get_details(self, fdc_id: int) -> Dict[str, Any]:
         """
         指定した fdcId の食材の詳細栄養情報を取得します。
+        fdcId の詳細は不変のため、サマリーに必要なフィールドだけを圧縮してキャッシュします。
         """
+        local = _details_local(self.local_store, self.data_source, fdc_id)
+        if local is not None:
+            return local
+
+        cache_key = detail_cache_key(fdc_id)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            print(f"⚡ USDA詳細キャッシュヒット: fdcId={fdc_id}")
+            return cached
+
         api_key = os.getenv("USDA_API_KEY")
-        
+
         # 🔧 API key の状態をログ出力（本番環境での確認用）
         print(f"🔑 USDA API Key 確認（詳細取得）: 設定済み={api_key is not None}, 長さ={len(api_key) if api_key else 0}, 先頭4文字={api_key[:4] if api_key else 'なし'}")
-        
+
         if not api_key:
             print("❌ USDA_API_KEY が設定されていません - 環境変数を確認してください")
             return {"error": "USDA_API_KEY が設定されていません"}
@@ -32,16 +164,233 @@ class NutritionDetailsService:
 
         try:
             print(f"🌐 USDA API詳細取得リクエスト送信: fdcId={fdc_id}, URL={url}")
-            response = requests.get(url, params=params)
+            response = self.client.get(url, params=params)
             print(f"✅ USDA API詳細取得レスポンス: ステータス={response.status_code}")
             response.raise_for_status()
-            result = response.json()
+            result = compact_food_details(response.json())
             food_name = result.get('description', '不明')
             print(f"🍽️ USDA API詳細取得成功: {food_name} (fdcId: {fdc_id})")
+            self.cache.set(cache_key, result)
             return result
+        except UsdaQuotaExceeded as e:
+            return _stale_or_quota_error(self.cache.get_stale(cache_key), fdc_id, e)
         except requests.exceptions.RequestException as e:
             print(f"❌ USDA API詳細取得エラー: {str(e)}")
             return {"error": f"USDA API詳細取得エラー: {str(e)}"}
         except Exception as e:
             print(f"❌ 予期しないエラー（詳細取得）: {str(e)}")
-            return {"error": f"予期しないエラー: {str(e)}"} 
\ No newline at end of file
+            return {"error": f"予期しないエラー: {str(e)}"}
+
+    def get_details_many(self, fdc_ids: Iterable[int]) -> Dict[str, Any]:
+        """
+        複数の fdcId の詳細栄養情報をまとめて取得します。
+        キャッシュ済みのものを除き、POST /foods に最大20件ずつまとめて問い合わせます。
+
+        Args:
+            fdc_ids: 取得したい fdcId のリスト（重複は1回だけ取得）
+
+        Returns:
+            {"foods": {fdcId: 詳細JSON}, "missing": [取得できなかったfdcId], "errors"?: [...]}
+            または {"error": "..."}
+        """
+        ids = list(dict.fromkeys(int(fdc_id) for fdc_id in fdc_ids))
+        foods, local_result = _details_many_local(self.local_store, self.data_source, ids)
+        if local_result is not None:
+            return local_result
+
+        pending: List[int] = []
+        for fdc_id in ids:
+            if fdc_id in foods:
+                continue
+            cached = self.cache.get(detail_cache_key(fdc_id))
+            if cached is not None:
+                foods[fdc_id] = cached
+            else:
+                pending.append(fdc_id)
+
+        print(f"⚡ USDA詳細一括取得: 取得済み(ローカル・キャッシュ)={len(foods)}件, 取得対象={len(pending)}件")
+        if not pending:
+            return {"foods": foods, "missing": []}
+
+        api_key = os.getenv("USDA_API_KEY")
+        if not api_key:
+            print("❌ USDA_API_KEY が設定されていません - 環境変数を確認してください")
+            return {"error": "USDA_API_KEY が設定されていません"}
+
+        errors: List[str] = []
+        quota_limited = False
+        for start in range(0, len(pending), MAX_FDC_IDS_PER_REQUEST):
+            chunk = pending[start:start + MAX_FDC_IDS_PER_REQUEST]
+            try:
+                print(f"🌐 USDA API詳細一括取得リクエスト送信: fdcIds={chunk}")
+                response = self.client.post(self.foods_url, json={"fdcIds": chunk}, params={"api_key": api_key})
+                print(f"✅ USDA API詳細一括取得レスポンス: ステータス={response.status_code}")
+                response.raise_for_status()
+                for details in response.json() or []:
+                    compact = compact_food_details(details)
+                    fdc_id = compact.get("fdcId")
+                    if fdc_id is None:
+                        continue
+                    foods[int(fdc_id)] = compact
+                    self.cache.set(detail_cache_key(fdc_id), compact)
+            except UsdaQuotaExceeded as e:
+                print(f"⏳ USDA API クォータ制限中: {str(e)}")
+                quota_limited = True
+                errors.append(quota_limited_error(e)["error"])
+                for fdc_id in chunk:
+                    stale = self.cache.get_stale(detail_cache_key(fdc_id))
+                    if stale is not None:
+                        foods[fdc_id] = {**stale, "stale": True}
+            except requests.exceptions.RequestException as e:
+                print(f"❌ USDA API詳細一括取得エラー: {str(e)}")
+                errors.append(f"USDA API詳細一括取得エラー: {str(e)}")
+            except Exception as e:
+                print(f"❌ 予期しないエラー（詳細一括取得）: {str(e)}")
+                errors.append(f"予期しないエラー: {str(e)}")
+
+        result: Dict[str, Any] = {
+            "foods": foods,
+            "missing": [fdc_id for fdc_id in pending if fdc_id not in foods],
+        }
+        if errors:
+            result["errors"] = errors
+        if quota_limited:
+            result["quota_limited"] = True
+        return result
+
+
+class AsyncNutritionDetailsService:
+    """
+    NutritionDetailsService の非同期版（httpx.AsyncClient を使用し、イベントループをブロックしない）
+    """
+    def __init__(
+        self,
+        client: Optional[AsyncUsdaClient] = None,
+        cache: Optional[TwoTierCache] = None,
+        local_store: Optional[FdcLocalStore] = None,
+        data_source: Optional[str] = None,
+    ):
+        self.client = client or get_async_usda_client()
+        self.cache = cache or get_detail_cache()
+        self.base_url = self.client.url("food")
+        self.foods_url = self.client.url("foods")
+        self.data_source = resolve_data_source(data_source)
+        self.local_store = None if self.data_source == DATA_SOURCE_REMOTE else (local_store or get_fdc_local_store())
+
+    async def get_details(self, fdc_id: int) -> Dict[str, Any]:
+        """
+        指定した fdcId の食材の詳細栄養情報を取得します（NutritionDetailsService.get_details と同じ結果形式）。
+        """
+        local = _details_local(self.local_store, self.data_source, fdc_id)
+        if local is not None:
+            return local
+
+        cache_key = detail_cache_key(fdc_id)
+        cached = await self.cache.get_async(cache_key)
+        if cached is not None:
+            print(f"⚡ USDA詳細キャッシュヒット: fdcId={fdc_id}")
+            return cached
+
+        api_key = os.getenv("USDA_API_KEY")
+        if not api_key:
+            print("❌ USDA_API_KEY が設定されていません - 環境変数を確認してください")
+            return {"error": "USDA_API_KEY が設定されていません"}
+
+        url = f"{self.base_url}/{fdc_id}"
+        try:
+            print(f"🌐 USDA API詳細取得リクエスト送信(async): fdcId={fdc_id}, URL={url}")
+            response = await self.client.get(url, params={"api_key": api_key})
+            print(f"✅ USDA API詳細取得レスポンス(async): ステータス={response.status_code}")
+            response.raise_for_status()
+            result = compact_food_details(response.json())
+            print(f"🍽️ USDA API詳細取得成功: {result.get('description', '不明')} (fdcId: {fdc_id})")
+            await self.cache.set_async(cache_key, result)
+            return result
+        except UsdaQuotaExceeded as e:
+            return _stale_or_quota_error(await self.cache.get_stale_async(cache_key), fdc_id, e)
+        except httpx.HTTPError as e:
+            print(f"❌ USDA API詳細取得エラー: {str(e)}")
+            return {"error": f"USDA API詳細取得エラー: {str(e)}"}
+        except Exception as e:
+            print(f"❌ 予期しないエラー（詳細取得）: {str(e)}")
+            return {"error": f"予期しないエラー: {str(e)}"}
+
+    async def _fetch_chunk(self, chunk: List[int], api_key: str) -> List[Dict[str, Any]]:
+        print(f"🌐 USDA API詳細一括取得リクエスト送信(async): fdcIds={chunk}")
+        response = await self.client.post(self.foods_url, json={"fdcIds": chunk}, params={"api_key": api_key})
+        print(f"✅ USDA API詳細一括取得レスポンス(async): ステータス={response.status_code}")
+        response.raise_for_status()
+        return response.json() or []
+
+    async def get_details_many(self, fdc_ids: Iterable[int]) -> Dict[str, Any]:
+        """
+        複数の fdcId の詳細栄養情報をまとめて取得します（20件ごとのリクエストは並行して送信）。
+
+        Returns:
+            {"foods": {fdcId: 詳細JSON}, "missing": [取得できなかったfdcId], "errors"?: [...]}
+            または {"error": "..."}
+        """
+        ids = list(dict.fromkeys(int(fdc_id) for fdc_id in fdc_ids))
+        foods, local_result = _details_many_local(self.local_store, self.data_source, ids)
+        if local_result is not None:
+            return local_result
+
+        pending: List[int] = []
+        for fdc_id in ids:
+            if fdc_id in foods:
+                continue
+            cached = await self.cache.get_async(detail_cache_key(fdc_id))
+            if cached is not None:
+                foods[fdc_id] = cached
+            else:
+                pending.append(fdc_id)
+
+        print(f"⚡ USDA詳細一括取得: 取得済み(ローカル・キャッシュ)={len(foods)}件, 取得対象={len(pending)}件")
+        if not pending:
+            return {"foods": foods, "missing": []}
+
+        api_key = os.getenv("USDA_API_KEY")
+        if not api_key:
+            print("❌ USDA_API_KEY が設定されていません - 環境変数を確認してください")
+            return {"error": "USDA_API_KEY が設定されていません"}
+
+        chunks = [pending[start:start + MAX_FDC_IDS_PER_REQUEST] for start in range(0, len(pending), MAX_FDC_IDS_PER_REQUEST)]
+        responses = await asyncio.gather(*(self._fetch_chunk(chunk, api_key) for chunk in chunks), return_exceptions=True)
+
+        errors: List[str] = []
+        quota_limited = False
+        for chunk, response in zip(chunks, responses):
+            if isinstance(response, UsdaQuotaExceeded):
+                print(f"⏳ USDA API クォータ制限中: {str(response)}")
+                quota_limited = True
+                errors.append(quota_limited_error(response)["error"])
+                for fdc_id in chunk:
+                    stale = await self.cache.get_stale_async(detail_cache_key(fdc_id))
+                    if stale is not None:
+                        foods[fdc_id] = {**stale, "stale": True}
+                continue
+            if isinstance(response, httpx.HTTPError):
+                print(f"❌ USDA API詳細一括取得エラー: {str(response)}")
+                errors.append(f"USDA API詳細一括取得エラー: {str(response)}")
+                continue
+            if isinstance(response, Exception):
+                print(f"❌ 予期しないエラー（詳細一括取得）: {str(response)}")
+                errors.append(f"予期しないエラー: {str(response)}")
+                continue
+            for details in response:
+                compact = compact_food_details(details)
+                fdc_id = compact.get("fdcId")
+                if fdc_id is None:
+                    continue
+                foods[int(fdc_id)] = compact
+                await self.cache.set_async(detail_cache_key(fdc_id), compact)
+
+        result: Dict[str, Any] = {
+            "foods": foods,
+            "missing": [fdc_id for fdc_id in pending if fdc_id not in foods],
+        }
+        if errors:
+            result["errors"] = errors
+        if quota_limited:
+            result["quota_limited"] = True
+        return result
@@ -0,0 +1,97 @@
+"""
+USDA API が利用できない場合（クォータ制限中など）の栄養推定値を提供するモジュール
+
+値はメインエージェントの指示文に記載していた推定値（ご飯・卵・パン）を元にしています。
+ツールからは NutritionSummaryService.summarize と同じ形式（100gあたり）で返却します。
+"""
+
+import re
+from typing import Any, Dict, Optional, Tuple
+
+from services.mext_food_index import matches_with_modifiers, normalize_japanese
+from services.usda_cache import normalize_query
+
+# 推定値テーブル（1単位あたりの栄養価と、100gあたりへの換算に使う1単位のグラム数）
+FALLBACK_FOODS: Tuple[Dict[str, Any], ...] = (
+    {
+        "name": "ご飯",
+        "unit": "100g",
+        "unit_grams": 100.0,
+        "nutrients": {"energy_kcal": 130.0, "protein_g": 2.2, "carbohydrates_g": 29.0, "fat_g": 0.3},
+        "aliases": ("ご飯", "ごはん", "白米", "米飯", "rice"),
+    },
+    {
+        "name": "卵",
+        "unit": "1個",
+        "unit_grams": 50.0,
+        "nutrients": {"energy_kcal": 70.0, "protein_g": 6.0, "carbohydrates_g": 0.5, "fat_g": 5.0},
+        "aliases": ("卵", "たまご", "玉子", "egg", "eggs"),
+    },
+    {
+        "name": "パン",
+        "unit": "1枚",
+        "unit_grams": 60.0,
+        "nutrients": {"energy_kcal": 160.0, "protein_g": 6.0, "carbohydrates_g": 28.0, "fat_g": 3.0},
+        "aliases": ("パン", "食パン", "bread", "toast"),
+    },
+)
+
+FALLBACK_SOURCE = "推定値（USDA API 利用不可）"
+
+
+def find_fallback_food(query: str) -> Optional[Dict[str, Any]]:
+    """
+    クエリに該当する推定値のエントリを返す（該当なしは None）
+    英語は単語、日本語は語（空白・読点区切り）が別名そのもの（修飾語付きを含む）の場合のみ一致とし、
+    最も長い別名のエントリを採用します（「パンプキン」を「パン」としない）。
+    """
+    normalized = normalize_query(query)
+    words = set(normalized.replace(",", " ").split())
+    tokens = [normalize_japanese(token) for token in re.split(r"[\s,、・]+", normalized) if token]
+    best: Optional[Dict[str, Any]] = None
+    best_length = 0
+    for food in FALLBACK_FOODS:
+        for alias in food["aliases"]:
+            if alias.isascii():
+                key = alias
+                matched = alias in words
+            else:
+                key = normalize_japanese(alias)
+                matched = any(matches_with_modifiers(token, key) for token in tokens)
+            if matched and len(key) > best_length:
+                best, best_length = food, len(key)
+    return best
+
+
+def estimate_nutrition(query: str) -> Optional[Dict[str, Any]]:
+    """
+    推定値を100gあたりの栄養サマリー形式で返します。
+
+    Returns:
+        {"description", "note", "energy_kcal", ..., "per_unit": {...}} または None
+    """
+    food = find_fallback_food(query)
+    if food is None:
+        return None
+    factor = 100.0 / food["unit_grams"]
+    basis = "" if factor == 1.0 else f"、{food['name']}{food['unit']}={food['unit_grams']:g}gとして換算"
+    summary: Dict[str, Any] = {
+        "description": food["name"],
+        "note": f"100gあたりの栄養価（推定値{basis}）",
+    }
+    for key, value in food["nutrients"].items():
+        summary[key] = round(value * factor, 2)
+    summary["per_unit"] = {"unit": food["unit"], "grams": food["unit_grams"], **food["nutrients"]}
+    return summary
+
+
+def format_fallback_instructions(indent: str = "") -> str:
+    """エージェントの指示文に埋め込む推定値の一覧を生成する"""
+    lines = []
+    for food in FALLBACK_FOODS:
+        n = food["nutrients"]
+        lines.append(
+            f"{indent}* {food['name']}{food['unit']}: カロリー{n['energy_kcal']:g}kcal, タンパク質{n['protein_g']:g}g, "
+            f"炭水化物{n['carbohydrates_g']:g}g, 脂質{n['fat_g']:g}g"
+        )
+    return "\n".join(lines)
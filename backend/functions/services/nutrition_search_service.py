@@ -1,18 +1,93 @@
 """栄養検索用ビジネスロジックを提供するサービスモジュール"""
 
 import os
+import sqlite3
+import httpx
 import requests
 from typing import Any, Dict, List, Optional
+from services.usda_client import AsyncUsdaClient, UsdaClient, get_async_usda_client, get_usda_client
+from services.usda_cache import TwoTierCache, get_search_cache, search_cache_key
+from services.usda_rate_limiter import UsdaQuotaExceeded, quota_limited_error
+from services.fdc_local_store import (
+    DATA_SOURCE_LOCAL,
+    DATA_SOURCE_REMOTE,
+    FdcLocalStore,
+    get_fdc_local_store,
+    resolve_data_source,
+)
+
+
+def _build_search_payload(query: str, data_types: Optional[List[str]], page_size: int, page_number: int) -> Dict[str, Any]:
+    """検索リクエストのJSONペイロードを組み立てる（api_keyはクエリパラメータとして別送）"""
+    payload: Dict[str, Any] = {"query": query, "pageSize": page_size, "pageNumber": page_number}
+    if data_types:
+        payload["dataType"] = data_types
+    return payload
+
+
+def _search_local(
+    local_store: Optional[FdcLocalStore],
+    data_source: str,
+    query: str,
+    data_types: Optional[List[str]],
+    page_size: int,
+    page_number: int,
+) -> Optional[Dict[str, Any]]:
+    """ローカルミラーで検索する。API に問い合わせるべき場合は None を返す"""
+    if data_source == DATA_SOURCE_REMOTE:
+        return None
+    if local_store is None:
+        if data_source == DATA_SOURCE_LOCAL:
+            return {"error": "ローカルFDCデータベースが利用できません"}
+        return None
+    try:
+        result = local_store.search(query, data_types, page_size, page_number)
+    except sqlite3.Error as e:
+        print(f"❌ ローカルFDC検索エラー: {str(e)}")
+        return {"error": f"ローカルFDC検索エラー: {str(e)}"} if data_source == DATA_SOURCE_LOCAL else None
+    if result["foods"] or data_source == DATA_SOURCE_LOCAL:
+        print(f"🗄️ ローカルFDC検索: query={query}, {len(result['foods'])}件")
+        return result
+    return None
+
+
+def _stale_or_quota_error(stale: Optional[Dict[str, Any]], query: str, error: UsdaQuotaExceeded) -> Dict[str, Any]:
+    """クォータ制限中は期限切れのキャッシュを返し、なければ quota_limited のエラーを返す"""
+    if stale is not None:
+        print(f"♻️ USDA API クォータ制限中のため期限切れキャッシュを返却: query={query}")
+        return {**stale, "stale": True}
+    print(f"⏳ USDA API クォータ制限中: {str(error)}")
+    return quota_limited_error(error)
 
 
 class NutritionSearchService:
     """USDA FoodData Central の検索エンドポイントへの呼び出しを行うサービス"""
-    def __init__(self):
+    def __init__(
+        self,
+        client: Optional[UsdaClient] = None,
+        cache: Optional[TwoTierCache] = None,
+        local_store: Optional[FdcLocalStore] = None,
+        data_source: Optional[str] = None,
+    ):
         self.api_key = os.getenv("USDA_API_KEY")
-        self.url = "https://api.nal.usda.gov/fdc/v1/foods/search"
+        self.client = client or get_usda_client()
+        self.cache = cache or get_search_cache()
+        self.url = self.client.url("foods/search")
+        self.data_source = resolve_data_source(data_source)
+        self.local_store = None if self.data_source == DATA_SOURCE_REMOTE else (local_store or get_fdc_local_store())
 
     def search(self, query: str, data_types: Optional[List[str]] = None, page_size: int = 25, page_number: int = 1) -> Dict[str, Any]:
-        """食材検索を実行し、結果JSONを返却する"""
+        """食材検索を実行し、結果JSONを返却する（NUTRITION_DATA_SOURCE に応じてローカルミラーを優先）"""
+        local = _search_local(self.local_store, self.data_source, query, data_types, page_size, page_number)
+        if local is not None:
+            return local
+
+        cache_key = search_cache_key(query, data_types, page_size, page_number)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            print(f"⚡ USDA検索キャッシュヒット: query={query}")
+            return cached
+
         api_key = os.getenv("USDA_API_KEY")
         
         # 🔧 API key の状態をログ出力（本番環境での確認用）
@@ -22,22 +97,20 @@ class NutritionSearchService:
             print("❌ USDA_API_KEY が設定されていません - 環境変数を確認してください")
             return {"error": "USDA_API_KEY が設定されていません"}
 
-        # api_keyはクエリパラメータとして送信
-        url_with_key = f"{self.url}?api_key={api_key}"
-        
-        # JSONペイロードにはapi_keyを含めない
-        payload: Dict[str, Any] = {"query": query, "pageSize": page_size, "pageNumber": page_number}
-        if data_types:
-            payload["dataType"] = data_types
+        # api_keyはクエリパラメータとして送信し、JSONペイロードには含めない
+        payload = _build_search_payload(query, data_types, page_size, page_number)
 
         try:
             print(f"🌐 USDA API検索リクエスト送信: query={query}, URL={self.url}")
-            response = requests.post(url_with_key, json=payload)
+            response = self.client.post(self.url, json=payload, params={"api_key": api_key})
             print(f"✅ USDA API検索レスポンス: ステータス={response.status_code}")
             response.raise_for_status()
             result = response.json()
             print(f"📊 USDA API検索結果: {len(result.get('foods', []))}件の食品が見つかりました")
+            self.cache.set(cache_key, result)
             return result
+        except UsdaQuotaExceeded as e:
+            return _stale_or_quota_error(self.cache.get_stale(cache_key), query, e)
         except requests.exceptions.RequestException as e:
             print(f"❌ USDA API検索エラー: {str(e)}")
             return {"error": f"USDA API検索エラー: {str(e)}"}
@@ -45,6 +118,59 @@ class NutritionSearchService:
             print(f"❌ 予期しないエラー（検索）: {str(e)}")
             return {"error": f"予期しないエラー: {str(e)}"}
 
+
+class AsyncNutritionSearchService:
+    """NutritionSearchService の非同期版（httpx.AsyncClient を使用し、イベントループをブロックしない）"""
+    def __init__(
+        self,
+        client: Optional[AsyncUsdaClient] = None,
+        cache: Optional[TwoTierCache] = None,
+        local_store: Optional[FdcLocalStore] = None,
+        data_source: Optional[str] = None,
+    ):
+        self.client = client or get_async_usda_client()
+        self.cache = cache or get_search_cache()
+        self.url = self.client.url("foods/search")
+        self.data_source = resolve_data_source(data_source)
+        self.local_store = None if self.data_source == DATA_SOURCE_REMOTE else (local_store or get_fdc_local_store())
+
+    async def search(self, query: str, data_types: Optional[List[str]] = None, page_size: int = 25, page_number: int = 1) -> Dict[str, Any]:
+        """食材検索を実行し、結果JSONを返却する（ローカルミラーの検索は1ms未満のためループ上で直接実行）"""
+        local = _search_local(self.local_store, self.data_source, query, data_types, page_size, page_number)
+        if local is not None:
+            return local
+
+        cache_key = search_cache_key(query, data_types, page_size, page_number)
+        cached = await self.cache.get_async(cache_key)
+        if cached is not None:
+            print(f"⚡ USDA検索キャッシュヒット: query={query}")
+            return cached
+
+        api_key = os.getenv("USDA_API_KEY")
+        if not api_key:
+            print("❌ USDA_API_KEY が設定されていません - 環境変数を確認してください")
+            return {"error": "USDA_API_KEY が設定されていません"}
+
+        payload = _build_search_payload(query, data_types, page_size, page_number)
+
+        try:
+            print(f"🌐 USDA API検索リクエスト送信(async): query={query}, URL={self.url}")
+            response = await self.client.post(self.url, json=payload, params={"api_key": api_key})
+            print(f"✅ USDA API検索レスポンス(async): ステータス={response.status_code}")
+            response.raise_for_status()
+            result = response.json()
+            print(f"📊 USDA API検索結果: {len(result.get('foods', []))}件の食品が見つかりました")
+            await self.cache.set_async(cache_key, result)
+            return result
+        except UsdaQuotaExceeded as e:
+            return _stale_or_quota_error(await self.cache.get_stale_async(cache_key), query, e)
+        except httpx.HTTPError as e:
+            print(f"❌ USDA API検索エラー: {str(e)}")
+            return {"error": f"USDA API検索エラー: {str(e)}"}
+        except Exception as e:
+            print(f"❌ 予期しないエラー（検索）: {str(e)}")
+            return {"error": f"予期しないエラー: {str(e)}"}
+
 # このモジュール単体での動作確認
 if __name__ == "__main__":
     from pprint import pprint
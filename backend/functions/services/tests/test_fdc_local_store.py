@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# test_fdc_local_store.py
+
+import os
+import sys
+import pytest
+from unittest.mock import patch
+
+# backend/functions 直下をモジュール検索パスに追加
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from services.fdc_local_store import FdcLocalStore, iter_fdc_csv_foods
+from services.nutrition_search_service import NutritionSearchService
+from services.nutrition_details_service import NutritionDetailsService
+from services.usda_cache import TwoTierCache
+
+
+def _food(fdc_id, description, data_type, energy):
+    return {
+        "fdcId": fdc_id,
+        "description": description,
+        "dataType": data_type,
+        "foodPortions": [{"gramWeight": 50}],
+        "foodNutrients": [
+            {"nutrient": {"id": 1008, "number": "208", "name": "Energy", "unitName": "kcal"}, "amount": energy},
+            {"nutrient": {"id": 1003, "number": "203", "name": "Protein", "unitName": "g"}, "amount": 10.0},
+        ],
+    }
+
+
+FOODS = [
+    _food(1, "Egg, whole, raw, fresh", "SR Legacy", 143.0),
+    _food(2, "Eggs, Grade A, Large, egg whole", "Foundation", 148.0),
+    _food(3, "Egg, white, raw, fresh", "SR Legacy", 52.0),
+    _food(4, "Rice, white, long-grain, regular, cooked", "SR Legacy", 130.0),
+    _food(5, "Bread, white, commercially prepared", "SR Legacy", 266.0),
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    path = str(tmp_path / "fdc.sqlite3")
+    writer = FdcLocalStore(path, readonly=False)
+    assert writer.ingest(FOODS) == 5
+    writer.close()
+    reader = FdcLocalStore(path)
+    yield reader
+    reader.close()
+
+
+class TestFdcLocalStore:
+
+    def test_search_prefers_foundation(self, store):
+        result = store.search("egg whole")
+        ids = [food["fdcId"] for food in result["foods"]]
+        assert ids[0] == 2
+        assert set(ids) == {1, 2}
+        assert result["totalHits"] == 2
+
+    def test_search_hit_has_search_api_shape(self, store):
+        hit = store.search("rice cooked")["foods"][0]
+        assert hit["fdcId"] == 4
+        assert hit["dataType"] == "SR Legacy"
+        assert {"nutrientNumber": "208", "value": 130.0}.items() <= hit["foodNutrients"][0].items()
+
+    def test_search_stems_and_falls_back_to_any_word(self, store):
+        # "eggs" は porter ステミングで "egg" に一致、全語一致がなければいずれかの語で検索
+        result = store.search("eggs pancake")
+        assert {food["fdcId"] for food in result["foods"]} == {1, 2, 3}
+
+    def test_search_filters_data_type_and_paginates(self, store):
+        result = store.search("egg", data_types=["SR Legacy"], page_size=1, page_number=2)
+        assert result["totalHits"] == 2
+        assert result["totalPages"] == 2
+        assert len(result["foods"]) == 1
+        assert result["foods"][0]["dataType"] == "SR Legacy"
+
+    def test_search_no_match(self, store):
+        assert store.search("durian")["foods"] == []
+        assert store.search("   ")["foods"] == []
+
+    def test_get_details(self, store):
+        details = store.get_details(4)
+        assert details["description"].startswith("Rice")
+        assert details["foodNutrients"][0]["amount"] == 130.0
+        assert store.get_details(999) is None
+        assert set(store.get_details_many([1, 5, 999])) == {1, 5}
+
+    def test_iter_csv_foods(self, tmp_path):
+        (tmp_path / "food.csv").write_text(
+            'fdc_id,data_type,description\n10,sr_legacy_food,"Natto"\n11,branded_food,"Snack"\n', encoding="utf-8"
+        )
+        (tmp_path / "nutrient.csv").write_text(
+            "id,name,unit_name,nutrient_nbr\n1008,Energy,KCAL,208\n", encoding="utf-8"
+        )
+        (tmp_path / "food_nutrient.csv").write_text(
+            "id,fdc_id,nutrient_id,amount\n1,10,1008,211\n2,11,1008,500\n", encoding="utf-8"
+        )
+        foods = list(iter_fdc_csv_foods(str(tmp_path)))
+        assert len(foods) == 1
+        assert foods[0]["dataType"] == "SR Legacy"
+        assert foods[0]["foodNutrients"][0]["amount"] == 211.0
+
+
+class TestLocalDataSource:
+
+    def _cache(self):
+        return TwoTierCache("test_local", ttl=60, max_bytes=1024 * 1024)
+
+    def test_local_mode_never_calls_api(self, store):
+        service = NutritionSearchService(cache=self._cache(), local_store=store, data_source="local")
+        with patch.object(service.client, "post") as mock_post:
+            assert service.search("rice")["foods"][0]["fdcId"] == 4
+            assert service.search("durian")["foods"] == []
+            mock_post.assert_not_called()
+
+    def test_local_then_remote_falls_through(self, store, monkeypatch):
+        monkeypatch.setenv("USDA_API_KEY", "dummy-key")
+        service = NutritionSearchService(cache=self._cache(), local_store=store, data_source="local_then_remote")
+        with patch.object(service.client, "post") as mock_post:
+            mock_post.return_value.json.return_value = {"foods": [{"fdcId": 99}]}
+            assert service.search("rice")["foods"][0]["fdcId"] == 4
+            mock_post.assert_not_called()
+            assert service.search("durian")["foods"] == [{"fdcId": 99}]
+            mock_post.assert_called_once()
+
+    def test_details_local_then_remote(self, store, monkeypatch):
+        monkeypatch.setenv("USDA_API_KEY", "dummy-key")
+        service = NutritionDetailsService(cache=self._cache(), local_store=store, data_source="local_then_remote")
+        with patch.object(service.client, "post") as mock_post:
+            mock_post.return_value.json.return_value = [{"fdcId": 99, "description": "Durian"}]
+            result = service.get_details_many([4, 99])
+            mock_post.assert_called_once()
+            assert mock_post.call_args.kwargs["json"] == {"fdcIds": [99]}
+        assert set(result["foods"]) == {4, 99}
+
+    def test_local_mode_reports_missing(self, store):
+        service = NutritionDetailsService(cache=self._cache(), local_store=store, data_source="local")
+        assert "error" in service.get_details(999)
+        assert service.get_details_many([1, 999])["missing"] == [999]
+
+if __name__ == "__main__":
+    pytest.main(["-xvs", __file__])
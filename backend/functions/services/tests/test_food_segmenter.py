@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# test_food_segmenter.py
+
+import os
+import sys
+import time
+import pytest
+
+# backend/functions 直下をモジュール検索パスに追加
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from services.food_segmenter import NON_FOOD, FoodDictionary, get_food_dictionary, segment_meal_text
+from services.portion_service import ParsedQuantity
+
+
+def surfaces(items):
+    return [item.surface for item in items]
+
+
+class TestFoodDictionary:
+    def setup_method(self):
+        self.dictionary = FoodDictionary([
+            ("米", "米", "rice"),
+            ("玄米", "玄米ご飯", ""),
+            ("米粉", "米粉", "rice flour"),
+            ("ご飯", "ご飯", "rice"),
+            ("納豆", "納豆", "natto"),
+            ("卵", "卵", "egg"),
+            ("りんご", "りんご", "apple"),
+        ])
+
+    def test_segments_meal_text_with_quantities(self):
+        items = self.dictionary.segment("朝：ご飯170g、納豆1個")
+        assert surfaces(items) == ["ご飯", "納豆"]
+        assert items[0].quantity == ParsedQuantity(170.0, "g")
+        assert items[0].quantity_text == "170g"
+        assert items[1].quantity == ParsedQuantity(1.0, "個")
+        assert items[1].translation == "natto"
+
+    def test_longest_match_avoids_false_hits(self):
+        items = self.dictionary.segment("玄米と米粉パン、米")
+        assert [item.food for item in items] == ["玄米ご飯", "米粉", "米"]
+
+    def test_non_food_words_are_skipped(self):
+        """食品以外の語として登録した表記は、中の食品名を拾わずに読み飛ばす"""
+        dictionary = FoodDictionary([
+            ("パン", "食パン", "bread"),
+            ("フライパン", NON_FOOD, ""),
+            ("卵", "卵", "egg"),
+        ])
+        items = dictionary.segment("フライパンで卵2個を焼いた")
+        assert [item.food for item in items] == ["卵"]
+        assert items[0].quantity == ParsedQuantity(2.0, "個")
+
+    def test_kana_match_followed_by_katakana_is_rejected(self):
+        """かなだけの表記の直後にカタカナが続く場合は、辞書にない長い語の一部として拾わない"""
+        dictionary = FoodDictionary([
+            ("パン", "食パン", "bread"),
+            ("トマト", "トマト", "tomato"),
+            ("りんご", "りんご", "apple"),
+            ("ケチャップ", "ケチャップ", "ketchup"),
+        ])
+        assert dictionary.segment("パンケーキ") == []
+        assert [item.food for item in dictionary.segment("トマトケチャップ")] == ["ケチャップ"]
+        assert dictionary.segment("りんごジュース") == []
+        assert [item.food for item in dictionary.segment("パンとトマト、りんご1個")] == ["食パン", "トマト", "りんご"]
+
+    def test_leading_quantity_attaches_to_next_food(self):
+        items = self.dictionary.segment("２個の卵とりんご")
+        assert items[0].surface == "卵"
+        assert items[0].quantity == ParsedQuantity(2.0, "個")
+        assert items[1].quantity is None
+
+    def test_kana_and_width_are_folded(self):
+        items = self.dictionary.segment("リンゴ１個")
+        assert items[0].surface == "リンゴ"
+        assert items[0].food == "りんご"
+        assert items[0].quantity == ParsedQuantity(1.0, "個")
+
+    def test_empty_text(self):
+        assert self.dictionary.segment("") == []
+        assert self.dictionary.segment("今日は何も食べていない") == []
+
+    def test_large_dictionary(self):
+        """数千件の辞書でも1文字あたりの処理は表記の長さにしか依存しない"""
+        dictionary = FoodDictionary(
+            (f"食品{index:05d}", f"食品{index:05d}", "") for index in range(20000)
+        )
+        dictionary.add("ご飯", "ご飯", "rice")
+        assert len(dictionary) == 20001
+
+        text = "、".join(f"食品{index:05d}を{index % 9 + 1}個" for index in range(0, 20000, 20)) + "、ご飯"
+        started = time.perf_counter()
+        items = dictionary.segment(text)
+        elapsed = time.perf_counter() - started
+
+        assert len(items) == 1001
+        assert items[1].surface == "食品00020"
+        assert items[1].quantity == ParsedQuantity(3.0, "個")
+        assert items[-1].food == "ご飯"
+        assert elapsed < 2.0
+
+
+class TestSharedDictionary:
+    def test_loads_data_file_once(self):
+        assert get_food_dictionary() is get_food_dictionary()
+        assert len(get_food_dictionary()) > 100
+
+    def test_segment_meal_text(self):
+        items = segment_meal_text("朝：ご飯170g、納豆1個")
+        assert [(item.translation, item.quantity) for item in items] == [
+            ("rice", ParsedQuantity(170.0, "g")),
+            ("natto fermented soybeans", ParsedQuantity(1.0, "個")),
+        ]
+        assert surfaces(segment_meal_text("玄米と米粉")) == ["玄米", "米粉"]
+
+    def test_compounds_are_not_split(self):
+        """食品名を含む別の食品・食品以外の語の中から短い食品名を拾わない"""
+        assert [item.food for item in segment_meal_text("パンプキンスープと味噌汁")] == ["パンプキンスープ", "味噌汁"]
+        assert [item.translation for item in segment_meal_text("パンプキン100g")] == ["pumpkin"]
+        assert segment_meal_text("フライパンで焼いた") == []
+
+    @pytest.mark.parametrize("text, expected", [
+        ("パンケーキ", ["pancake"]),
+        ("メロンパン", ["melon bread"]),
+        ("カレーパン", ["curry bread"]),
+        ("米国産牛肉", ["beef"]),
+        ("トマトケチャップ", ["ketchup"]),
+        ("りんごジュース", ["juice"]),
+    ])
+    def test_longer_words_are_not_split(self, text, expected):
+        assert [item.translation for item in segment_meal_text(text)] == expected
+
+    def test_translations_are_filled(self):
+        assert [item.translation for item in segment_meal_text("玄米ごはん150g")] == ["brown rice"]
+        assert all(item.translation for item in segment_meal_text("げんまいごはん、おにぎり、みかん"))
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# test_keyword_matcher.py
+
+import os
+import sys
+
+import pytest
+
+# backend/functions 直下をモジュール検索パスに追加
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from services.keyword_matcher import (
+    VOCABULARIES,
+    WHOLE_WORD_GROUPS,
+    KeywordAutomaton,
+    match_keywords,
+)
+
+TEXTS = [
+    "Chicken breast cooked skinless",
+    "grilled salmon fillet large large",
+    "鶏肉のサラダとスープ",
+    "今日の栄養摂取状況を教えて",
+    "朝食に納豆ご飯を食べました。カロリーは？",
+    "Coca-Cola and McDonald's fries",
+    "eggplant legume",
+    "",
+]
+
+
+def naive_scan(text):
+    """従来の判定（グループごとのリスト走査）"""
+    text_lower = text.lower()
+    words = text_lower.split()
+    hits = {}
+    for group, keywords in VOCABULARIES.items():
+        if group in WHOLE_WORD_GROUPS:
+            found = [word for word in words if word in keywords]
+        else:
+            found = [keyword.lower() for keyword in keywords if keyword.lower() in text_lower]
+        if found:
+            hits[group] = found
+    return hits
+
+
+class TestKeywordAutomaton:
+    @pytest.mark.parametrize("text", TEXTS)
+    def test_matches_naive_scan(self, text):
+        hits = match_keywords(text)
+        expected = naive_scan(text)
+        assert hits.keys() == expected.keys()
+        for group, keywords in expected.items():
+            if group in WHOLE_WORD_GROUPS:
+                # 単語単位のグループは出現順・重複を含めて一致
+                assert hits[group] == keywords
+            else:
+                assert set(hits[group]) == set(keywords)
+
+    def test_overlapping_keywords(self):
+        automaton = KeywordAutomaton({"x": ["he", "she", "his", "hers"]})
+        assert automaton.scan("ushers") == {"x": ["she", "he", "hers"]}
+
+    def test_whole_word_groups(self):
+        automaton = KeywordAutomaton({"part": ["leg"], "any": ["leg"]}, whole_word_groups=["part"])
+        assert automaton.scan("legume") == {"any": ["leg"]}
+        assert automaton.scan("chicken leg") == {"part": ["leg"], "any": ["leg"]}
+
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# test_mext_food_index.py
+
+import os
+import sys
+import pytest
+
+# backend/functions 直下をモジュール検索パスに追加
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from config import MEXT_FOOD_TABLE_PATH
+from services.mext_food_index import (
+    MextFoodIndex,
+    contains_japanese,
+    get_mext_food_index,
+    normalize_japanese,
+)
+
+
+class TestMextFoodIndex:
+
+    def setup_method(self):
+        self.index = MextFoodIndex.from_csv(MEXT_FOOD_TABLE_PATH)
+
+    def test_normalize_japanese(self):
+        assert normalize_japanese("ナットウ") == "なっとう"
+        assert normalize_japanese(" ご飯 （白米） ") == "ご飯白米"
+        assert normalize_japanese("ＡＢＣ") == "abc"
+
+    def test_contains_japanese(self):
+        assert contains_japanese("鶏むね肉")
+        assert contains_japanese("バナナ")
+        assert not contains_japanese("chicken breast")
+
+    def test_lookup_by_kanji_kana_and_reading(self):
+        for query in ("ご飯", "ごはん", "ゴハン", "白米"):
+            assert self.index.lookup(query)["food_number"] == "01088"
+        assert self.index.lookup("なっとう")["description"] == "納豆"
+
+    def test_lookup_returns_summary_schema(self):
+        summary = self.index.lookup("納豆")
+        assert summary["note"] == "100gあたりの栄養価（日本食品標準成分表（八訂））"
+        assert summary["energy_kcal"] == 190.0
+        assert summary["protein_g"] == 16.5
+        assert summary["fat_g"] == 10.0
+        assert summary["carbohydrates_g"] == 12.1
+        # USDA のサマリーと同じく serving_info を持つ（成分表は100gあたり）
+        assert summary["serving_info"] == {
+            "original_serving_size": 100,
+            "original_serving_unit": "g",
+            "conversion_factor": 1.0,
+            "normalized_to": "100g"
+        }
+
+    def test_partial_matches(self):
+        # 食品名を含むクエリ・食品名の一部のクエリ
+        assert self.index.lookup("鶏むね肉のソテー")["description"] == "鶏むね肉"
+        assert self.index.lookup("絹ごし")["description"] == "絹ごし豆腐"
+
+    def test_dishes_and_composites_are_not_matched(self):
+        # 料理名や複数食材の組み合わせは素材の値で代用しない
+        assert self.index.lookup("味噌汁") is None
+        assert self.index.lookup("納豆ご飯") is None
+        assert self.index.lookup("アボカド") is None
+
+    def test_modifier_matches(self):
+        # 食品名の前後が修飾語だけのクエリは同じ食品として扱う
+        assert self.index.lookup("国産鶏むね肉")["description"] == "鶏むね肉"
+        assert self.index.lookup("鮭の切り身")["description"] == "鮭"
+        assert self.index.lookup("冷凍ブロッコリー")["description"] == "ブロッコリー"
+        assert self.index.lookup("鮭生")["description"] == "鮭"
+
+    @pytest.mark.parametrize("query", [
+        "パンプキン",
+        "バターロール",
+        "ピーナッツバター",
+        "ポテトチップス",
+        "チーズケーキ",
+        "ミルクティー",
+        "ライスペーパー",
+        "オムライス",
+        "トマトジュース",
+        "ハムサンド",
+        "蒸しパン",
+        "生ハム",
+        "生クリーム",
+    ])
+    def test_other_foods_containing_a_name_are_not_matched(self, query):
+        # 食品名を含むだけの別の食品に、含まれる食品の値を使わない
+        assert self.index.lookup(query) is None
+
+    def test_search_ranks_exact_first(self):
+        results = self.index.search("卵")
+        assert results[0][1].name == "卵"
+        assert results[0][0] == 1.0
+
+    def test_shared_index(self):
+        assert get_mext_food_index() is get_mext_food_index()
+        assert len(get_mext_food_index()) > 0
+
+if __name__ == "__main__":
+    pytest.main(["-xvs", __file__])
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# test_nutrient_completeness.py
+
+import os
+import sys
+import time
+
+# backend/functions 直下をモジュール検索パスに追加
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from services.nutrient_completeness import (
+    CORE_ESSENTIAL_MATCHER,
+    ESSENTIAL_MATCHER,
+    ESSENTIAL_NUTRIENTS,
+    NutrientMatcher,
+)
+
+FOUNDATION_NAMES = [
+    "Energy", "Energy (Atwater General Factors)", "Protein", "Total lipid (fat)",
+    "Carbohydrate, by difference", "Fiber, total dietary", "Calcium, Ca", "Iron, Fe",
+    "Magnesium, Mg", "Phosphorus, P", "Potassium, K", "Sodium, Na", "Zinc, Zn",
+    "Vitamin B-6", "Vitamin B-12", "Vitamin B-12, added", "Folate, total", "Thiamin",
+    "Water", "Ash", "Nitrogen", "Copper, Cu", "Manganese, Mn", "Selenium, Se",
+] + [f"PUFA 18:{i}" for i in range(100)]
+
+
+def naive_count(essentials, names):
+    return sum(1 for essential in essentials if any(essential in name for name in names))
+
+
+class TestNutrientMatcher:
+    def test_matches_naive_substring_scan(self):
+        for matcher in (CORE_ESSENTIAL_MATCHER, ESSENTIAL_MATCHER):
+            for names in (FOUNDATION_NAMES, FOUNDATION_NAMES[:5], [], ["Water"]):
+                assert matcher.count(names) == naive_count(matcher.essentials, names)
+
+    def test_substring_and_duplicates(self):
+        matcher = NutrientMatcher(["Energy", "Vitamin B-12"])
+        # 部分一致（"Energy (Atwater ...)"）と重複はそれぞれ1件として数える
+        assert matcher.count(["Energy (Atwater Specific Factors)", "Energy", "Vitamin B-12, added"]) == 2
+        assert matcher.count(["Vitamin B-6"]) == 0
+
+    def test_completeness(self):
+        assert ESSENTIAL_MATCHER.completeness(ESSENTIAL_NUTRIENTS) == 1.0
+        assert ESSENTIAL_MATCHER.completeness([]) == 0.0
+        assert len(ESSENTIAL_MATCHER) == 24
+        assert len(CORE_ESSENTIAL_MATCHER) == 10
+
+    def test_foundation_sized_list_is_fast(self):
+        ESSENTIAL_MATCHER.count(FOUNDATION_NAMES)  # キャッシュを温める
+        start = time.perf_counter()
+        for _ in range(100):
+            ESSENTIAL_MATCHER.count(FOUNDATION_NAMES)
+        per_food = (time.perf_counter() - start) / 100
+        assert per_food < 0.001
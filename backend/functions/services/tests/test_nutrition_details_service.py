@@ -10,12 +10,16 @@ import requests
 # backend/functions 直下をモジュール検索パスに追加
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 
-from services.nutrition_details_service import NutritionDetailsService
+from services.nutrition_details_service import NutritionDetailsService, compact_food_details
+from services.usda_cache import TwoTierCache
+from services.usda_rate_limiter import UsdaQuotaExceeded
 
 class TestNutritionDetailsService:
 
     def setup_method(self):
-        self.service = NutritionDetailsService()
+        # テスト間で結果が共有されないよう専用のメモリキャッシュを使用
+        self.cache = TwoTierCache("test_details", ttl=None, max_bytes=1024 * 1024)
+        self.service = NutritionDetailsService(cache=self.cache)
 
     def teardown_method(self):
         if "USDA_API_KEY" in os.environ:
@@ -34,15 +38,58 @@ class TestNutritionDetailsService:
         monkeypatch.setenv("USDA_API_KEY", "dummy-key")
         dummy_response = MagicMock()
         dummy_response.raise_for_status.return_value = None
-        dummy_response.json.return_value = {"description": "Apple", "id": 12345}
+        dummy_response.json.return_value = {"description": "Apple", "fdcId": 12345}
 
-        with patch("services.nutrition_details_service.requests.get", return_value=dummy_response) as mock_get:
+        with patch.object(self.service.client, "get", return_value=dummy_response) as mock_get:
             result = self.service.get_details(12345)
             mock_get.assert_called_once_with(
                 f"https://api.nal.usda.gov/fdc/v1/food/12345",
                 params={"api_key": "dummy-key"}
             )
-            assert result == {"description": "Apple", "id": 12345}
+            assert result == {"description": "Apple", "fdcId": 12345}
+
+    def test_get_details_uses_cache(self, monkeypatch):
+        """同じ fdcId の2回目の取得はキャッシュから返却される"""
+        monkeypatch.setenv("USDA_API_KEY", "dummy-key")
+        dummy_response = MagicMock()
+        dummy_response.raise_for_status.return_value = None
+        dummy_response.json.return_value = {"description": "Apple", "fdcId": 12345}
+
+        with patch.object(self.service.client, "get", return_value=dummy_response) as mock_get:
+            first = self.service.get_details(12345)
+            second = self.service.get_details(12345)
+            assert mock_get.call_count == 1
+            assert first == second
+
+    def test_compact_food_details(self):
+        """サマリーに不要なフィールドは保持しない"""
+        details = {
+            "fdcId": 171688,
+            "description": "Apples, raw, with skin",
+            "dataType": "SR Legacy",
+            "publicationDate": "4/1/2019",
+            "foodAttributes": [{"id": 1}],
+            "inputFoods": [{"id": 2}],
+            "foodNutrients": [
+                {
+                    "type": "FoodNutrient",
+                    "id": 1,
+                    "nutrient": {"id": 1008, "number": "208", "name": "Energy", "rank": 300, "unitName": "kcal"},
+                    "dataPoints": 12,
+                    "foodNutrientDerivation": {"code": "A"},
+                    "amount": 52.0
+                }
+            ]
+        }
+        compact = compact_food_details(details)
+        assert compact == {
+            "fdcId": 171688,
+            "description": "Apples, raw, with skin",
+            "dataType": "SR Legacy",
+            "foodNutrients": [
+                {"nutrient": {"id": 1008, "number": "208", "name": "Energy", "unitName": "kcal"}, "amount": 52.0}
+            ]
+        }
 
     def test_get_details_http_error(self, monkeypatch):
         """異常系: HTTPエラー発生時はエラーを返す"""
@@ -50,7 +97,7 @@ class TestNutritionDetailsService:
         dummy_response = MagicMock()
         dummy_response.raise_for_status.side_effect = requests.exceptions.HTTPError("404 Not Found")
 
-        with patch("services.nutrition_details_service.requests.get", return_value=dummy_response):
+        with patch.object(self.service.client, "get", return_value=dummy_response):
             result = self.service.get_details(12345)
             assert "error" in result
             assert "404 Not Found" in result["error"]
@@ -58,10 +105,83 @@ class TestNutritionDetailsService:
     def test_get_details_exception(self, monkeypatch):
         """異常系: その他例外発生時はエラーを返す"""
         monkeypatch.setenv("USDA_API_KEY", "dummy-key")
-        with patch("services.nutrition_details_service.requests.get", side_effect=Exception("conn err")):
+        with patch.object(self.service.client, "get", side_effect=Exception("conn err")):
             result = self.service.get_details(12345)
             assert "error" in result
             assert "conn err" in result["error"]
 
+    def test_get_details_many_chunks_requests(self, monkeypatch):
+        """45件の fdcId は 20/20/5 件の3リクエストに分割される"""
+        monkeypatch.setenv("USDA_API_KEY", "dummy-key")
+
+        def fake_post(url, json=None, params=None):
+            response = MagicMock()
+            response.raise_for_status.return_value = None
+            response.json.return_value = [
+                {"fdcId": fdc_id, "description": f"Food {fdc_id}"} for fdc_id in json["fdcIds"]
+            ]
+            return response
+
+        fdc_ids = list(range(1, 46))
+        with patch.object(self.service.client, "post", side_effect=fake_post) as mock_post:
+            result = self.service.get_details_many(fdc_ids)
+            assert [len(call.kwargs["json"]["fdcIds"]) for call in mock_post.call_args_list] == [20, 20, 5]
+            assert mock_post.call_args_list[0].args[0] == self.service.foods_url
+        assert sorted(result["foods"].keys()) == fdc_ids
+        assert result["missing"] == []
+
+        # 一括取得した結果は単体取得のキャッシュにも入る
+        with patch.object(self.service.client, "get") as mock_get:
+            assert self.service.get_details(7) == {"fdcId": 7, "description": "Food 7"}
+            mock_get.assert_not_called()
+
+    def test_get_details_many_skips_cached_and_reports_missing(self, monkeypatch):
+        """キャッシュ済みの fdcId は問い合わせず、返却されなかった fdcId は missing に入る"""
+        monkeypatch.setenv("USDA_API_KEY", "dummy-key")
+        self.cache.set("food:1", {"fdcId": 1, "description": "Cached"})
+        dummy_response = MagicMock()
+        dummy_response.raise_for_status.return_value = None
+        dummy_response.json.return_value = [{"fdcId": 2, "description": "Fetched"}]
+
+        with patch.object(self.service.client, "post", return_value=dummy_response) as mock_post:
+            result = self.service.get_details_many([1, 2, 3, 2])
+            mock_post.assert_called_once()
+            assert mock_post.call_args.kwargs["json"] == {"fdcIds": [2, 3]}
+        assert result["foods"][1]["description"] == "Cached"
+        assert result["foods"][2]["description"] == "Fetched"
+        assert result["missing"] == [3]
+
+    def test_get_details_many_chunk_error(self, monkeypatch):
+        """一部のリクエストが失敗しても取得できた分は返却する"""
+        monkeypatch.setenv("USDA_API_KEY", "dummy-key")
+        ok_response = MagicMock()
+        ok_response.raise_for_status.return_value = None
+        ok_response.json.return_value = [{"fdcId": fdc_id} for fdc_id in range(1, 21)]
+
+        with patch.object(self.service.client, "post", side_effect=[ok_response, requests.exceptions.ConnectionError("down")]):
+            result = self.service.get_details_many(range(1, 26))
+        assert len(result["foods"]) == 20
+        assert result["missing"] == [21, 22, 23, 24, 25]
+        assert "down" in result["errors"][0]
+
+    def test_quota_limited_returns_stale_details_with_flag(self, monkeypatch):
+        """クォータ制限中は期限切れのキャッシュに stale を付けて返す（検索と同じ形式）"""
+        monkeypatch.setenv("USDA_API_KEY", "dummy-key")
+        cache = TwoTierCache("test_details_stale", ttl=60, max_bytes=1024 * 1024, stale_ttl=600)
+        service = NutritionDetailsService(cache=cache)
+        with patch("services.usda_cache.time.time", return_value=1000.0):
+            cache.set("food:1", {"fdcId": 1, "description": "Old"})
+            cache.set("food:2", {"fdcId": 2, "description": "Old"})
+
+        with patch("services.usda_cache.time.time", return_value=1100.0), \
+             patch.object(service.client, "get", side_effect=UsdaQuotaExceeded("quota")), \
+             patch.object(service.client, "post", side_effect=UsdaQuotaExceeded("quota")):
+            single = service.get_details(1)
+            many = service.get_details_many([2, 3])
+        assert single == {"fdcId": 1, "description": "Old", "stale": True}
+        assert many["foods"][2]["stale"] is True
+        assert many["missing"] == [3]
+        assert many["quota_limited"] is True
+
 if __name__ == "__main__":
     pytest.main(["-xvs", __file__]) 
\ No newline at end of file
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# test_nutrition_fallback.py
+
+import os
+import sys
+import pytest
+
+# backend/functions 直下をモジュール検索パスに追加
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from services.nutrition_fallback import estimate_nutrition, find_fallback_food
+
+
+class TestNutritionFallback:
+    @pytest.mark.parametrize("query, expected", [
+        ("ご飯", "ご飯"),
+        ("ご飯 150g", "ご飯"),
+        ("食パン", "パン"),
+        ("たまご", "卵"),
+        ("冷凍食パン", "パン"),
+        ("white rice", "ご飯"),
+        ("Bread, whole wheat", "パン"),
+    ])
+    def test_find_fallback_food(self, query, expected):
+        assert find_fallback_food(query)["name"] == expected
+
+    @pytest.mark.parametrize("query", ["パンプキン", "ピーナッツバターパン", "卵焼き", "米粉", "ricecake", "鶏肉"])
+    def test_no_partial_matches(self, query):
+        """別名を含む別の食品を推定値の食品としない"""
+        assert find_fallback_food(query) is None
+
+    def test_estimate_nutrition_per_100g(self):
+        summary = estimate_nutrition("卵")
+        assert summary["energy_kcal"] == 140.0
+        assert summary["per_unit"]["unit"] == "1個"
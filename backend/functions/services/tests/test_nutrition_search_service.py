@@ -11,11 +11,14 @@ import requests
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 
 from services.nutrition_search_service import NutritionSearchService
+from services.usda_cache import TwoTierCache
 
 class TestNutritionSearchService:
 
     def setup_method(self):
-        self.service = NutritionSearchService()
+        # テスト間で結果が共有されないよう専用のメモリキャッシュを使用
+        self.cache = TwoTierCache("test_search", ttl=60, max_bytes=1024 * 1024)
+        self.service = NutritionSearchService(cache=self.cache)
 
     def teardown_method(self):
         # 環境変数のクリア
@@ -37,27 +40,49 @@ class TestNutritionSearchService:
         dummy_response.raise_for_status.return_value = None
         dummy_response.json.return_value = {"foods": [{"id": 1}]}  
 
-        with patch("services.nutrition_search_service.requests.post", return_value=dummy_response) as mock_post:
+        with patch.object(self.service.client, "post", return_value=dummy_response) as mock_post:
             result = self.service.search("apple", ["Foundation"], 5, 2)
             mock_post.assert_called_once_with(
                 self.service.url,
                 json={
-                    "api_key": "dummy-key",
                     "query": "apple",
                     "pageSize": 5,
                     "pageNumber": 2,
                     "dataType": ["Foundation"]
-                }
+                },
+                params={"api_key": "dummy-key"}
             )
             assert result == {"foods": [{"id": 1}]}  
 
+    def test_search_uses_cache(self, monkeypatch):
+        """同一条件の2回目の検索はキャッシュから返却される"""
+        monkeypatch.setenv("USDA_API_KEY", "dummy-key")
+        dummy_response = MagicMock()
+        dummy_response.raise_for_status.return_value = None
+        dummy_response.json.return_value = {"foods": [{"fdcId": 1}]}
+
+        with patch.object(self.service.client, "post", return_value=dummy_response) as mock_post:
+            first = self.service.search("Rice", ["SR Legacy", "Foundation"], 5, 1)
+            second = self.service.search("  rice ", ["Foundation", "SR Legacy"], 5, 1)
+            assert mock_post.call_count == 1
+            assert first == second
+            assert self.cache.stats()["hits"] == 1
+
+    def test_search_error_not_cached(self, monkeypatch):
+        """エラー結果はキャッシュされない"""
+        monkeypatch.setenv("USDA_API_KEY", "dummy-key")
+        with patch.object(self.service.client, "post", side_effect=Exception("conn err")) as mock_post:
+            self.service.search("apple")
+            self.service.search("apple")
+            assert mock_post.call_count == 2
+
     def test_search_http_error(self, monkeypatch):
         """異常系: HTTPエラー発生時はエラーを返す"""
         monkeypatch.setenv("USDA_API_KEY", "dummy-key")
         dummy_response = MagicMock()
         dummy_response.raise_for_status.side_effect = requests.exceptions.HTTPError("404 Not Found")
 
-        with patch("services.nutrition_search_service.requests.post", return_value=dummy_response):
+        with patch.object(self.service.client, "post", return_value=dummy_response):
             result = self.service.search("apple")
             assert "error" in result
             assert "404 Not Found" in result["error"]
@@ -65,7 +90,7 @@ class TestNutritionSearchService:
     def test_search_exception(self, monkeypatch):
         """異常系: その他例外発生時はエラーを返す"""
         monkeypatch.setenv("USDA_API_KEY", "dummy-key")
-        with patch("services.nutrition_search_service.requests.post", side_effect=Exception("conn err")):
+        with patch.object(self.service.client, "post", side_effect=Exception("conn err")):
             result = self.service.search("apple")
             assert "error" in result
             assert "conn err" in result["error"]
@@ -87,6 +87,68 @@ class TestNutritionService:
         assert "サーバーエラー" in result["error"]
         assert "DB接続失敗" in result["error"]
 
+    def test_save_entry_scales_per_100g(self):
+        """正常系: 100gあたりの栄養価を分量に換算して保存する"""
+        self.mock_repo.create_entry.return_value = "entry-uuid-456"
+        per_100g = {"description": "卵", "energy_kcal": 142.0, "protein_g": 12.2, "serving_info": {}}
+        result = self.service.save_entry(
+            self.user_id, self.entry_date, self.meal_type, "卵", "2個", None, per_100g
+        )
+        expected = {"energy_kcal": 142.0, "protein_g": 12.2}
+        self.mock_repo.create_entry.assert_called_once_with(
+            self.user_id, self.entry_date, self.meal_type, "卵", "2個", expected, quantity_g=100.0
+        )
+        assert result["success"] is True
+        assert result["quantity_g"] == 100.0
+        assert result["portion_source"] == "portion_table"
+        assert result["nutrients"] == expected
+
+    def test_save_entry_uses_usda_portions(self):
+        """正常系: fdc_id の foodPortions で分量を換算する"""
+        self.mock_repo.create_entry.return_value = "entry-uuid-789"
+        details = {"fdcId": 1, "foodPortions": [{"amount": 1, "gramWeight": 182, "modifier": "medium"}]}
+        with patch("services.nutrition_service.NutritionDetailsService") as mock_details_service:
+            mock_details_service.return_value.get_details.return_value = details
+            result = self.service.save_entry(
+                self.user_id, self.entry_date, self.meal_type, "avocado", "1個", None,
+                {"energy_kcal": 160.0}, 1
+            )
+        mock_details_service.return_value.get_details.assert_called_once_with(1)
+        assert result["quantity_g"] == 182.0
+        assert result["portion_source"] == "usda_portion"
+        assert result["nutrients"] == {"energy_kcal": 291.2}
+
+    def test_save_entry_skips_details_for_mass_and_table_units(self):
+        """重量単位・目安量テーブルで換算できる場合は USDA 詳細を取得しない"""
+        self.mock_repo.create_entry.return_value = "entry-uuid-789"
+        with patch("services.nutrition_service.NutritionDetailsService") as mock_details_service:
+            grams = self.service.save_entry(
+                self.user_id, self.entry_date, self.meal_type, "avocado", "150g", None, {"energy_kcal": 160.0}, 1
+            )
+            table = self.service.save_entry(
+                self.user_id, self.entry_date, self.meal_type, "卵", "2個", None, {"energy_kcal": 142.0}, 2
+            )
+        mock_details_service.return_value.get_details.assert_not_called()
+        assert grams["portion_source"] == "quantity"
+        assert table["portion_source"] == "portion_table"
+
+    def test_save_entry_unresolved_quantity(self):
+        """分量を換算できない場合は nutrients をそのまま保存し、無ければエラー"""
+        self.mock_repo.create_entry.return_value = "entry-uuid-123"
+        result = self.service.save_entry(
+            self.user_id, self.entry_date, self.meal_type, "謎の食品", "少々", self.nutrients, {"energy_kcal": 100.0}
+        )
+        self.mock_repo.create_entry.assert_called_once_with(
+            self.user_id, self.entry_date, self.meal_type, "謎の食品", "少々", self.nutrients
+        )
+        assert result == {"success": True, "entry_id": "entry-uuid-123"}
+
+        result = self.service.save_entry(
+            self.user_id, self.entry_date, self.meal_type, "謎の食品", "少々", None, {"energy_kcal": 100.0}
+        )
+        assert result["success"] is False
+        assert "換算できません" in result["error"]
+
     # get_entryメソッドのテストを追加
     def test_get_entry_success(self):
         """正常系: エントリが存在する場合のテスト"""
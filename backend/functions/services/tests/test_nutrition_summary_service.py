@@ -8,7 +8,10 @@ import pytest
 # backend/functions 直下をモジュール検索パスに追加
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 
-from services.nutrition_summary_service import NutritionSummaryService
+import numpy as np
+
+from services.nutrition_summary_service import NUTRIENT_COLUMNS, NutritionSummaryService
+from services.nutrient_registry import FIELD_KEYS, extract_nutrient_values
 
 class TestNutritionSummaryService:
     @pytest.fixture(autouse=True)
@@ -89,4 +92,108 @@ class TestNutritionSummaryService:
 
     def test_default_description(self):
         result = self.service.summarize({})
-        assert result["description"] == "不明な食品"
\ No newline at end of file
+        assert result["description"] == "不明な食品"
+
+    def test_food_nutrients_by_number(self):
+        """栄養素番号で抽出するため、表示名が変わっても取得できる"""
+        food_data = {
+            "description": "Renamed",
+            "foodNutrients": [
+                {"nutrient": {"number": "203", "name": "Protein (renamed)", "unitName": "g"}, "amount": 12.5},
+                {"nutrient": {"number": "307", "name": "Sodium", "unitName": "mg"}, "amount": 140},
+                {"nutrient": {"number": "999", "name": "Protein", "unitName": "g"}, "amount": 99},
+            ]
+        }
+        result = self.service.summarize(food_data)
+        assert result["protein_g"] == 12.5
+        assert result["sodium_mg"] == 140
+
+    def test_energy_prefers_kcal_over_kj_and_atwater(self):
+        """Foundation 食品の kJ 表記や Atwater エネルギーより 208(kcal) を優先する"""
+        food_data = {
+            "description": "Foundation Food",
+            "foodNutrients": [
+                {"nutrient": {"number": "958", "name": "Energy (Atwater Specific Factors)", "unitName": "kcal"}, "amount": 140},
+                {"nutrient": {"number": "208", "name": "Energy", "unitName": "kcal"}, "amount": 143},
+                {"nutrient": {"number": "268", "name": "Energy", "unitName": "kJ"}, "amount": 598},
+            ]
+        }
+        assert self.service.summarize(food_data)["energy_kcal"] == 143
+
+    def test_energy_falls_back_to_atwater(self):
+        food_data = {
+            "foodNutrients": [
+                {"nutrient": {"number": "957", "name": "Energy (Atwater General Factors)", "unitName": "kcal"}, "amount": 150},
+                {"nutrient": {"number": "958", "name": "Energy (Atwater Specific Factors)", "unitName": "kcal"}, "amount": 148},
+            ]
+        }
+        assert self.service.summarize(food_data)["energy_kcal"] == 148
+
+    def test_extract_nutrient_values_layout(self):
+        """検索APIの形式にも対応し、固定レイアウトの配列を返す"""
+        values = extract_nutrient_values([
+            {"nutrientNumber": "205", "nutrientName": "Carbohydrate, by difference", "unitName": "G", "value": 28.2},
+            {"nutrientName": "Energy", "unitName": "KJ", "value": 500},
+        ])
+        assert len(values) == len(FIELD_KEYS)
+        assert values[FIELD_KEYS.index("carbohydrates_g")] == 28.2
+        assert values[FIELD_KEYS.index("energy_kcal")] is None
+
+    def test_summarize_many_matrix(self):
+        """複数食品を1つの行列にまとめ、サービングサイズをベクトル演算で正規化する"""
+        foods = [
+            {"description": "A", "foodNutrients": [{"nutrient": {"number": "203"}, "amount": 10}]},
+            {"description": "B", "servingSize": 50, "servingSizeUnit": "g",
+             "labelNutrients": {"protein": {"value": 4}, "calories": {"value": 60}}},
+        ]
+        matrix, columns = self.service.summarize_many(foods)
+        assert matrix.shape == (2, len(FIELD_KEYS))
+        assert columns is NUTRIENT_COLUMNS
+        assert matrix[0, columns["protein_g"]] == 10
+        assert matrix[1, columns["protein_g"]] == 8
+        assert matrix[1, columns["energy_kcal"]] == 120
+        assert np.isnan(matrix[0, columns["fat_g"]])
+
+    def test_summary_rows_match_summarize(self):
+        """行ビューは summarize と同じ辞書になり、行列をコピーしない"""
+        foods = [
+            {
+                "description": "Mixed",
+                "servingSize": 30, "servingSizeUnit": "g",
+                "labelNutrients": {"protein": {"value": 3.333}},
+                "foodNutrients": [
+                    {"nutrient": {"number": "204", "name": "Total lipid (fat)"}, "amount": 1.234},
+                    {"nutrient": {"number": "208", "name": "Energy", "unitName": "kcal"}, "amount": 120},
+                ],
+            },
+            {"description": "Empty"},
+        ]
+        matrix, _ = self.service.summarize_many(foods)
+        rows = self.service.summary_rows(foods, matrix)
+        for food, row in zip(foods, rows):
+            assert row.to_dict() == self.service.summarize(food)
+            assert list(row) == list(self.service.summarize(food))
+        assert np.shares_memory(rows[0]._values, matrix)
+        with pytest.raises(KeyError):
+            rows[1]["protein_g"]
+
+    def test_summarize_search_hit(self):
+        """検索結果に主要栄養素が揃っていればそのまま100gあたりのサマリーにする"""
+        hit = {
+            "description": "Bread, white",
+            "servingSize": 28, "servingSizeUnit": "g",
+            "foodNutrients": [
+                {"nutrientNumber": "208", "nutrientName": "Energy", "unitName": "KCAL", "value": 266},
+                {"nutrientNumber": "268", "nutrientName": "Energy", "unitName": "kJ", "value": 1113},
+                {"nutrientNumber": "203", "nutrientName": "Protein", "unitName": "G", "value": 7.64},
+                {"nutrientNumber": "204", "nutrientName": "Total lipid (fat)", "unitName": "G", "value": 3.29},
+                {"nutrientNumber": "205", "nutrientName": "Carbohydrate, by difference", "unitName": "G", "value": 50.6},
+            ],
+        }
+        summary = self.service.summarize_search_hit(hit)
+        assert summary["energy_kcal"] == 266
+        assert summary["carbohydrates_g"] == 50.6
+        assert summary["serving_info"]["conversion_factor"] == 1.0
+
+        hit["foodNutrients"] = hit["foodNutrients"][:3]
+        assert self.service.summarize_search_hit(hit) is None
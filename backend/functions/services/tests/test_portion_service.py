@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# test_portion_service.py
+
+import os
+import sys
+import pytest
+
+# backend/functions 直下をモジュール検索パスに追加
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from services.nutrition_details_service import compact_food_details
+from services.portion_service import (
+    ParsedQuantity, PortionService, find_portion_entry, parse_quantity, usda_portions
+)
+
+
+class TestPortionService:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.service = PortionService()
+
+    @pytest.mark.parametrize("text, expected", [
+        ("170g", ParsedQuantity(170.0, "g")),
+        ("１５０ｇ", ParsedQuantity(150.0, "g")),
+        ("1.5kg", ParsedQuantity(1.5, "kg")),
+        ("1個", ParsedQuantity(1.0, "個")),
+        ("2枚", ParsedQuantity(2.0, "枚")),
+        ("大さじ2", ParsedQuantity(2.0, "大さじ")),
+        ("小さじ1/2", ParsedQuantity(0.5, "小さじ")),
+        ("半丁", ParsedQuantity(0.5, "丁")),
+        ("ご飯一杯", ParsedQuantity(1.0, "杯")),
+        ("2 slices", ParsedQuantity(2.0, "枚")),
+        ("少々", None),
+    ])
+    def test_parse_quantity(self, text, expected):
+        assert parse_quantity(text) == expected
+
+    def test_resolve_mass_and_table(self):
+        assert self.service.resolve("170g", "鶏むね肉") == (170.0, "quantity")
+        assert self.service.resolve("2個", "ゆで卵") == (100.0, "portion_table")
+        assert self.service.resolve("1枚", "食パン") == (60.0, "portion_table")
+        assert self.service.resolve("大さじ2", "味噌") == (36.0, "portion_table")
+        # 単位を持つエントリを優先する（「塩」ではなく「鮭」）
+        assert self.service.resolve("1切れ", "塩鮭") == (80.0, "portion_table")
+
+    def test_table_matches_whole_food_names(self):
+        """目安量の別名は食品名全体（修飾語付きを含む）に一致する場合のみ使い、別の食品の一部には一致させない"""
+        assert find_portion_entry("鶏もも肉")["name"] == find_portion_entry("国産鶏もも肉")["name"]
+        assert find_portion_entry("豚もも肉") is None
+        assert find_portion_entry("パンプキン") is None
+        assert find_portion_entry("Bread, white, commercially prepared")["name"] == find_portion_entry("食パン")["name"]
+        assert find_portion_entry("rice flour") is None
+
+    def test_resolve_volume(self):
+        """体積は目安量の比重、なければ比重1で換算する"""
+        assert self.service.resolve("1カップ", "醤油") == (240.0, "portion_table")
+        assert self.service.resolve("200ml", "水") == (200.0, "volume_estimate")
+
+    def test_resolve_usda_portions(self):
+        details = compact_food_details({
+            "fdcId": 1,
+            "foodPortions": [
+                {"amount": 1.0, "gramWeight": 244.0, "measureUnit": {"id": 1000, "name": "cup"}, "modifier": ""},
+                {"amount": 1.0, "gramWeight": 136.0, "measureUnit": {"name": "undetermined"}, "modifier": "medium"},
+            ],
+        })
+        assert details["foodPortions"][0] == {"amount": 1.0, "gramWeight": 244.0, "measureUnit": {"name": "cup"}}
+        assert self.service.resolve("1個", "avocado", details) == (136.0, "usda_portion")
+        # 米国の1カップ（236.6ml）の値を日本の1カップ（200ml）に換算
+        assert self.service.resolve("1カップ", "yogurt", details).grams == pytest.approx(206.26, abs=0.01)
+
+    def test_household_serving(self):
+        details = {"servingSize": 28.0, "servingSizeUnit": "g", "householdServingFullText": "1 slice"}
+        assert usda_portions(details) == [("枚", 28.0)]
+
+    def test_unresolved_count_unit(self):
+        """目安量が不明な個数単位は推測しない"""
+        assert self.service.resolve("1個", "謎の食品") is None
+        assert self.service.resolve("少々", "塩") is None
+
+    def test_scale(self):
+        per_100g = {"description": "卵", "energy_kcal": 142.0, "protein_g": 12.2, "match_score": 1.0}
+        assert self.service.scale(per_100g, 50.0) == {"energy_kcal": 71.0, "protein_g": 6.1}
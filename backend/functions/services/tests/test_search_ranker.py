@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# test_search_ranker.py
+
+import os
+import sys
+import time
+
+# backend/functions 直下をモジュール検索パスに追加
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from services.search_ranker import best_search_hit, rank_search_hits, tokenize
+
+RICE_HITS = [
+    {"fdcId": 1, "description": "Crackers, rice", "dataType": "Branded"},
+    {"fdcId": 2, "description": "RICE, WHITE, COOKED", "dataType": "Branded"},
+    {"fdcId": 3, "description": "Rice, white, long-grain, regular, raw, enriched", "dataType": "SR Legacy"},
+    {"fdcId": 4, "description": "Rice, white, long-grain, regular, cooked, unenriched", "dataType": "SR Legacy"},
+    {"fdcId": 5, "description": "Rice, white, cooked, with fat", "dataType": "Survey (FNDDS)"},
+]
+
+
+class TestSearchRanker:
+    def test_tokenize(self):
+        assert tokenize("Eggs, whole, BERRIES") == ["egg", "whole", "berry"]
+        assert tokenize("ご飯") == []
+
+    def test_prefers_quality_data_over_search_order(self):
+        """Branded の先頭ヒットより SR Legacy の基本食材を選ぶ"""
+        assert best_search_hit("rice white cooked", RICE_HITS)["fdcId"] == 4
+
+    def test_cooking_state(self):
+        """クエリの調理状態と異なる食品は減点する"""
+        ranked = rank_search_hits("rice white raw", RICE_HITS)
+        assert ranked[0].food["fdcId"] == 3
+        cooked = [hit for hit in ranked if "cooked" in hit.food["description"].lower()]
+        assert all(hit.score < ranked[0].score - 0.2 for hit in cooked)
+
+    def test_head_match(self):
+        """食品名の先頭区切りがクエリの語である基本食材を優先する"""
+        hits = [
+            {"fdcId": 1, "description": "Crackers, rice", "dataType": "SR Legacy"},
+            {"fdcId": 2, "description": "Rice, brown, cooked", "dataType": "SR Legacy"},
+        ]
+        assert best_search_hit("rice", hits)["fdcId"] == 2
+
+    def test_ties_keep_search_order(self):
+        hits = [{"fdcId": 1, "description": "Apple"}, {"fdcId": 2, "description": "Apple"}]
+        assert [hit.index for hit in rank_search_hits("apple", hits)] == [0, 1]
+        assert best_search_hit("apple", []) is None
+
+    def test_target_food(self):
+        hits = [
+            {"fdcId": 1, "description": "Chicken, thigh, raw", "dataType": "SR Legacy"},
+            {"fdcId": 2, "description": "Chicken, breast, raw", "dataType": "SR Legacy"},
+        ]
+        assert best_search_hit("chicken raw", hits, target_food="chicken breast")["fdcId"] == 2
+
+    def test_ranks_200_hits_quickly(self):
+        hits = [
+            {"fdcId": i, "description": f"Chicken, breast, meat only, cooked, roasted {i}", "dataType": "SR Legacy"}
+            for i in range(200)
+        ]
+        rank_search_hits("chicken breast cooked", hits)
+        started = time.perf_counter()
+        for _ in range(20):
+            rank_search_hits("chicken breast cooked", hits)
+        elapsed_ms = (time.perf_counter() - started) / 20 * 1000
+        # 目標は1ミリ秒未満。共有CI環境の揺らぎを考慮して余裕を持たせる
+        assert elapsed_ms < 5
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# test_text_similarity.py
+
+import os
+import sys
+import time
+from difflib import SequenceMatcher
+from itertools import combinations
+
+import pytest
+
+# backend/functions 直下をモジュール検索パスに追加
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from services.text_similarity import char_ngrams, mean_pairwise_similarity, ngram_matrix, similarity_to
+
+DESCRIPTIONS = [
+    "Chicken, broilers or fryers, breast, meat only, cooked, roasted",
+    "Chicken, broilers or fryers, breast, meat and skin, cooked, roasted",
+    "Chicken, breast, skinless, boneless, raw",
+    "Rice, white, cooked",
+    "Crackers, rice",
+    "Apples, raw, with skin",
+]
+
+
+class TestTextSimilarity:
+    def test_char_ngrams(self):
+        assert char_ngrams("Egg") == [" e", "eg", "gg", "g "]
+
+    def test_rows_are_normalized(self):
+        matrix = ngram_matrix(["rice", "", "rice"])
+        assert matrix[0] @ matrix[2] == pytest.approx(1.0)
+        assert not matrix[1].any()
+
+    def test_similarity_close_to_sequence_matcher(self):
+        """SequenceMatcher.ratio() との差は平均で0.1程度に収まる"""
+        query = "chicken breast cooked"
+        similarities = similarity_to(query, DESCRIPTIONS)
+        errors = [
+            abs(SequenceMatcher(None, query, description.lower()).ratio() - similarity)
+            for description, similarity in zip(DESCRIPTIONS, similarities)
+        ]
+        assert sum(errors) / len(errors) < 0.15
+        assert similarities[:2].min() > similarities[2:].max()
+        assert similarity_to(query, []).size == 0
+
+    def test_mean_pairwise_matches_brute_force(self):
+        matrix = ngram_matrix(DESCRIPTIONS)
+        pairs = [matrix[i] @ matrix[j] for i, j in combinations(range(len(DESCRIPTIONS)), 2)]
+        assert mean_pairwise_similarity(DESCRIPTIONS) == pytest.approx(sum(pairs) / len(pairs))
+        assert mean_pairwise_similarity(DESCRIPTIONS[:1]) == 0.0
+
+    def test_scales_to_200_descriptions(self):
+        descriptions = [f"{description} {i}" for i in range(34) for description in DESCRIPTIONS][:200]
+        started = time.perf_counter()
+        mean_pairwise_similarity(descriptions)
+        similarity_to("chicken breast cooked", descriptions)
+        # SequenceMatcher の全ペア比較（約2万ペア）は数秒かかる
+        assert time.perf_counter() - started < 0.5
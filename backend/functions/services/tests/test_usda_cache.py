@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# test_usda_cache.py
+
+import os
+import sys
+import threading
+import time
+import pytest
+from unittest.mock import patch
+
+# backend/functions 直下をモジュール検索パスに追加
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from services.usda_cache import (
+    LruByteCache,
+    TwoTierCache,
+    decode_payload,
+    encode_payload,
+    search_cache_key,
+)
+
+
+class FakePersistentTier:
+    """Firestore リポジトリの代わりに使うインメモリ実装"""
+
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, payload, expires_at):
+        self.store[key] = (payload, expires_at)
+
+
+class TestUsdaCache:
+
+    def test_payload_roundtrip(self):
+        value = {"foods": [{"fdcId": 1, "description": "ご飯"}]}
+        assert decode_payload(encode_payload(value)) == value
+
+    def test_search_cache_key_normalization(self):
+        """クエリ・データタイプの表記揺れは同じキーになる"""
+        key1 = search_cache_key("Chicken  Breast", ["SR Legacy", "Foundation"], 25, 1)
+        key2 = search_cache_key(" chicken breast ", ["Foundation", "SR Legacy"], 25, 1)
+        assert key1 == key2
+        assert search_cache_key("chicken breast", None, 25, 2) != key1
+        assert search_cache_key("chicken breast", None, 5, 1) != search_cache_key("chicken breast", None, 25, 1)
+
+    def test_lru_evicts_by_bytes(self):
+        cache = LruByteCache(max_bytes=100)
+        cache.set("a", 1, 40, None)
+        cache.set("b", 2, 40, None)
+        cache.get("a")  # a を最近使用済みにする
+        cache.set("c", 3, 40, None)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.evictions == 1
+        assert cache.current_bytes == 80
+
+    def test_lru_expires_entries(self):
+        cache = LruByteCache(max_bytes=100)
+        cache.set("a", 1, 10, expires_at=100.0)
+        assert cache.get("a", now=99.0) == 1
+        assert cache.get("a", now=100.0) is None
+        assert cache.current_bytes == 0
+
+    def test_two_tier_counters(self):
+        cache = TwoTierCache("test", ttl=60, max_bytes=1024)
+        assert cache.get("k") is None
+        cache.set("k", {"v": 1})
+        assert cache.get("k") == {"v": 1}
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_callers_get_independent_copies(self):
+        """呼び出し元が結果を変更しても、キャッシュ・他の呼び出し元の結果は変わらない"""
+        cache = TwoTierCache("test", ttl=60, max_bytes=1024, stale_ttl=60)
+        value = {"foods": [{"fdcId": 2}, {"fdcId": 1}]}
+        cache.set("k", value)
+        value["foods"].append({"fdcId": 3})
+
+        first = cache.get("k")
+        first["foods"].sort(key=lambda food: food["fdcId"])
+        first["stale"] = True
+        assert cache.get("k") == {"foods": [{"fdcId": 2}, {"fdcId": 1}]}
+        assert cache.get_stale("k") == {"foods": [{"fdcId": 2}, {"fdcId": 1}]}
+
+    def test_counters_under_concurrent_access(self):
+        """同時に参照しても統計の件数が欠けない"""
+        cache = TwoTierCache("test", ttl=60, max_bytes=1024)
+        cache.set("k", {"v": 1})
+
+        def lookup():
+            for _ in range(500):
+                cache.get("k")
+                cache.get("missing")
+
+        threads = [threading.Thread(target=lookup) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = cache.stats()
+        assert stats["hits"] == 4000
+        assert stats["misses"] == 4000
+
+    def test_persistent_tier_is_shared(self):
+        """別インスタンス（別プロセス相当）のキャッシュは永続層からヒットする"""
+        tier = FakePersistentTier()
+        writer = TwoTierCache("writer", ttl=60, max_bytes=1024, persistent_factory=lambda: tier)
+        reader = TwoTierCache("reader", ttl=60, max_bytes=1024, persistent_factory=lambda: tier)
+        writer.set("k", {"foods": []})
+        assert reader.get("k") == {"foods": []}
+        assert reader.stats()["persistent_hits"] == 1
+        # 2回目はメモリ層からヒット
+        assert reader.get("k") == {"foods": []}
+        assert reader.stats()["persistent_hits"] == 1
+
+    def test_persistent_tier_failure_disables_tier(self):
+        """永続層の生成に失敗してもメモリ層のみで動作する"""
+        def broken_factory():
+            raise ValueError("Firebase 未初期化")
+
+        cache = TwoTierCache("test", ttl=60, max_bytes=1024, persistent_factory=broken_factory)
+        cache.set("k", 1)
+        assert cache.get("k") == 1
+        assert cache.get("missing") is None
+
+    def test_expired_persistent_entry_is_miss(self):
+        tier = FakePersistentTier()
+        tier.set("k", encode_payload({"v": 1}), 1.0)
+        cache = TwoTierCache("test", ttl=60, max_bytes=1024, persistent_factory=lambda: tier)
+        assert cache.get("k") is None
+
+    def test_stale_entries_within_grace(self):
+        """期限切れ後も stale_ttl の間は get_stale で取得できる"""
+        tier = FakePersistentTier()
+        cache = TwoTierCache("test", ttl=60, max_bytes=1024, persistent_factory=lambda: tier, stale_ttl=100)
+        with patch("services.usda_cache.time.time", return_value=1000.0):
+            cache.set("k", {"v": 1})
+        with patch("services.usda_cache.time.time", return_value=1100.0):
+            assert cache.get("k") is None
+            assert cache.get_stale("k") == {"v": 1}
+        with patch("services.usda_cache.time.time", return_value=1200.0):
+            assert cache.get_stale("k") is None
+        assert cache.stats()["stale_hits"] == 1
+
+    def test_stale_entry_from_persistent_tier(self):
+        tier = FakePersistentTier()
+        tier.set("k", encode_payload({"v": 1}), time.time() - 10)
+        cache = TwoTierCache("test", ttl=60, max_bytes=1024, persistent_factory=lambda: tier, stale_ttl=60)
+        assert cache.get("k") is None
+        assert cache.get_stale("k") == {"v": 1}
+
+    def test_disabled_cache(self):
+        cache = TwoTierCache("test", ttl=60, max_bytes=1024, enabled=False)
+        cache.set("k", 1)
+        assert cache.get("k") is None
+
+if __name__ == "__main__":
+    pytest.main(["-xvs", __file__])
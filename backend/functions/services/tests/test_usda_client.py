@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# test_usda_client.py
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+import httpx
+import pytest
+import requests
+from unittest.mock import MagicMock, patch
+
+# backend/functions 直下をモジュール検索パスに追加
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from services.usda_client import AsyncUsdaClient, SingleFlight, UsdaClient, get_async_usda_client, get_usda_client
+from services.nutrition_search_service import AsyncNutritionSearchService, NutritionSearchService
+from services.nutrition_details_service import AsyncNutritionDetailsService, NutritionDetailsService
+from services.usda_cache import TwoTierCache
+from services.usda_rate_limiter import UsdaQuotaExceeded
+
+
+class TestUsdaClient:
+
+    def test_shared_client_is_singleton(self):
+        """get_usda_client は常に同じインスタンスを返す"""
+        assert get_usda_client() is get_usda_client()
+
+    def test_services_share_client(self):
+        """検索・詳細サービスが同じセッションを共有する"""
+        search_service = NutritionSearchService()
+        details_service = NutritionDetailsService()
+        assert search_service.client is details_service.client
+        assert search_service.client.session is get_usda_client().session
+
+    def test_adapter_applies_pool_without_retry(self):
+        """プールサイズはアダプタに反映し、アダプタ側ではリトライしない（レート制限を通らないため）"""
+        client = UsdaClient(pool_size=4, max_retries=2)
+        adapter = client.session.get_adapter("https://api.nal.usda.gov")
+        assert adapter._pool_maxsize == 4
+        assert adapter.max_retries.total == 0
+        assert client.max_retries == 2
+        client.close()
+
+    def test_retries_take_a_rate_limiter_token_per_attempt(self):
+        """5xx・通信エラーのリトライも試行ごとにレート制限のトークンを取得し、429 はリトライしない"""
+        limiter = MagicMock()
+        limiter.try_acquire.return_value = True
+        client = UsdaClient(max_retries=2, backoff_factor=0, rate_limiter=limiter)
+        responses = [
+            requests.exceptions.ConnectionError("reset"),
+            MagicMock(status_code=503, headers={}),
+            MagicMock(status_code=200, headers={}),
+        ]
+        with patch.object(client.session, "get", side_effect=responses) as mock_get:
+            response = client.get("https://example.com/food/1")
+        assert response.status_code == 200
+        assert mock_get.call_count == 3
+        assert limiter.try_acquire.call_count == 3
+
+        limiter.try_acquire.reset_mock()
+        with patch.object(client.session, "get", return_value=MagicMock(status_code=429, headers={})) as mock_get:
+            with pytest.raises(UsdaQuotaExceeded):
+                client.get("https://example.com/food/2")
+        assert mock_get.call_count == 1
+        assert limiter.try_acquire.call_count == 1
+        client.close()
+
+    def test_timeout_is_applied(self):
+        """GET/POST の両方にタイムアウトが渡される"""
+        client = UsdaClient(timeout=7)
+        with patch.object(client.session, "get", return_value=MagicMock()) as mock_get:
+            client.get("https://example.com/food/1", params={"api_key": "k"})
+            mock_get.assert_called_once_with("https://example.com/food/1", params={"api_key": "k"}, timeout=7)
+        with patch.object(client.session, "post", return_value=MagicMock()) as mock_post:
+            client.post("https://example.com/foods/search", json={"query": "egg"})
+            mock_post.assert_called_once_with("https://example.com/foods/search", json={"query": "egg"}, params=None, timeout=7)
+
+    def test_url_building(self):
+        client = UsdaClient(base_url="https://api.nal.usda.gov/fdc/v1/")
+        assert client.url("foods/search") == "https://api.nal.usda.gov/fdc/v1/foods/search"
+        assert client.url("/food") == "https://api.nal.usda.gov/fdc/v1/food"
+
+
+class TestSingleFlight:
+
+    def test_concurrent_identical_gets_share_one_call(self):
+        """同時に発生した同一GETは1回のHTTP呼び出しにまとまる"""
+        client = UsdaClient()
+        release = threading.Event()
+        response = MagicMock()
+
+        def slow_get(*args, **kwargs):
+            release.wait(1)
+            return response
+
+        results = []
+        with patch.object(client.session, "get", side_effect=slow_get) as mock_get:
+            threads = [
+                threading.Thread(target=lambda: results.append(client.get("https://example.com/food/1", params={"api_key": "k"})))
+                for _ in range(5)
+            ]
+            for thread in threads:
+                thread.start()
+            time.sleep(0.05)
+            release.set()
+            for thread in threads:
+                thread.join()
+
+        assert mock_get.call_count == 1
+        assert all(result is response for result in results)
+        assert client.stats() == {"requests": 1, "coalesced": 4}
+        client.close()
+
+    def test_different_requests_are_not_coalesced(self):
+        """パラメータやボディが異なるリクエストは別々に送信する"""
+        client = UsdaClient()
+        with patch.object(client.session, "post", return_value=MagicMock()) as mock_post:
+            client.post("https://example.com/foods/search", json={"query": "egg"})
+            client.post("https://example.com/foods/search", json={"query": "rice"})
+            client.post("https://example.com/foods/search", json={"query": "egg"})
+        assert mock_post.call_count == 3
+        assert client.stats()["coalesced"] == 0
+        client.close()
+
+    def test_error_is_shared_with_waiters(self):
+        """先行呼び出しの例外は相乗りした呼び出し元にも伝わる"""
+        flight = SingleFlight()
+        release = threading.Event()
+        errors = []
+
+        def failing():
+            release.wait(1)
+            raise ValueError("boom")
+
+        def call():
+            try:
+                flight.do("key", failing)
+            except ValueError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join()
+        assert len(errors) == 3
+        assert flight.executed == 1 and flight.coalesced == 2
+
+
+def _mock_async_client(handler, **kwargs) -> AsyncUsdaClient:
+    """httpx.MockTransport でリクエストを処理する AsyncUsdaClient を生成する"""
+    client = AsyncUsdaClient(base_url="https://example.com/fdc/v1", backoff_factor=0, **kwargs)
+    client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+class TestAsyncUsdaClient:
+
+    def test_async_client_shared_within_loop(self):
+        """同じイベントループ内では同じ AsyncUsdaClient を共有する"""
+        async def run():
+            search_service = AsyncNutritionSearchService()
+            details_service = AsyncNutritionDetailsService()
+            return search_service.client is details_service.client is get_async_usda_client()
+        assert asyncio.run(run())
+
+    def test_retries_transient_status(self):
+        """503 はリトライし、成功したレスポンスを返す"""
+        statuses = [503, 200]
+
+        def handler(request):
+            return httpx.Response(statuses.pop(0), json={"ok": True})
+
+        async def run():
+            client = _mock_async_client(handler, max_retries=2)
+            response = await client.get(client.url("food/1"))
+            await client.aclose()
+            return response
+        response = asyncio.run(run())
+        assert response.status_code == 200
+        assert statuses == []
+
+    def test_concurrent_identical_requests_coalesce(self):
+        """同じイベントループ内の同時の同一リクエストは1回にまとまる"""
+        calls = []
+
+        async def handler(request):
+            calls.append(request)
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, json={"fdcId": 1})
+
+        async def run():
+            client = _mock_async_client(handler)
+            url = client.url("food/1")
+            responses = await asyncio.gather(*(client.get(url, params={"api_key": "k"}) for _ in range(5)))
+            stats = client.stats()
+            await client.aclose()
+            return responses, stats
+        responses, stats = asyncio.run(run())
+        assert len(calls) == 1
+        assert all(response.json() == {"fdcId": 1} for response in responses)
+        assert stats == {"requests": 1, "coalesced": 4}
+
+    def test_async_search_service(self, monkeypatch):
+        """非同期検索サービスが api_key をクエリパラメータで送信し、結果をキャッシュする"""
+        monkeypatch.setenv("USDA_API_KEY", "dummy-key")
+        requests_seen = []
+
+        def handler(request):
+            requests_seen.append(request)
+            return httpx.Response(200, json={"foods": [{"fdcId": 1}]})
+
+        async def run():
+            service = AsyncNutritionSearchService(
+                client=_mock_async_client(handler),
+                cache=TwoTierCache("test_async_search", ttl=60, max_bytes=1024 * 1024),
+            )
+            first = await service.search("apple", page_size=5)
+            second = await service.search("apple", page_size=5)
+            return first, second
+        first, second = asyncio.run(run())
+        assert first == second == {"foods": [{"fdcId": 1}]}
+        assert len(requests_seen) == 1
+        assert requests_seen[0].url.params["api_key"] == "dummy-key"
+        assert requests_seen[0].url.path == "/fdc/v1/foods/search"
+
+    def test_async_details_many_runs_chunks_concurrently(self, monkeypatch):
+        """非同期の一括詳細取得は20件ごとのリクエストを全て送信して結果をまとめる"""
+        monkeypatch.setenv("USDA_API_KEY", "dummy-key")
+
+        def handler(request):
+            ids = json.loads(request.content)["fdcIds"]
+            return httpx.Response(200, json=[{"fdcId": fdc_id, "description": f"food {fdc_id}"} for fdc_id in ids])
+
+        async def run():
+            service = AsyncNutritionDetailsService(
+                client=_mock_async_client(handler),
+                cache=TwoTierCache("test_async_details", ttl=None, max_bytes=1024 * 1024),
+            )
+            return await service.get_details_many(range(1, 26))
+        result = asyncio.run(run())
+        assert sorted(result["foods"]) == list(range(1, 26))
+        assert result["missing"] == []
+
+    def test_async_details_http_error(self, monkeypatch):
+        """HTTPエラーは {"error": ...} で返す"""
+        monkeypatch.setenv("USDA_API_KEY", "dummy-key")
+
+        async def run():
+            service = AsyncNutritionDetailsService(
+                client=_mock_async_client(lambda request: httpx.Response(404), max_retries=0),
+                cache=TwoTierCache("test_async_details_error", ttl=None, max_bytes=1024 * 1024),
+            )
+            return await service.get_details(1)
+        result = asyncio.run(run())
+        assert "USDA API詳細取得エラー" in result["error"]
+
+if __name__ == "__main__":
+    pytest.main(["-xvs", __file__])
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# test_usda_rate_limiter.py
+
+import os
+import sys
+import pytest
+from unittest.mock import MagicMock, patch
+
+# backend/functions 直下をモジュール検索パスに追加
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from services.usda_rate_limiter import QUOTA_WINDOW_SECONDS, UsdaQuotaExceeded, UsdaRateLimiter
+from services.usda_client import UsdaClient
+from services.usda_cache import TwoTierCache
+from services.nutrition_search_service import NutritionSearchService
+from services.nutrition_details_service import NutritionDetailsService
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _response(status_code=200, headers=None, body=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.json.return_value = body or {}
+    response.raise_for_status.return_value = None
+    return response
+
+
+class TestUsdaRateLimiter:
+
+    def test_token_bucket_limits_burst_and_refills(self):
+        clock = FakeClock()
+        limiter = UsdaRateLimiter(rate_per_hour=3600, burst=2, reserve=0, clock=clock)
+        assert limiter.try_acquire()
+        assert limiter.try_acquire()
+        assert not limiter.try_acquire()
+        # 3600回/時 = 1秒に1トークン
+        clock.now += 1
+        assert limiter.try_acquire()
+        assert limiter.stats()["throttled"] == 1
+
+    def test_low_remaining_quota_blocks_until_window_passes(self):
+        clock = FakeClock()
+        limiter = UsdaRateLimiter(rate_per_hour=1000, burst=10, reserve=50, clock=clock)
+        limiter.observe(200, {"X-RateLimit-Remaining": "51", "X-RateLimit-Limit": "1000"})
+        assert limiter.try_acquire()
+        limiter.observe(200, {"X-RateLimit-Remaining": "50"})
+        assert limiter.quota_low()
+        assert not limiter.try_acquire()
+        assert limiter.stats()["limit"] == 1000
+        clock.now += QUOTA_WINDOW_SECONDS
+        assert not limiter.quota_low()
+        assert limiter.try_acquire()
+
+    def test_429_blocks_for_retry_after(self):
+        clock = FakeClock()
+        limiter = UsdaRateLimiter(rate_per_hour=1000, burst=10, reserve=0, clock=clock)
+        limiter.observe(429, {"Retry-After": "120"})
+        assert not limiter.try_acquire()
+        clock.now += 120
+        # Retry-After 経過後も、観測した残量0がウィンドウ内の間は抑止を続ける
+        assert limiter.stats()["remaining"] == 0
+        assert limiter.quota_low()
+
+    def test_ignores_non_numeric_headers(self):
+        limiter = UsdaRateLimiter(reserve=50)
+        limiter.observe(MagicMock(), MagicMock())
+        assert limiter.remaining is None
+        assert not limiter.quota_low()
+
+
+class TestQuotaAwareServices:
+
+    def setup_method(self):
+        self.clock = FakeClock()
+        self.limiter = UsdaRateLimiter(rate_per_hour=1000, burst=10, reserve=50, clock=self.clock)
+        self.client = UsdaClient(rate_limiter=self.limiter)
+
+    def teardown_method(self):
+        self.client.close()
+
+    def test_client_raises_when_quota_low(self, monkeypatch):
+        self.limiter.observe(200, {"X-RateLimit-Remaining": "10"})
+        with patch.object(self.client.session, "get") as mock_get:
+            with pytest.raises(UsdaQuotaExceeded):
+                self.client.get("https://example.com/food/1")
+            mock_get.assert_not_called()
+
+    def test_client_records_remaining_and_raises_on_429(self):
+        with patch.object(self.client.session, "get", return_value=_response(200, {"X-RateLimit-Remaining": "900"})):
+            self.client.get("https://example.com/food/1")
+        assert self.limiter.remaining == 900
+        with patch.object(self.client.session, "get", return_value=_response(429)):
+            with pytest.raises(UsdaQuotaExceeded):
+                self.client.get("https://example.com/food/2")
+        assert self.limiter.quota_low()
+
+    def test_search_serves_stale_entry_when_quota_low(self, monkeypatch):
+        monkeypatch.setenv("USDA_API_KEY", "dummy-key")
+        cache = TwoTierCache("test_stale_search", ttl=60, max_bytes=1024 * 1024, stale_ttl=3600)
+        service = NutritionSearchService(client=self.client, cache=cache)
+        with patch("services.usda_cache.time.time", return_value=1000.0), \
+             patch.object(self.client.session, "post", return_value=_response(200, body={"foods": [{"fdcId": 1}]})):
+            service.search("egg")
+
+        # TTL 切れ後、クォータ残量が少ない状態
+        self.limiter.observe(200, {"X-RateLimit-Remaining": "0"})
+        with patch("services.usda_cache.time.time", return_value=1061.0), \
+             patch.object(self.client.session, "post") as mock_post:
+            result = service.search("egg")
+            mock_post.assert_not_called()
+        assert result["foods"] == [{"fdcId": 1}]
+        assert result["stale"] is True
+        assert cache.stats()["stale_hits"] == 1
+
+    def test_details_returns_quota_limited_error_without_cache(self, monkeypatch):
+        monkeypatch.setenv("USDA_API_KEY", "dummy-key")
+        self.limiter.observe(200, {"X-RateLimit-Remaining": "0"})
+        service = NutritionDetailsService(
+            client=self.client,
+            cache=TwoTierCache("test_quota_details", ttl=None, max_bytes=1024 * 1024),
+        )
+        result = service.get_details(12345)
+        assert result["quota_limited"] is True
+        assert "クォータ" in result["error"]
+
+if __name__ == "__main__":
+    pytest.main(["-xvs", __file__])
@@ -0,0 +1,69 @@
+"""
+文字 n-gram のコサイン類似度を NumPy でまとめて計算するモジュール
+
+difflib.SequenceMatcher を全ペアに対して実行すると件数の2乗に比例して遅くなるため、
+文字 bigram の出現回数ベクトル（L2正規化済み）を行列にまとめ、行列演算で類似度を求めます。
+bigram のコサイン類似度は食品名の比較で SequenceMatcher.ratio() に近い値になります。
+"""
+
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+# 文字 n-gram の長さ（bigram が SequenceMatcher.ratio() に最も近い）
+NGRAM_SIZE = 2
+
+
+def char_ngrams(text: str, n: int = NGRAM_SIZE) -> List[str]:
+    """小文字化し、前後に空白を補った文字 n-gram のリストを返す"""
+    padded = f" {(text or '').lower()} "
+    return [padded[i:i + n] for i in range(len(padded) - n + 1)]
+
+
+def ngram_matrix(texts: Sequence[str], n: int = NGRAM_SIZE) -> np.ndarray:
+    """
+    テキストごとの文字 n-gram 出現回数を (テキスト数 × 語彙数) の行列にし、各行を L2 正規化して返す。
+    空文字列の行はゼロベクトルのまま。
+    """
+    vocabulary: Dict[str, int] = {}
+    rows: List[int] = []
+    columns: List[int] = []
+    for row, text in enumerate(texts):
+        for gram in char_ngrams(text, n) if text else ():
+            rows.append(row)
+            columns.append(vocabulary.setdefault(gram, len(vocabulary)))
+
+    matrix = np.zeros((len(texts), max(len(vocabulary), 1)))
+    np.add.at(matrix, (np.array(rows, dtype=np.intp), np.array(columns, dtype=np.intp)), 1.0)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+def similarity_to(query: str, texts: Sequence[str], n: int = NGRAM_SIZE) -> np.ndarray:
+    """query と各テキストのコサイン類似度（0〜1）の配列を返す"""
+    if not texts:
+        return np.zeros(0)
+    matrix = ngram_matrix([query, *texts], n)
+    return np.clip(matrix[1:] @ matrix[0], 0.0, 1.0)
+
+
+def mean_pairwise_similarity(texts: Sequence[str], n: int = NGRAM_SIZE) -> float:
+    """
+    全ペアのコサイン類似度の平均を返す（2件未満は 0.0）。
+    正規化済みベクトルの総和の二乗ノルムから対角成分を引くことで、ペアを列挙せずに求める。
+    """
+    if len(texts) < 2:
+        return 0.0
+    return mean_pairwise_from_matrix(ngram_matrix(texts, n))
+
+
+def mean_pairwise_from_matrix(matrix: np.ndarray) -> float:
+    """ngram_matrix で作成済みの行列（各行が L2 正規化済み）から全ペアの平均類似度を求める"""
+    count = matrix.shape[0]
+    if count < 2:
+        return 0.0
+    total = matrix.sum(axis=0)
+    self_similarity = float(np.count_nonzero(matrix.any(axis=1)))
+    pair_sum = (float(total @ total) - self_similarity) / 2
+    return min(max(pair_sum / (count * (count - 1) / 2), 0.0), 1.0)
@@ -0,0 +1,352 @@
+"""
+USDA API レスポンス用の2層キャッシュを提供するモジュール
+
+1層目: プロセス内LRU（保持バイト数で上限管理）
+2層目: インスタンス間で共有する永続キャッシュ（Firestore コレクション）
+
+値は圧縮JSONにエンコードしてサイズを計測・永続化します。
+メモリ層も値そのものではなく JSON のバイト列で保持し、参照のたびに復元します
+（呼び出し元が結果を変更しても、キャッシュや他のリクエストの結果に影響しない）。
+"""
+
+import asyncio
+import json
+import threading
+import time
+import unicodedata
+import zlib
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import (
+    NUTRITION_CACHE_ENABLED,
+    NUTRITION_CACHE_MEMORY_BYTES,
+    NUTRITION_CACHE_STALE_TTL,
+    NUTRITION_CACHE_TTL,
+    NUTRITION_DETAIL_CACHE_MEMORY_BYTES,
+    NUTRITION_DETAIL_CACHE_TTL,
+)
+
+
+def _dumps(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def encode_payload(value: Any) -> bytes:
+    """値をコンパクトな圧縮JSONにエンコードする"""
+    return zlib.compress(_dumps(value), 6)
+
+
+def decode_payload(payload: bytes) -> Any:
+    """encode_payload でエンコードした値を復元する"""
+    return json.loads(zlib.decompress(payload).decode("utf-8"))
+
+
+def normalize_query(query: str) -> str:
+    """検索クエリを正規化する（全角半角統一・小文字化・空白の圧縮）"""
+    return " ".join(unicodedata.normalize("NFKC", query or "").lower().split())
+
+
+def search_cache_key(
+    query: str,
+    data_types: Optional[List[str]],
+    page_size: int,
+    page_number: int,
+) -> str:
+    """検索キャッシュのキーを生成する"""
+    data_type_part = ",".join(sorted(data_types)) if data_types else "*"
+    return f"search:{normalize_query(query)}|{data_type_part}|{page_size}|{page_number}"
+
+
+def detail_cache_key(fdc_id: int) -> str:
+    """詳細キャッシュのキーを生成する"""
+    return f"food:{int(fdc_id)}"
+
+
+class LruByteCache:
+    """
+    保持バイト数で上限を管理するスレッドセーフなLRUキャッシュ
+    エントリは (値, バイト数, 有効期限[epoch秒 or None]) で保持します。
+    期限切れのエントリも stale_grace 秒の間は allow_stale=True の参照に応答します。
+    """
+
+    def __init__(self, max_bytes: int, stale_grace: float = 0):
+        self.max_bytes = max_bytes
+        self.stale_grace = stale_grace
+        self.current_bytes = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[Any, int, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, now: Optional[float] = None, allow_stale: bool = False) -> Optional[Any]:
+        """キーに対応する値を返す。未登録・期限切れの場合は None"""
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, size, expires_at = entry
+            if expires_at is not None and expires_at <= now:
+                if expires_at + self.stale_grace <= now:
+                    del self._entries[key]
+                    self.current_bytes -= size
+                    return None
+                if not allow_stale:
+                    return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, size: int, expires_at: Optional[float]) -> None:
+        """値を登録し、上限を超えた分を古い順に追い出す"""
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= previous[1]
+            self._entries[key] = (value, size, expires_at)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes and self._entries:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class TwoTierCache:
+    """
+    プロセス内LRUと永続キャッシュを組み合わせたリードスルーキャッシュ
+
+    永続層は persistent_factory で遅延生成します。生成や読み書きに失敗した場合は
+    警告を出して永続層を無効化し、メモリ層のみで動作を継続します。
+    期限切れ後 stale_ttl 秒以内のエントリは get_stale で取得できます（クォータ制限時の代替用）。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl: Optional[int],
+        max_bytes: int,
+        persistent_factory: Optional[Callable[[], Any]] = None,
+        enabled: bool = True,
+        stale_ttl: int = 0,
+    ):
+        self.name = name
+        self.ttl = ttl
+        self.enabled = enabled
+        self.stale_ttl = stale_ttl
+        self.memory = LruByteCache(max_bytes, stale_grace=stale_ttl)
+        self._persistent_factory = persistent_factory
+        self._persistent = None
+        self._persistent_failed = persistent_factory is None
+        self._lock = threading.Lock()
+        # 統計はプロセス内の同時リクエストから更新されるためロックで守る
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+
+    def _count(self, hits: int = 0, persistent_hits: int = 0, misses: int = 0, stale_hits: int = 0) -> None:
+        with self._stats_lock:
+            self.hits += hits
+            self.persistent_hits += persistent_hits
+            self.misses += misses
+            self.stale_hits += stale_hits
+
+    def _memory_get(self, key: str, now: Optional[float] = None, allow_stale: bool = False) -> Optional[Any]:
+        """メモリ層の JSON バイト列を復元して返す（呼び出しごとに別のオブジェクト）"""
+        raw = self.memory.get(key, now, allow_stale=allow_stale)
+        return None if raw is None else json.loads(raw)
+
+    def _get_persistent(self):
+        """永続層を取得する（初回呼び出し時に生成、失敗時は None）"""
+        if self._persistent_failed:
+            return None
+        if self._persistent is None:
+            with self._lock:
+                if self._persistent is None and not self._persistent_failed:
+                    try:
+                        self._persistent = self._persistent_factory()
+                    except Exception as e:
+                        print(f"⚠️ 永続キャッシュ({self.name})を無効化します: {str(e)}")
+                        self._persistent_failed = True
+        return self._persistent
+
+    def _expires_at(self, now: float) -> Optional[float]:
+        return now + self.ttl if self.ttl else None
+
+    def _read_persistent(self, key: str, valid_until: float) -> Optional[Any]:
+        """永続層から値を読み込み、メモリ層に載せる（有効期限が valid_until 以前なら None）"""
+        persistent = self._get_persistent()
+        if persistent is None:
+            return None
+        try:
+            stored = persistent.get(key)
+        except Exception as e:
+            print(f"⚠️ 永続キャッシュ({self.name})読み込みエラー: {str(e)}")
+            return None
+        if stored is None:
+            return None
+        payload, expires_at = stored
+        if expires_at is not None and expires_at <= valid_until:
+            return None
+        raw = zlib.decompress(payload)
+        self.memory.set(key, raw, len(raw), expires_at)
+        return json.loads(raw)
+
+    def get(self, key: str) -> Optional[Any]:
+        """キャッシュから値を取得する（メモリ → 永続層の順に参照）"""
+        if not self.enabled:
+            return None
+        now = time.time()
+        value = self._memory_get(key, now)
+        if value is not None:
+            self._count(hits=1)
+            return value
+
+        value = self._read_persistent(key, now)
+        if value is not None:
+            self._count(hits=1, persistent_hits=1)
+            return value
+
+        self._count(misses=1)
+        return None
+
+    def get_stale(self, key: str) -> Optional[Any]:
+        """期限切れ後 stale_ttl 秒以内のエントリも含めて値を取得する"""
+        if not self.enabled:
+            return None
+        now = time.time()
+        value = self._memory_get(key, now, allow_stale=True)
+        if value is None:
+            value = self._read_persistent(key, now - self.stale_ttl)
+        if value is not None:
+            self._count(stale_hits=1)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        """両方の層に値を書き込む"""
+        if not self.enabled:
+            return
+        now = time.time()
+        # メモリ層は展開後の JSON バイト列を保持する（サイズもそのバイト数）
+        raw = _dumps(value)
+        expires_at = self._expires_at(now)
+        self.memory.set(key, raw, len(raw), expires_at)
+
+        persistent = self._get_persistent()
+        if persistent is not None:
+            try:
+                persistent.set(key, zlib.compress(raw, 6), expires_at)
+            except Exception as e:
+                print(f"⚠️ 永続キャッシュ({self.name})書き込みエラー: {str(e)}")
+
+    async def get_async(self, key: str) -> Optional[Any]:
+        """get の非同期版。メモリ層のヒットはその場で返し、永続層の参照はスレッドで行う"""
+        if not self.enabled:
+            return None
+        value = self._memory_get(key)
+        if value is not None:
+            self._count(hits=1)
+            return value
+        return await asyncio.to_thread(self.get, key)
+
+    async def get_stale_async(self, key: str) -> Optional[Any]:
+        """get_stale の非同期版"""
+        if not self.enabled:
+            return None
+        return await asyncio.to_thread(self.get_stale, key)
+
+    async def set_async(self, key: str, value: Any) -> None:
+        """set の非同期版。永続層への書き込みでイベントループをブロックしない"""
+        if not self.enabled:
+            return
+        await asyncio.to_thread(self.set, key, value)
+
+    def clear(self) -> None:
+        """メモリ層と統計情報をクリアする（永続層はTTLで失効させる）"""
+        self.memory.clear()
+        with self._stats_lock:
+            self.hits = 0
+            self.persistent_hits = 0
+            self.misses = 0
+            self.stale_hits = 0
+        self.memory.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """ヒット・ミス・追い出しの統計を返す"""
+        with self._stats_lock:
+            hits, persistent_hits, misses, stale_hits = self.hits, self.persistent_hits, self.misses, self.stale_hits
+        lookups = hits + misses
+        return {
+            "name": self.name,
+            "hits": hits,
+            "persistent_hits": persistent_hits,
+            "misses": misses,
+            "stale_hits": stale_hits,
+            "evictions": self.memory.evictions,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "entries": len(self.memory),
+            "bytes": self.memory.current_bytes,
+            "max_bytes": self.memory.max_bytes,
+        }
+
+
+def _search_cache_repository():
+    from repositories.usda_cache_repository import UsdaCacheRepository
+    return UsdaCacheRepository("usda_search_cache")
+
+
+_search_cache: Optional[TwoTierCache] = None
+_search_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> TwoTierCache:
+    """プロセス全体で共有する検索結果キャッシュを取得する"""
+    global _search_cache
+    if _search_cache is None:
+        with _search_cache_lock:
+            if _search_cache is None:
+                _search_cache = TwoTierCache(
+                    name="usda_search",
+                    ttl=NUTRITION_CACHE_TTL,
+                    max_bytes=NUTRITION_CACHE_MEMORY_BYTES,
+                    persistent_factory=_search_cache_repository,
+                    enabled=NUTRITION_CACHE_ENABLED,
+                    stale_ttl=NUTRITION_CACHE_STALE_TTL,
+                )
+    return _search_cache
+
+
+def _detail_cache_repository():
+    from repositories.usda_cache_repository import UsdaCacheRepository
+    return UsdaCacheRepository("usda_food_details_cache")
+
+
+_detail_cache: Optional[TwoTierCache] = None
+_detail_cache_lock = threading.Lock()
+
+
+def get_detail_cache() -> TwoTierCache:
+    """プロセス全体で共有する fdcId 詳細キャッシュを取得する"""
+    global _detail_cache
+    if _detail_cache is None:
+        with _detail_cache_lock:
+            if _detail_cache is None:
+                _detail_cache = TwoTierCache(
+                    name="usda_food_details",
+                    ttl=NUTRITION_DETAIL_CACHE_TTL or None,
+                    max_bytes=NUTRITION_DETAIL_CACHE_MEMORY_BYTES,
+                    persistent_factory=_detail_cache_repository,
+                    enabled=NUTRITION_CACHE_ENABLED,
+                    stale_ttl=NUTRITION_CACHE_STALE_TTL,
+                )
+    return _detail_cache
@@ -0,0 +1,342 @@
+"""
+USDA FoodData Central 向けの共有HTTPクライアントを提供するモジュール
+
+プロセス内で1つの requests.Session を共有し、api.nal.usda.gov への
+Keep-Alive コネクションを再利用します。タイムアウトとリトライ回数は
+config.py の API_TIMEOUT / MAX_RETRIES を適用します。
+非同期版（AsyncUsdaClient）はイベントループごとに1つの httpx.AsyncClient を共有します。
+
+同時に発生した同一リクエスト（メソッド・URL・パラメータ・ボディが一致）は
+シングルフライトで1回のHTTP呼び出しにまとめ、結果を全ての呼び出し元で共有します。
+送信前には UsdaRateLimiter でレート・残りクォータを確認し、不足時は UsdaQuotaExceeded を送出します。
+"""
+
+import asyncio
+import json as jsonlib
+import threading
+import time
+import weakref
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config import (
+    API_TIMEOUT,
+    MAX_RETRIES,
+    USDA_API_BASE_URL,
+    USDA_HTTP_POOL_SIZE,
+    USDA_RETRY_BACKOFF,
+)
+from services.usda_rate_limiter import UsdaQuotaExceeded, UsdaRateLimiter, get_usda_rate_limiter
+
+# 一時的な障害としてリトライ対象にするHTTPステータス
+# 429 はクォータ枯渇（回復まで最大1時間）のためリトライせず、レート制限側で扱う
+RETRY_STATUS_CODES = (500, 502, 503, 504)
+
+
+def request_key(
+    method: str,
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    json: Optional[Any] = None,
+) -> Tuple[str, str, str, str]:
+    """シングルフライト用にリクエストを識別するキーを生成する"""
+    return (
+        method.upper(),
+        url,
+        jsonlib.dumps(params or {}, sort_keys=True, default=str),
+        jsonlib.dumps(json, sort_keys=True, default=str),
+    )
+
+
+class _InFlightCall:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    スレッド間で同一キーの処理を1回にまとめる（Go の singleflight と同等）
+    先行する呼び出しの実行中に来た同一キーの呼び出しは、その完了を待って同じ結果を受け取ります。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Any, _InFlightCall] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key: Any, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = _InFlightCall()
+                self._calls[key] = call
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+class AsyncSingleFlight:
+    """
+    SingleFlight の asyncio 版（同一イベントループ内でのみ使用する）
+    実行はタスクとして切り離すため、先行した呼び出し元がキャンセルされても他の待機者には影響しません。
+    """
+
+    def __init__(self):
+        self._tasks: Dict[Any, "asyncio.Task[Any]"] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    async def do(self, key: Any, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._tasks.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+            self.executed += 1
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        return await asyncio.shield(task)
+
+
+class UsdaClient:
+    """
+    コネクションプーリングとリトライを備えた USDA FoodData Central クライアント
+    リトライはアダプタ（urllib3）ではなく _send で行い、非同期版と同じく試行ごとにレート制限のトークンを取得します。
+    """
+
+    def __init__(
+        self,
+        base_url: str = USDA_API_BASE_URL,
+        timeout: float = API_TIMEOUT,
+        max_retries: int = MAX_RETRIES,
+        pool_size: int = USDA_HTTP_POOL_SIZE,
+        backoff_factor: float = USDA_RETRY_BACKOFF,
+        rate_limiter: Optional[UsdaRateLimiter] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.rate_limiter = rate_limiter or get_usda_rate_limiter()
+        self.session = requests.Session()
+
+        # アダプタ側の再送はレート制限を通らずクォータを消費するため無効にする（リトライは _send で行う）
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=Retry(total=0, raise_on_status=False),
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.single_flight = SingleFlight()
+
+    def url(self, path: str) -> str:
+        """エンドポイントのパスから完全なURLを組み立てる"""
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None) -> requests.Response:
+        """GETリクエストを送信する（タイムアウト適用済み、同時の同一リクエストは1回にまとめる）"""
+        return self.single_flight.do(
+            request_key("GET", url, params),
+            lambda: self._send(lambda: self.session.get(url, params=params, timeout=self.timeout)),
+        )
+
+    def post(
+        self,
+        url: str,
+        json: Optional[Dict[str, Any]] = None,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> requests.Response:
+        """POSTリクエストを送信する（タイムアウト適用済み、同時の同一リクエストは1回にまとめる）"""
+        return self.single_flight.do(
+            request_key("POST", url, params, json),
+            lambda: self._send(lambda: self.session.post(url, json=json, params=params, timeout=self.timeout)),
+        )
+
+    def _retry_delay(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                return float(retry_after)
+        return self.backoff_factor * (2 ** attempt)
+
+    def _send(self, send: Callable[[], requests.Response]) -> requests.Response:
+        """
+        試行ごとにレート制限を確認して送信し、レスポンスヘッダーから残りクォータを記録する
+        5xx と通信エラーは指数バックオフでリトライする（検索の POST も冪等なので対象にする）
+        """
+        attempt = 0
+        while True:
+            if not self.rate_limiter.try_acquire():
+                raise UsdaQuotaExceeded("USDA API のレート制限により送信を見合わせました")
+            try:
+                response = send()
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+                time.sleep(self._retry_delay(attempt))
+                attempt += 1
+                continue
+            self.rate_limiter.observe(response.status_code, response.headers)
+            if response.status_code == 429:
+                raise UsdaQuotaExceeded("USDA API のクォータを超過しました (429)")
+            if response.status_code in RETRY_STATUS_CODES and attempt < self.max_retries:
+                time.sleep(self._retry_delay(attempt, response))
+                attempt += 1
+                continue
+            return response
+
+    def stats(self) -> Dict[str, int]:
+        """実際に送信したリクエスト数と、相乗りでまとめたリクエスト数を返す"""
+        return {"requests": self.single_flight.executed, "coalesced": self.single_flight.coalesced}
+
+    def close(self) -> None:
+        """保持しているコネクションを全て解放する"""
+        self.session.close()
+
+
+_client: Optional[UsdaClient] = None
+_client_lock = threading.Lock()
+
+
+def get_usda_client() -> UsdaClient:
+    """プロセス全体で共有する UsdaClient を取得する（初回呼び出し時に生成）"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = UsdaClient()
+                print(f"🔌 USDA HTTPクライアント初期化: pool_size={USDA_HTTP_POOL_SIZE}, timeout={API_TIMEOUT}s, max_retries={MAX_RETRIES}")
+    return _client
+
+
+class AsyncUsdaClient:
+    """
+    httpx.AsyncClient ベースの非同期 USDA FoodData Central クライアント
+    同期版と同じく 5xx と通信エラーを指数バックオフでリトライし、レート制限も共有します。
+    """
+
+    def __init__(
+        self,
+        base_url: str = USDA_API_BASE_URL,
+        timeout: float = API_TIMEOUT,
+        max_retries: int = MAX_RETRIES,
+        pool_size: int = USDA_HTTP_POOL_SIZE,
+        backoff_factor: float = USDA_RETRY_BACKOFF,
+        rate_limiter: Optional[UsdaRateLimiter] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.max_retries = max_retries
+        self.rate_limiter = rate_limiter or get_usda_rate_limiter()
+        self.backoff_factor = backoff_factor
+        self.client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        )
+        self.single_flight = AsyncSingleFlight()
+
+    def url(self, path: str) -> str:
+        """エンドポイントのパスから完全なURLを組み立てる"""
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                return float(retry_after)
+        return self.backoff_factor * (2 ** attempt)
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """リトライ付きでリクエストを送信する（同時の同一リクエストは1回にまとめる）"""
+        key = request_key(method, url, kwargs.get("params"), kwargs.get("json"))
+        return await self.single_flight.do(key, lambda: self._send(method, url, **kwargs))
+
+    async def _send(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        attempt = 0
+        while True:
+            if not self.rate_limiter.try_acquire():
+                raise UsdaQuotaExceeded("USDA API のレート制限により送信を見合わせました")
+            try:
+                response = await self.client.request(method, url, **kwargs)
+            except httpx.TransportError:
+                if attempt >= self.max_retries:
+                    raise
+                await asyncio.sleep(self._retry_delay(attempt))
+                attempt += 1
+                continue
+            self.rate_limiter.observe(response.status_code, response.headers)
+            if response.status_code == 429:
+                raise UsdaQuotaExceeded("USDA API のクォータを超過しました (429)")
+            if response.status_code in RETRY_STATUS_CODES and attempt < self.max_retries:
+                await asyncio.sleep(self._retry_delay(attempt, response))
+                attempt += 1
+                continue
+            return response
+
+    async def get(self, url: str, params: Optional[Dict[str, Any]] = None) -> httpx.Response:
+        """GETリクエストを送信する"""
+        return await self.request("GET", url, params=params)
+
+    async def post(
+        self,
+        url: str,
+        json: Optional[Dict[str, Any]] = None,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> httpx.Response:
+        """POSTリクエストを送信する"""
+        return await self.request("POST", url, json=json, params=params)
+
+    def stats(self) -> Dict[str, int]:
+        """実際に送信したリクエスト数と、相乗りでまとめたリクエスト数を返す"""
+        return {"requests": self.single_flight.executed, "coalesced": self.single_flight.coalesced}
+
+    async def aclose(self) -> None:
+        """保持しているコネクションを全て解放する"""
+        await self.client.aclose()
+
+
+# httpx.AsyncClient は生成したイベントループに紐づくため、ループごとに保持する
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncUsdaClient]" = weakref.WeakKeyDictionary()
+_async_clients_lock = threading.Lock()
+
+
+def get_async_usda_client() -> AsyncUsdaClient:
+    """実行中のイベントループで共有する AsyncUsdaClient を取得する"""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        # 同時実行中のリクエストはそれぞれのスレッドで別のループを回すため、辞書の更新はロックで守る
+        with _async_clients_lock:
+            client = _async_clients.get(loop)
+            if client is not None:
+                return client
+            client = AsyncUsdaClient()
+            _async_clients[loop] = client
+        print(f"🔌 USDA 非同期HTTPクライアント初期化: pool_size={USDA_HTTP_POOL_SIZE}, timeout={API_TIMEOUT}s, max_retries={MAX_RETRIES}")
+    return client
@@ -0,0 +1,140 @@
+"""
+USDA FoodData Central 向けのクライアント側レート制限を提供するモジュール
+
+USDA のAPIキーは1時間あたり約1000リクエストに制限されています。
+トークンバケットで送信ペースを抑えつつ、レスポンスヘッダーの
+X-RateLimit-Remaining から残りクォータを追跡し、残りが少ない間は
+API呼び出しを控えて呼び出し元に UsdaQuotaExceeded を通知します。
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Mapping, Optional
+
+from config import USDA_QUOTA_RESERVE, USDA_RATE_LIMIT_BURST, USDA_RATE_LIMIT_PER_HOUR
+
+# USDA のクォータは1時間のローリングウィンドウで回復する
+QUOTA_WINDOW_SECONDS = 3600
+
+
+class UsdaQuotaExceeded(Exception):
+    """レート制限・クォータ不足のため USDA API を呼び出さなかったことを表す例外"""
+
+
+def _parse_int(value: Any) -> Optional[int]:
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value.strip())
+    return None
+
+
+class UsdaRateLimiter:
+    """
+    トークンバケットと残りクォータの追跡を組み合わせたスレッドセーフなレート制限
+    """
+
+    def __init__(
+        self,
+        rate_per_hour: float = USDA_RATE_LIMIT_PER_HOUR,
+        burst: int = USDA_RATE_LIMIT_BURST,
+        reserve: int = USDA_QUOTA_RESERVE,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.capacity = float(burst)
+        self.refill_per_second = rate_per_hour / QUOTA_WINDOW_SECONDS
+        self.reserve = reserve
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated_at = clock()
+        self._lock = threading.Lock()
+        # 最後に観測したクォータ（ウィンドウ経過後は回復したものとみなして破棄）
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self._observed_at: Optional[float] = None
+        self._blocked_until = 0.0
+        self.throttled = 0
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(0.0, now - self._updated_at)
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.refill_per_second)
+        self._updated_at = now
+
+    def _quota_low(self, now: float) -> bool:
+        if now < self._blocked_until:
+            return True
+        if self.remaining is None or self._observed_at is None:
+            return False
+        if now - self._observed_at >= QUOTA_WINDOW_SECONDS:
+            self.remaining = None
+            self._observed_at = None
+            return False
+        return self.remaining <= self.reserve
+
+    def quota_low(self) -> bool:
+        """残りクォータが予備分以下、または 429 後の待機中であれば True"""
+        with self._lock:
+            return self._quota_low(self._clock())
+
+    def try_acquire(self) -> bool:
+        """リクエスト1回分の送信可否を判定し、可能ならトークンを消費する"""
+        with self._lock:
+            now = self._clock()
+            if self._quota_low(now):
+                self.throttled += 1
+                return False
+            self._refill(now)
+            if self._tokens < 1.0:
+                self.throttled += 1
+                return False
+            self._tokens -= 1.0
+            return True
+
+    def observe(self, status_code: Any, headers: Mapping[str, Any]) -> None:
+        """レスポンスのステータスとヘッダーから残りクォータを更新する"""
+        with self._lock:
+            now = self._clock()
+            remaining = _parse_int(headers.get("X-RateLimit-Remaining"))
+            if remaining is not None:
+                self.remaining = remaining
+                self._observed_at = now
+            limit = _parse_int(headers.get("X-RateLimit-Limit"))
+            if limit is not None:
+                self.limit = limit
+            if status_code == 429:
+                retry_after = _parse_int(headers.get("Retry-After"))
+                self.remaining = 0
+                self._observed_at = now
+                self._blocked_until = now + (retry_after if retry_after is not None else QUOTA_WINDOW_SECONDS)
+
+    def stats(self) -> Dict[str, Any]:
+        """現在のトークン数・残りクォータ・抑止回数を返す"""
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            return {
+                "tokens": round(self._tokens, 2),
+                "remaining": self.remaining,
+                "limit": self.limit,
+                "quota_low": self._quota_low(now),
+                "throttled": self.throttled,
+            }
+
+
+_rate_limiter: Optional[UsdaRateLimiter] = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_usda_rate_limiter() -> UsdaRateLimiter:
+    """プロセス全体（同期・非同期クライアント共通）で共有するレート制限を取得する"""
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                _rate_limiter = UsdaRateLimiter()
+    return _rate_limiter
+
+
+def quota_limited_error(error: Exception) -> Dict[str, Any]:
+    """クォータ制限で応答できない場合のエラー辞書を生成する（呼び出し元は推定値などで代替する）"""
+    return {"error": f"USDA API クォータ制限中: {str(error)}", "quota_limited": True}
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+エージェント実行の同時実行テスト
+
+1インスタンスで複数リクエストを同時に処理した場合に、リクエストごとのフック
+（DetailedNutritionHooks）の記録が他のリクエストと混ざらないことを確認します。
+本番と同じく各リクエストのスレッドから常駐イベントループ上で Runner.run し、モデルは
+ツール呼び出しを返す固定応答のモデルに差し替えます（OpenAI API は呼び出さない）。
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import json
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+from agents import Agent, RunConfig, Runner, Usage, function_tool
+from agents.items import ModelResponse
+from agents.models.interface import Model
+from openai.types.responses import ResponseFunctionToolCall, ResponseOutputMessage, ResponseOutputText
+
+from api.utils.event_loop import run_coroutine
+from api.utils.tracing_hooks import DetailedNutritionHooks
+from function_tools.get_nutrition_search_guidance_tool import get_nutrition_search_guidance_core
+
+REQUESTS = 24
+TOOL_CALLS_PER_REQUEST = 3
+MEALS = ["朝：ご飯170g、納豆1個", "鶏肉の胸肉を焼いた", "りんごとバナナ", "玄米と米粉パン"]
+
+
+@function_tool
+async def lookup_meal_tool(request_id: int, meal: str) -> str:
+    """食事テキストの翻訳候補を返す（共有の辞書・オートマトンを同時に使う）"""
+    await asyncio.sleep(random.uniform(0.001, 0.01))
+    guidance = get_nutrition_search_guidance_core(user_input=meal, detail_level="compact")
+    return json.dumps({"request_id": request_id, "translations": guidance["translations"]}, ensure_ascii=False)
+
+
+class ScriptedModel(Model):
+    """リクエストID付きでツールを決まった回数呼び出し、最後にテキストを返すモデル"""
+
+    def __init__(self, request_id: int):
+        self.request_id = request_id
+
+    async def get_response(self, system_instructions, input, model_settings, tools, output_schema, handoffs, tracing, **kwargs):
+        await asyncio.sleep(random.uniform(0.001, 0.01))
+        calls = sum(1 for item in input if isinstance(item, dict) and item.get("type") == "function_call_output")
+        if calls < TOOL_CALLS_PER_REQUEST:
+            arguments = {"request_id": self.request_id, "meal": MEALS[(self.request_id + calls) % len(MEALS)]}
+            output = ResponseFunctionToolCall(
+                type="function_call",
+                call_id=f"call-{self.request_id}-{calls}",
+                name="lookup_meal_tool",
+                arguments=json.dumps(arguments, ensure_ascii=False),
+            )
+        else:
+            output = ResponseOutputMessage(
+                id=f"msg-{self.request_id}",
+                type="message",
+                role="assistant",
+                status="completed",
+                content=[ResponseOutputText(type="output_text", text=f"done {self.request_id}", annotations=[])],
+            )
+        return ModelResponse(output=[output], usage=Usage(), response_id=None)
+
+    async def stream_response(self, *args, **kwargs):
+        raise NotImplementedError
+
+
+def run_request(request_id: int):
+    """agent 関数と同じく、リクエストごとにフックを作成して常駐イベントループ上で実行する"""
+    agent = Agent(name="Concurrency Test Agent", model=ScriptedModel(request_id), tools=[lookup_meal_tool])
+    hooks = DetailedNutritionHooks()
+    result = run_coroutine(
+        Runner.run(agent, f"request {request_id}", hooks=hooks, run_config=RunConfig(tracing_disabled=True)),
+        timeout=60
+    )
+    return result.final_output, hooks.get_summary()
+
+
+def test_hooks_are_isolated_between_concurrent_requests():
+    """同時実行したリクエストのフックに、他のリクエストのツール呼び出しが記録されないこと"""
+
+    with ThreadPoolExecutor(max_workers=REQUESTS) as executor:
+        outcomes = list(executor.map(run_request, range(REQUESTS)))
+
+    for request_id, (final_output, summary) in enumerate(outcomes):
+        assert final_output == f"done {request_id}"
+        assert summary["tool_call_count"] == TOOL_CALLS_PER_REQUEST
+        assert summary["error_count"] == 0
+
+        completed = [tc for tc in summary["tool_calls"] if tc["status"] == "completed"]
+        for tool_call in completed:
+            assert tool_call["result_preview"].startswith(f'{{"request_id": {request_id},')
+
+        # イベント番号はリクエスト内で連番（他のリクエストのイベントで飛ばない）
+        counters = [tc["event_counter"] for tc in summary["tool_calls"]]
+        assert counters == sorted(counters)
+        assert summary["total_events"] == outcomes[0][1]["total_events"]
+
+    print(f"✅ {REQUESTS}件の同時リクエストでフックの記録が独立していることを確認")
+
+
+def test_shared_guidance_under_concurrency():
+    """共有の食品辞書・キーワードオートマトンを同時に使っても結果が変わらないこと"""
+
+    expected = {meal: get_nutrition_search_guidance_core(user_input=meal, detail_level="compact") for meal in MEALS}
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        results = list(executor.map(
+            lambda meal: (meal, get_nutrition_search_guidance_core(user_input=meal, detail_level="compact")),
+            MEALS * 50,
+        ))
+
+    for meal, result in results:
+        assert result == expected[meal]
+
+
+if __name__ == "__main__":
+    test_hooks_are_isolated_between_concurrent_requests()
+    test_shared_guidance_under_concurrency()
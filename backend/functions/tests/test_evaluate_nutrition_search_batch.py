@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+検索結果評価のバッチ実行のテスト
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function_tools.evaluate_nutrition_search_batch import evaluate_nutrition_search_batch
+from function_tools.evaluate_nutrition_search_tool import evaluate_nutrition_search_tool_core
+
+SEARCH_RESULTS = {
+    "foods": [
+        {
+            "fdcId": 171077,
+            "description": "Chicken, broilers or fryers, breast, meat only, cooked, roasted",
+            "dataType": "Foundation",
+            "foodNutrients": [
+                {"nutrientName": "Energy", "value": 165},
+                {"nutrientName": "Protein", "value": 31.02}
+            ]
+        },
+        {
+            "fdcId": 2646170,
+            "description": "CHICKEN BREAST STRIPS",
+            "dataType": "Branded",
+            "foodNutrients": []
+        }
+    ],
+    "totalHits": 2
+}
+
+PAIRS = [
+    ("chicken breast", SEARCH_RESULTS),
+    {"query": "chicken breast cooked", "search_results": SEARCH_RESULTS, "target_food": "chicken breast"},
+    ("鶏肉", SEARCH_RESULTS),
+    ("rice", {"error": "USDA API エラー"}),
+] * 5
+
+def _expected(pair):
+    if isinstance(pair, dict):
+        return evaluate_nutrition_search_tool_core(pair["query"], pair["search_results"], pair.get("target_food"), None, "score")
+    return evaluate_nutrition_search_tool_core(pair[0], pair[1], None, None, "score")
+
+def test_batch_matches_sequential_evaluation():
+    """逐次実行（workers=1）の結果が1件ずつの評価と一致すること"""
+    
+    outcomes = list(evaluate_nutrition_search_batch(iter(PAIRS), workers=1, chunk_size=3, report_interval=0))
+    
+    assert [outcome.index for outcome in outcomes] == list(range(len(PAIRS)))
+    for outcome in outcomes:
+        assert outcome.result == _expected(PAIRS[outcome.index])
+    assert outcomes[3].result["status"] == "error"
+
+def test_batch_process_pool():
+    """プロセスプールでも全件が評価され、index で入力順に並べ替えられること"""
+    
+    outcomes = list(evaluate_nutrition_search_batch(PAIRS, workers=2, chunk_size=4, report_interval=0))
+    
+    assert sorted(outcome.index for outcome in outcomes) == list(range(len(PAIRS)))
+    for outcome in sorted(outcomes):
+        assert outcome.result == _expected(PAIRS[outcome.index])
+
+def test_batch_reports_malformed_pair_as_error():
+    """不正な入力はその1件だけエラーとして返すこと"""
+    
+    outcomes = list(evaluate_nutrition_search_batch([("chicken", None)], workers=1, report_interval=0))
+    
+    assert outcomes[0].result["status"] == "error"
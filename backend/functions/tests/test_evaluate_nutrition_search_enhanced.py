@@ -250,6 +250,98 @@ def test_evaluation_focus_variations():
         print(f"グレード: {evaluation['overall_assessment']['grade']}")
         print(f"フォーカス: {evaluation['overall_assessment']['focus']}")
 
+def test_food_features_extracted_once():
+    """食品ごとの特徴量が1回だけ抽出され、各評価指標で共有されることのテスト"""
+    
+    from unittest.mock import patch
+    from function_tools import evaluate_nutrition_search_tool as tool
+    
+    search_results = {
+        "foods": [
+            {
+                "fdcId": 171077,
+                "description": "Chicken, broilers or fryers, breast, meat only, cooked, roasted",
+                "dataType": "Foundation",
+                "foodNutrients": [
+                    {"nutrientName": "Energy", "value": 165},
+                    {"nutrientName": "Protein", "value": 31.02}
+                ]
+            },
+            {
+                "fdcId": 2646170,
+                "description": "Chicken breast",
+                "dataType": "Branded",
+                "foodNutrients": []
+            }
+        ],
+        "totalHits": 2
+    }
+    
+    with patch.object(tool, "_extract_food_features", wraps=tool._extract_food_features) as extract:
+        result = call_evaluation_tool("chicken breast", search_results, target_food="chicken breast")
+    
+    assert extract.call_count == 1
+    assert result["status"] == "success"
+    
+    features = tool._extract_food_features(search_results["foods"], "chicken breast")
+    assert [f.data_type for f in features] == ["Foundation", "Branded"]
+    assert features[0].nutrient_names == ("Energy", "Protein")
+    assert features[1].words == frozenset({"chicken", "breast"})
+    assert features[1].query_similarity > features[0].query_similarity
+    assert abs(features[1].query_similarity - 1.0) < 1e-9
+
+def test_detail_levels():
+    """出力の詳細度（score / summary / full）のテスト"""
+    
+    import json
+    from unittest.mock import patch
+    from function_tools import evaluate_nutrition_search_tool as tool
+    
+    search_results = {
+        "foods": [
+            {
+                "fdcId": 171077,
+                "description": "Chicken, broilers or fryers, breast, meat only, cooked, roasted",
+                "dataType": "Foundation",
+                "foodNutrients": [
+                    {"nutrientName": "Energy", "value": 165},
+                    {"nutrientName": "Protein", "value": 31.02}
+                ]
+            }
+        ] * 10,
+        "totalHits": 120
+    }
+    
+    full = call_evaluation_tool("鶏肉", search_results)
+    assert full["detail_level"] == "full"
+    assert "detailed_analysis" in full["evaluation"]
+    assert "next_steps" in full
+    
+    # score: 総合スコアのみ。クエリ分析や詳細分析は計算しない
+    with patch.object(tool, "_analyze_query_enhanced") as analyze_query, \
+         patch.object(tool, "_generate_detailed_analysis") as detailed:
+        score_only = evaluate_nutrition_search_tool_core("鶏肉", search_results, detail_level="score")
+    analyze_query.assert_not_called()
+    detailed.assert_not_called()
+    assert score_only["score"] == round(full["evaluation"]["overall_assessment"]["score"], 3)
+    assert score_only["grade"] == full["evaluation"]["overall_assessment"]["grade"]
+    
+    # summary: データタイプ分布・詳細分析は計算せず、コンパクトな要約を返す
+    with patch.object(tool, "_analyze_data_types_enhanced") as distribution, \
+         patch.object(tool, "_generate_detailed_analysis") as detailed:
+        summary = evaluate_nutrition_search_tool_core("鶏肉", search_results, detail_level="summary")
+    distribution.assert_not_called()
+    detailed.assert_not_called()
+    assert summary["score"] == score_only["score"]
+    assert "evaluation" not in summary
+    assert len(summary["recommendations"]) <= tool.SUMMARY_MAX_RECOMMENDATIONS
+    assert set(summary["recommendations"]) <= set(full["recommendations"])
+    # 文字数で概算してもおよそ300トークン以内
+    assert len(json.dumps(summary, ensure_ascii=False)) < 600
+    
+    # 指定外の値は full として扱う
+    assert evaluate_nutrition_search_tool_core("鶏肉", search_results, detail_level="verbose")["detail_level"] == "full"
+
 def test_language_detection():
     """言語検出機能のテスト"""
     
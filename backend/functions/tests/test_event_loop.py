@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+常駐イベントループのテスト
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import threading
+
+import pytest
+
+from api.utils.event_loop import get_background_loop, run_coroutine
+from services.usda_client import get_async_usda_client
+
+
+async def _current_loop():
+    return asyncio.get_running_loop()
+
+
+async def _async_client():
+    return get_async_usda_client()
+
+
+def test_runs_on_one_persistent_loop():
+    """リクエストごとにループを作り直さず、同じ常駐ループで実行すること"""
+
+    first = run_coroutine(_current_loop())
+    second = run_coroutine(_current_loop())
+    assert first is second is get_background_loop()
+    assert first.is_running()
+    assert threading.current_thread() is threading.main_thread()
+
+
+def test_async_clients_stay_warm_across_requests():
+    """ループに紐づく非同期クライアントがリクエスト間で再利用されること"""
+
+    assert run_coroutine(_async_client()) is run_coroutine(_async_client())
+
+
+def test_exceptions_propagate():
+    """コルーチン内の例外が呼び出し元にそのまま送出されること"""
+
+    async def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError, match="boom"):
+        run_coroutine(fail())
+
+
+def test_timeout_cancels_coroutine():
+    """タイムアウト時にコルーチンがキャンセルされ、ループは次の実行に使えること"""
+
+    cancelled = threading.Event()
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    with pytest.raises(TimeoutError):
+        run_coroutine(slow(), timeout=0.05)
+    assert cancelled.wait(1)
+    assert run_coroutine(_current_loop()) is get_background_loop()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+読み取り専用の問い合わせの高速応答ルーターのテスト
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datetime import timedelta
+
+from api.utils.datetime_utils import now_jst
+from api.utils.fast_path_router import CHAT_HISTORY, NUTRITION_STATUS, FastPathRouter
+
+ENTRIES = [
+    {
+        "meal_type": "朝食",
+        "food_item": "ご飯",
+        "quantity_desc": "170g",
+        "nutrients": {"energy_kcal": 265.2, "protein_g": 4.25, "fat_g": 0.51, "carbohydrates_g": 60.52},
+    },
+    {
+        "meal_type": "朝食",
+        "food_item": "納豆",
+        "quantity_desc": "1パック",
+        "nutrients": {"energy_kcal": 95.0, "protein_g": 8.25, "fat_g": 4.95, "carbohydrates_g": 6.05},
+    },
+    {"meal_type": "間食", "food_item": "お茶", "quantity_desc": "1杯", "nutrients": {}},
+]
+
+
+class FakeNutritionService:
+    def __init__(self, result=None):
+        self.calls = []
+        self.result = result
+
+    def get_entries_by_date(self, user_id, entry_date=None):
+        self.calls.append((user_id, entry_date))
+        if self.result is not None:
+            return self.result
+        return {"success": True, "entries": ENTRIES, "entry_date": entry_date, "count": len(ENTRIES)}
+
+
+class FakeChatService:
+    def __init__(self):
+        self.calls = []
+
+    def get_messages(self, user_id, session_id, limit=10, offset=0):
+        self.calls.append((user_id, session_id, limit))
+        messages = [
+            {"role": "user", "content": "朝：ご飯170g、納豆1個", "timestamp": "2026-10-17T08:00:00"},
+            {"role": "agent", "content": "栄養記録を保存しました。" * 10, "timestamp": "2026-10-17T08:00:05"},
+        ]
+        return {"messages": messages, "count": len(messages)}
+
+
+def test_classify_read_only_prompts():
+    """栄養記録・チャット履歴を参照するだけの問い合わせを判定できること"""
+
+    router = FastPathRouter(FakeNutritionService(), FakeChatService())
+    assert router.classify("今日の栄養") == (NUTRITION_STATUS, {"day_offset": 0})
+    assert router.classify("昨日の摂取カロリーは？") == (NUTRITION_STATUS, {"day_offset": -1})
+    assert router.classify("一昨日の栄養記録を見せて") == (NUTRITION_STATUS, {"day_offset": -2})
+    assert router.classify("2026-10-01の栄養摂取状況") == (NUTRITION_STATUS, {"entry_date": "2026-10-01"})
+    assert router.classify("履歴") == (CHAT_HISTORY, {})
+    assert router.classify("会話の履歴を見せて") == (CHAT_HISTORY, {})
+    assert router.classify("今日の栄養を教えてください") == (NUTRITION_STATUS, {"day_offset": 0})
+    assert router.classify("栄養記録を表示して") == (NUTRITION_STATUS, {"day_offset": 0})
+
+
+def test_ambiguous_prompts_fall_through():
+    """曖昧な問い合わせは判定せずエージェントに回すこと"""
+
+    router = FastPathRouter(FakeNutritionService(), FakeChatService())
+    prompts = [
+        "鶏肉のカロリー",                   # 食品名を含む（栄養情報の検索）
+        "今日のタンパク質は足りてる？",      # 助言を求めている
+        "朝ご飯に納豆を食べました",          # 食事の報告
+        "今日は何を食べた？",
+        "昨日と今日の栄養を比べて",          # 複数の日付
+        "カロリー",                         # 日付がない
+        "栄養価を調べて",                   # 栄養価の検索
+        "前回の記録",                       # 栄養記録かチャット履歴か曖昧
+        "今日の栄養を教えてください。あと、夕食のおすすめのメニューも考えてもらえますか？",
+        "",
+    ]
+    for prompt in prompts:
+        assert router.classify(prompt) is None, prompt
+
+
+def test_edit_and_open_ended_requests_fall_through():
+    """記録・履歴への変更や要約・評価の依頼は、参照の言い回しでないためエージェントに回すこと"""
+
+    router = FastPathRouter(FakeNutritionService(), FakeChatService())
+    prompts = [
+        "今日の栄養記録を削除して",
+        "栄養記録を消して",
+        "今日の栄養記録を修正",
+        "今日の栄養記録に追加して",
+        "今日のカロリーを記録して",
+        "今日の栄養を保存",
+        "会話の履歴を消して",
+        "履歴をまとめて",
+        "チャット履歴を英語で",
+        "今日の摂取量は多い？",
+        "今日の栄養ってどう？",
+        "昨日の履歴",
+    ]
+    for prompt in prompts:
+        assert router.classify(prompt) is None, prompt
+
+
+def test_route_nutrition_status():
+    """今日（日本時間）の栄養記録を取得し、合計を定型文で回答すること"""
+
+    nutrition_service = FakeNutritionService()
+    router = FastPathRouter(nutrition_service, FakeChatService())
+    result = router.route("昨日の摂取カロリーは？", "user_1", "session_1")
+
+    yesterday = (now_jst() - timedelta(days=1)).strftime("%Y-%m-%d")
+    assert nutrition_service.calls == [("user_1", yesterday)]
+    assert result.intent == NUTRITION_STATUS
+    assert f"{yesterday}（昨日）の栄養記録（3件）" in result.message
+    assert "- 朝食: ご飯 (170g) 265kcal" in result.message
+    assert "合計: エネルギー 360kcal / タンパク質 12.5g / 脂質 5.5g / 炭水化物 66.6g" in result.message
+    assert "記録されていない食事は合計に含まれていません" in result.message
+    assert result.elapsed_ms < 100
+
+
+def test_route_empty_day_and_chat_history():
+    """記録がない日・チャット履歴の定型文"""
+
+    chat_service = FakeChatService()
+    router = FastPathRouter(FakeNutritionService({"success": True, "entries": [], "count": 0}), chat_service)
+
+    assert "の栄養記録はまだありません" in router.route("今日の栄養", "user_1", "session_1").message
+
+    result = router.route("履歴", "user_1", "session_1")
+    assert chat_service.calls == [("user_1", "session_1", 10)]
+    assert result.intent == CHAT_HISTORY
+    lines = result.message.splitlines()
+    assert lines[0] == "💬 この会話の履歴（2件）"
+    assert lines[1] == "- あなた: 朝：ご飯170g、納豆1個"
+    assert lines[2].startswith("- コーチ: ") and lines[2].endswith("…")
+
+
+def test_stats_and_service_errors():
+    """高速応答・エージェントに回した件数を集計し、サービスエラー時はエージェントに回すこと"""
+
+    router = FastPathRouter(FakeNutritionService({"success": False, "error": "サーバーエラー"}), FakeChatService())
+    assert router.route("今日の栄養", "user_1", "session_1") is None
+    assert router.route("鶏肉のカロリー", "user_1", "session_1") is None
+    assert router.route("履歴", "user_1", "session_1") is not None
+
+    assert router.stats() == {
+        "hits": {NUTRITION_STATUS: 0, CHAT_HISTORY: 1},
+        "fallthrough": 2,
+        "service_errors": 1,
+    }
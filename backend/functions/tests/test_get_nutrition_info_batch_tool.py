@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+複数食材の栄養情報一括取得ツールのテスト（USDA API はモック）
+"""
+
+import asyncio
+import sys
+import os
+from unittest.mock import AsyncMock, patch
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function_tools.get_nutrition_info_tool import get_nutrition_info_batch_core
+
+SEARCH_RESULTS = {
+    "rice white cooked": {"foods": [{"fdcId": 168878, "description": "Rice, white, cooked"}]},
+    "natto": {"foods": [{"fdcId": 172443, "description": "Natto"}]},
+    "unknown food": {"foods": []},
+}
+
+DETAILS = {
+    168878: {
+        "fdcId": 168878,
+        "description": "Rice, white, cooked",
+        "foodNutrients": [
+            {"nutrient": {"number": "208", "name": "Energy", "unitName": "kcal"}, "amount": 130.0},
+            {"nutrient": {"number": "203", "name": "Protein", "unitName": "g"}, "amount": 2.69}
+        ]
+    },
+    172443: {
+        "fdcId": 172443,
+        "description": "Natto",
+        "foodNutrients": [
+            {"nutrient": {"number": "208", "name": "Energy", "unitName": "kcal"}, "amount": 211.0},
+            {"nutrient": {"number": "203", "name": "Protein", "unitName": "g"}, "amount": 19.4}
+        ]
+    },
+}
+
+
+def _mock_services():
+    search_service = AsyncMock()
+    search_service.search.side_effect = lambda query, *args: SEARCH_RESULTS[query]
+    details_service = AsyncMock()
+    details_service.get_details_many.side_effect = lambda ids: {
+        "foods": {fdc_id: DETAILS[fdc_id] for fdc_id in ids},
+        "missing": []
+    }
+    return search_service, details_service
+
+
+def test_batch_uses_single_detail_request():
+    """複数食材でも詳細取得は get_details_many の1回にまとまる"""
+    search_service, details_service = _mock_services()
+    with patch("function_tools.get_nutrition_info_tool.AsyncNutritionSearchService", return_value=search_service), \
+         patch("function_tools.get_nutrition_info_tool.AsyncNutritionDetailsService", return_value=details_service):
+        result = asyncio.run(get_nutrition_info_batch_core(["rice white cooked", "natto", "unknown food"]))
+
+    details_service.get_details_many.assert_awaited_once_with([168878, 172443])
+    details_service.get_details.assert_not_called()
+    assert result["success"] is True
+    assert result["count"] == 2
+
+    rice, natto, unknown = result["results"]
+    assert rice["fdc_id"] == 168878
+    assert rice["nutrition_info"]["energy_kcal"] == 130.0
+    assert natto["nutrition_info"]["protein_g"] == 19.4
+    assert "error" in unknown
+
+
+def test_batch_detail_error():
+    """詳細取得がエラーの場合はエラーを返す"""
+    search_service, details_service = _mock_services()
+    details_service.get_details_many.side_effect = None
+    details_service.get_details_many.return_value = {"error": "USDA_API_KEY が設定されていません"}
+    with patch("function_tools.get_nutrition_info_tool.AsyncNutritionSearchService", return_value=search_service), \
+         patch("function_tools.get_nutrition_info_tool.AsyncNutritionDetailsService", return_value=details_service):
+        result = asyncio.run(get_nutrition_info_batch_core(["natto"]))
+    assert "error" in result
+
+
+def test_batch_searches_overlap():
+    """食材ごとの検索は順番待ちせず並行して実行される"""
+    in_flight = 0
+    max_in_flight = 0
+
+    async def slow_search(query, *args):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return SEARCH_RESULTS[query]
+
+    search_service, details_service = _mock_services()
+    search_service.search.side_effect = slow_search
+    with patch("function_tools.get_nutrition_info_tool.AsyncNutritionSearchService", return_value=search_service), \
+         patch("function_tools.get_nutrition_info_tool.AsyncNutritionDetailsService", return_value=details_service):
+        result = asyncio.run(get_nutrition_info_batch_core(["rice white cooked", "natto"]))
+
+    assert max_in_flight == 2
+    assert result["count"] == 2
+
+
+def test_batch_uses_estimates_when_quota_limited():
+    """USDA API のクォータ制限中は推定値のある食材だけ推定値で返す"""
+    search_service, details_service = _mock_services()
+    search_service.search.side_effect = lambda query, *args: {"error": "USDA API クォータ制限中", "quota_limited": True}
+    with patch("function_tools.get_nutrition_info_tool.AsyncNutritionSearchService", return_value=search_service), \
+         patch("function_tools.get_nutrition_info_tool.AsyncNutritionDetailsService", return_value=details_service):
+        result = asyncio.run(get_nutrition_info_batch_core(["rice white cooked", "natto"]))
+
+    rice, natto = result["results"]
+    assert rice["estimated"] is True
+    assert rice["nutrition_info"]["energy_kcal"] == 130.0
+    assert rice["source"] == "推定値（USDA API 利用不可）"
+    assert "error" in natto
+    assert result["sources"] == ["推定値（USDA API 利用不可）"]
+    details_service.get_details_many.assert_not_awaited()
+
+
+def test_batch_uses_japanese_food_table_first():
+    """日本語の食材名は日本食品標準成分表から取得し、USDA検索を行わない"""
+    search_service, details_service = _mock_services()
+    with patch("function_tools.get_nutrition_info_tool.AsyncNutritionSearchService", return_value=search_service), \
+         patch("function_tools.get_nutrition_info_tool.AsyncNutritionDetailsService", return_value=details_service):
+        result = asyncio.run(get_nutrition_info_batch_core(["ご飯", "natto"]))
+
+    rice, natto = result["results"]
+    assert rice["source"] == "日本食品標準成分表（八訂）"
+    assert rice["nutrition_info"]["energy_kcal"] == 156.0
+    assert natto["fdc_id"] == 172443
+    assert natto["source"] == "USDA FoodData Central"
+    assert result["sources"] == ["日本食品標準成分表（八訂）", "USDA FoodData Central"]
+    search_service.search.assert_awaited_once()
+    assert result["count"] == 2
+
+
+def test_batch_skips_details_when_search_hit_has_macros():
+    """検索結果に主要栄養素が揃っている食材は詳細取得を行わない"""
+    search_service, details_service = _mock_services()
+    hit = {
+        "fdcId": 171287,
+        "description": "Egg, whole, raw, fresh",
+        "dataType": "SR Legacy",
+        "foodNutrients": [
+            {"nutrientNumber": "208", "nutrientName": "Energy", "unitName": "KCAL", "value": 143},
+            {"nutrientNumber": "203", "nutrientName": "Protein", "unitName": "G", "value": 12.6},
+            {"nutrientNumber": "204", "nutrientName": "Total lipid (fat)", "unitName": "G", "value": 9.51},
+            {"nutrientNumber": "205", "nutrientName": "Carbohydrate, by difference", "unitName": "G", "value": 0.72},
+        ],
+    }
+    results = {**SEARCH_RESULTS, "egg": {"foods": [hit]}}
+    search_service.search.side_effect = lambda query, *args: results[query]
+    with patch("function_tools.get_nutrition_info_tool.AsyncNutritionSearchService", return_value=search_service), \
+         patch("function_tools.get_nutrition_info_tool.AsyncNutritionDetailsService", return_value=details_service):
+        result = asyncio.run(get_nutrition_info_batch_core(["egg", "natto"]))
+
+    details_service.get_details_many.assert_awaited_once_with([172443])
+    egg, natto = result["results"]
+    assert egg["fdc_id"] == 171287
+    assert egg["nutrition_info"]["energy_kcal"] == 143
+    assert egg["nutrition_info"]["fat_g"] == 9.51
+    assert natto["nutrition_info"]["protein_g"] == 19.4
+    assert result["count"] == 2
+
+
+def test_batch_reranks_search_hits():
+    """検索APIの先頭ではなく、再ランキングで最も適した食品を選ぶ"""
+    search_service, details_service = _mock_services()
+    results = {
+        "rice white cooked": {"foods": [
+            {"fdcId": 2001, "description": "Crackers, rice", "dataType": "Branded"},
+            {"fdcId": 168878, "description": "Rice, white, cooked", "dataType": "SR Legacy"},
+        ]},
+    }
+    search_service.search.side_effect = lambda query, *args: results[query]
+    with patch("function_tools.get_nutrition_info_tool.AsyncNutritionSearchService", return_value=search_service), \
+         patch("function_tools.get_nutrition_info_tool.AsyncNutritionDetailsService", return_value=details_service):
+        result = asyncio.run(get_nutrition_info_batch_core(["rice white cooked"]))
+
+    details_service.get_details_many.assert_awaited_once_with([168878])
+    assert result["results"][0]["fdc_id"] == 168878
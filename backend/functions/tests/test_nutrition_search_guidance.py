@@ -320,6 +320,52 @@ def run_all_enhanced_tests():
         traceback.print_exc()
         return False
 
+def test_compact_guidance():
+    """compact モード（入力に該当する項目のみ）のテスト"""
+    
+    import json
+    from function_tools.get_nutrition_search_guidance_tool import get_nutrition_search_guidance_core
+    
+    args = {"food_category": "meat", "search_intent": "high_protein", "user_input": "鶏肉の胸肉を焼いた"}
+    compact = get_nutrition_search_guidance_core(**args, detail_level="compact")
+    full = get_nutrition_search_guidance_core(**args)
+    
+    assert compact["status"] == "success"
+    assert compact["translations"] == {"鶏肉": "chicken", "胸肉": "breast", "焼いた": "grilled"}
+    assert compact["recommended_data_types"] == full["guidance"]["intent_specific"]["recommended_data_types"]
+    assert 0 < len(compact["strategy"]) <= 3
+    assert "guidance" not in compact
+    
+    # 出力サイズはフルのガイダンスの1/10以下
+    assert len(json.dumps(compact, ensure_ascii=False)) * 10 < len(json.dumps(full, ensure_ascii=False))
+    
+    # 入力がない場合も基本の検索戦略を返す
+    minimal = get_nutrition_search_guidance_core(detail_level="compact")
+    assert minimal["translations"] == {}
+    assert minimal["strategy"]
+
+def test_static_guidance_is_frozen():
+    """静的なガイダンスはインポート時に1回だけ構築され、書き換えられないこと"""
+    
+    import pytest
+    from function_tools.get_nutrition_search_guidance_tool import (
+        _get_comprehensive_examples,
+        _get_translation_patterns,
+        get_nutrition_search_guidance_core
+    )
+    
+    assert _get_translation_patterns() is _get_translation_patterns()
+    assert _get_comprehensive_examples() is _get_comprehensive_examples()
+    
+    result = get_nutrition_search_guidance_core(user_input="りんご")
+    with pytest.raises(TypeError):
+        result["guidance"]["translation_patterns"]["basic_foods"]["りんご"] = "pear"
+    with pytest.raises(AttributeError):
+        result["usage_tips"].append("追加")
+    
+    # ツール出力の文字列化は通常の dict / list と同じ表現
+    assert str(result["usage_tips"]).startswith("['")
+
 # 既存のテスト関数も保持（後方互換性のため）
 def test_guidance_functions():
     """既存のガイダンス機能の基本テスト（後方互換性）"""